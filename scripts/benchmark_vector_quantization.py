@@ -0,0 +1,97 @@
+"""Benchmark memory use, latency and recall of vector store quantization modes.
+
+Builds a synthetic clustered corpus, loads it into ``SimpleVectorStore`` with
+each quantization mode and reports resident vector memory (via tracemalloc),
+mean query latency and recall@k against exact float search.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_vector_quantization.py --vectors 20000 --dim 384
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import List, Optional
+
+from agent_engine.retrieval.vector_store import SimpleVectorStore, StoredVector
+
+
+def make_corpus(count: int, dim: int, clusters: int, seed: int) -> List[List[float]]:
+    rng = random.Random(seed)
+    centres = [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(clusters)]
+    corpus = []
+    for _ in range(count):
+        centre = centres[rng.randrange(clusters)]
+        corpus.append([c + rng.gauss(0.0, 0.6) for c in centre])
+    return corpus
+
+
+def build_store(path: str, corpus: List[List[float]], quantization: Optional[str]) -> None:
+    store = SimpleVectorStore(path, quantization=quantization)
+    store.replace(
+        [],
+        (StoredVector(vector_id=str(i), values=vec, metadata={}) for i, vec in enumerate(corpus)),
+    )
+    store.persist()
+
+
+def measure_load(
+    path: str, quantization: Optional[str], rerank_factor: Optional[int]
+) -> tuple[SimpleVectorStore, int]:
+    gc.collect()
+    tracemalloc.start()
+    store = SimpleVectorStore(path, quantization=quantization, rerank_factor=rerank_factor)
+    store.load()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--rerank-factor", type=int, default=None, help="Override the per-mode re-rank factor"
+    )
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.vectors, args.dim, args.clusters, args.seed)
+    queries = make_corpus(args.queries, args.dim, args.clusters, args.seed + 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        truth = None
+        print(f"{'mode':<8} {'bytes/vector':>12} {'total MB':>10} {'query ms':>10} {'recall@k':>9}")
+        for mode in (None, "int8", "binary"):
+            path = os.path.join(tmp, f"{mode or 'float'}.json")
+            build_store(path, corpus, mode)
+            store, used = measure_load(path, mode, args.rerank_factor)
+
+            started = time.perf_counter()
+            results = [[r["id"] for r in store.search(q, top_k=args.top_k)] for q in queries]
+            latency_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+            if truth is None:
+                truth = results
+            hits = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+            recall = hits / (len(queries) * args.top_k)
+            print(
+                f"{mode or 'float':<8} {used / args.vectors:>12.0f} {used / 1e6:>10.1f} "
+                f"{latency_ms:>10.1f} {recall:>9.3f}"
+            )
+            del store
+            gc.collect()
+
+
+if __name__ == "__main__":
+    main()
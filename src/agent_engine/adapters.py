@@ -195,6 +195,8 @@ def _register_builtin_memory_store_factories(registry: AdapterRegistry) -> None:
             file_path=conf.get("file_path"),
             db_path=conf.get("db_path"),
             max_items=conf.get("max_items"),
+            retention=conf.get("retention") or "fifo",
+            ttl_seconds=conf.get("ttl_seconds"),
         ),
     )
     registry.register_memory_store_factory(
@@ -206,6 +208,10 @@ def _register_builtin_memory_store_factories(registry: AdapterRegistry) -> None:
             file_path=conf.get("file_path"),
             db_path=None,
             max_items=conf.get("max_items"),
+            fsync=conf.get("fsync", "never"),
+            compaction_threshold=conf.get("compaction_threshold", 0.5),
+            retention=conf.get("retention") or "fifo",
+            ttl_seconds=conf.get("ttl_seconds"),
         ),
     )
     registry.register_memory_store_factory(
@@ -217,6 +223,9 @@ def _register_builtin_memory_store_factories(registry: AdapterRegistry) -> None:
             file_path=None,
             db_path=conf.get("db_path"),
             max_items=conf.get("max_items"),
+            full_text_search=conf.get("full_text_search", False),
+            retention=conf.get("retention") or "fifo",
+            ttl_seconds=conf.get("ttl_seconds"),
         ),
     )
 
@@ -28,7 +28,7 @@ from .schema_validator import (
 )
 from .memory_stores import MemoryStore, initialize_memory_stores, initialize_context_profiles
 from .adapters import AdapterRegistry, initialize_adapters
-from .schemas.memory import ContextProfile
+from .schemas.memory import ContextProfile, RetrievalConfig
 from .schemas import (
     Event,
     EventType,
@@ -46,6 +46,7 @@ from .runtime.scheduler import TaskScheduler
 from .runtime.agent_runtime import AgentRuntime
 from .runtime.tool_runtime import ToolRuntime
 from .runtime.context import ContextAssembler
+from .retrieval import create_embedding_provider
 from .runtime.deterministic_registry import DeterministicRegistry
 from .runtime.artifact_store import ArtifactStore
 from .runtime.metadata_collector import collect_engine_metadata
@@ -178,6 +179,7 @@ class Engine:
         workspace_root: Optional[Path] = None,
         tool_handlers: Optional[Dict[str, Callable]] = None,
         tools_manifest: Optional[List[Dict]] = None,
+        retrieval_config: Optional[RetrievalConfig] = None,
     ):
         """Initialize Engine with all components."""
         self.config_dir = config_dir
@@ -249,11 +251,29 @@ class Engine:
             workspace_root=self.workspace_root,
         )
 
-        # ContextAssembler uses configured memory stores and context profiles
+        # ContextAssembler uses configured memory stores, context profiles and retrieval settings
+        self.retrieval_config = retrieval_config or RetrievalConfig()
+        # Per-project memory goes to partitions of the configured persistent project store
+        project_memory = (memory_stores or {}).get("project")
+        project_backend_factory = None
+        persistent_store = getattr(project_memory, "persistent_store", None)
+        if project_memory is not None and getattr(persistent_store, "backend", None) is not None:
+            project_backend_factory = project_memory.open_partition
         self.context_assembler = ContextAssembler(
             context_profiles=context_profiles,
-            memory_config=memory_config,
+            project_backend_factory=project_backend_factory,
             workspace_root=str(self.workspace_root),
+            embedding_provider=create_embedding_provider(
+                self.retrieval_config.embedder.model_dump(exclude_none=True)
+            ),
+            vector_quantization=self.retrieval_config.quantization,
+            background_indexing=self.retrieval_config.background_indexing,
+            index_poll_interval=self.retrieval_config.index_poll_interval,
+            index_shards=self.retrieval_config.sharded,
+            max_open_shards=self.retrieval_config.max_open_shards,
+            shared_index_mode=self.retrieval_config.shared_index,
+            shared_index_path=self.retrieval_config.shared_index_path,
+            telemetry=self.telemetry,
         )
 
         self.deterministic_registry = DeterministicRegistry()
@@ -279,7 +299,8 @@ class Engine:
             task_manager=self.task_manager,
             node_executor=self.node_executor,
             telemetry=self.telemetry,
-            metadata=self.metadata
+            metadata=self.metadata,
+            context_assembler=self.context_assembler,
         )
 
     @classmethod
@@ -381,6 +402,7 @@ class Engine:
 
         memory_stores = initialize_memory_stores(memory_config, adapter_registry=adapters)
         context_profiles = initialize_context_profiles(memory_config)
+        retrieval_config = RetrievalConfig(**((memory_config or {}).get('retrieval') or {}))
 
         # Step 6: Register tools and adapters (with credential support)
         workspace_root = _resolve_workspace_root(path)
@@ -483,6 +505,7 @@ class Engine:
             workspace_root=workspace_root,
             tool_handlers=tool_handlers,
             tools_manifest=tools,
+            retrieval_config=retrieval_config,
         )
 
         # Initialize policy evaluator with telemetry after engine creation
@@ -1,10 +1,15 @@
 """Memory store initialization and implementation with persistence support."""
 
+import logging
+import sqlite3
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from .schemas.memory import ContextProfile, ContextProfileSource
+from .runtime.memory.ordered_index import RETENTION_POLICIES
 from .runtime.persistent_memory import PersistentMemoryStore
 
+logger = logging.getLogger(__name__)
+
 
 class MemoryStore:
     """Memory store with optional persistence backends.
@@ -20,7 +25,12 @@ class MemoryStore:
         backend: Optional[str] = None,
         file_path: Optional[str] = None,
         db_path: Optional[str] = None,
-        max_items: Optional[int] = None
+        max_items: Optional[int] = None,
+        fsync: str = "never",
+        compaction_threshold: float = 0.5,
+        full_text_search: bool = False,
+        retention: str = "fifo",
+        ttl_seconds: Optional[float] = None
     ):
         """Initialize a memory store with optional persistence.
 
@@ -31,29 +41,79 @@ class MemoryStore:
             file_path: Path for JSONL backend.
             db_path: Path for SQLite backend.
             max_items: Retention policy - maximum items to keep.
+            fsync: JSONL fsync policy ('always', 'interval', 'never').
+            compaction_threshold: JSONL dead-record ratio that triggers log compaction.
+            full_text_search: Maintain an SQLite FTS5 index for search_text.
+            retention: Eviction order when over max_items ('fifo' or 'lru'; the
+                sqlite backend supports only 'fifo' and falls back to it).
+            ttl_seconds: Expire items older than this many seconds (None = never).
+
+        Raises:
+            ValueError: If retention is unknown
         """
         self.store_id = store_id
         self.store_type = store_type
-        self.items: List[Any] = []  # Legacy support
+        # Legacy support: non-ContextItem objects put in the store (ContextItems
+        # live only in the persistent store, so they are not held twice)
+        self._legacy_items: List[Any] = []
 
         # Use backend parameter if provided, fall back to store_type
         backend_type = backend or "in_memory"
 
+        if retention not in RETENTION_POLICIES:
+            raise ValueError(
+                f"Unknown retention policy '{retention}'; "
+                f"expected one of {', '.join(RETENTION_POLICIES)}"
+            )
+        if backend_type == "sqlite" and retention != "fifo":
+            logger.warning(
+                f"Memory store '{store_id}': sqlite backend does not support "
+                f"retention '{retention}', using 'fifo'"
+            )
+            retention = "fifo"
+
         # Initialize persistent backend
         try:
             self.persistent_store = PersistentMemoryStore(
                 backend_type=backend_type,
                 file_path=file_path,
                 db_path=db_path,
-                max_items=max_items
+                max_items=max_items,
+                fsync=fsync,
+                compaction_threshold=compaction_threshold,
+                full_text_search=full_text_search,
+                retention=retention,
+                ttl_seconds=ttl_seconds
+            )
+        except (ValueError, OSError, sqlite3.Error) as e:
+            # Fall back to in-memory if backend init fails (e.g. missing path)
+            logger.warning(
+                f"Memory store '{store_id}': could not open {backend_type} backend "
+                f"({e}); falling back to in-memory storage"
             )
-        except Exception as e:
-            # Fall back to in-memory if backend init fails
             self.persistent_store = PersistentMemoryStore(
                 backend_type="in_memory",
-                max_items=max_items
+                max_items=max_items,
+                retention=retention,
+                ttl_seconds=ttl_seconds
             )
 
+    @property
+    def items(self) -> List[Any]:
+        """All stored items (legacy list view, built on access)."""
+        return self.persistent_store.list_all() + self._legacy_items
+
+    def open_partition(self, name: str) -> Optional[Any]:
+        """Open a separate backend of this store's type for one partition.
+
+        Args:
+            name: Partition name (e.g. a project id).
+
+        Returns:
+            A persistent backend, or None if this store is in-memory.
+        """
+        return self.persistent_store.open_partition(name)
+
     def get(self, item_id: str) -> Optional[Any]:
         """Get item by ID.
 
@@ -73,13 +133,21 @@ class MemoryStore:
         Args:
             item: Item to store (should be ContextItem for persistence).
         """
-        # Support legacy list appending
-        self.items.append(item)
-
-        # Also persist if it's a ContextItem
         from .schemas.memory import ContextItem
         if isinstance(item, ContextItem):
             self.persistent_store.add(item)
+        else:
+            self._legacy_items.append(item)
+
+    def add_many(self, items: List[Any]) -> None:
+        """Put a batch of items with one backend write and one retention pass.
+
+        Args:
+            items: Items to store (ContextItems are persisted).
+        """
+        from .schemas.memory import ContextItem
+        self._legacy_items.extend(i for i in items if not isinstance(i, ContextItem))
+        self.persistent_store.add_many([i for i in items if isinstance(i, ContextItem)])
 
     def query(
         self,
@@ -99,6 +167,18 @@ class MemoryStore:
         """
         return self.persistent_store.query(filters, limit, order_by)
 
+    def search_text(self, query: str, limit: int = 20) -> List[Any]:
+        """Full-text search over stored item payloads.
+
+        Args:
+            query: Free-text query; items matching any term are returned
+            limit: Max items to return
+
+        Returns:
+            Matching items, most relevant first
+        """
+        return self.persistent_store.search_text(query, limit)
+
     def append(self, item: Any) -> None:
         """Append item to store (legacy support).
 
@@ -152,7 +232,12 @@ def initialize_memory_stores(memory_config: Optional[Dict], adapter_registry=Non
                     backend=backend,
                     file_path=store_config.get("file_path"),
                     db_path=store_config.get("db_path"),
-                    max_items=store_config.get("max_items")
+                    max_items=store_config.get("max_items"),
+                    fsync=store_config.get("fsync", "never"),
+                    compaction_threshold=store_config.get("compaction_threshold", 0.5),
+                    full_text_search=store_config.get("full_text_search", False),
+                    retention=store_config.get("retention") or "fifo",
+                    ttl_seconds=store_config.get("ttl_seconds")
                 )
 
     return stores
@@ -1,5 +1,44 @@
 """Retrieval module providing embedding, vector store, and search utilities."""
 
-from .embedder import EmbeddingProvider, OllamaEmbeddingProvider
+from .embedder import (
+    EmbeddingProvider,
+    HashingEmbeddingProvider,
+    OllamaEmbeddingProvider,
+    create_embedding_provider,
+)
+from .cache import EmbeddingCache, CachedEmbeddingProvider
+from .chunking import Chunk, Chunker, CHUNK_MODES
+from .filters import MetadataFilter
+from .lexical import BM25Index, reciprocal_rank_fusion
 from .vector_store import SimpleVectorStore
+from .sharded_store import ShardedVectorStore
+from .shared_index import SharedIndexReader, publish_snapshot
 from .retriever import Retriever, RetrievalDocument, RetrievalChunk
+from .rerank import mmr_rerank, merge_adjacent_chunks
+from .indexer import BackgroundIndexer, IndexerStats
+
+__all__ = [
+    "EmbeddingProvider",
+    "HashingEmbeddingProvider",
+    "OllamaEmbeddingProvider",
+    "create_embedding_provider",
+    "EmbeddingCache",
+    "CachedEmbeddingProvider",
+    "Chunk",
+    "Chunker",
+    "CHUNK_MODES",
+    "MetadataFilter",
+    "BM25Index",
+    "reciprocal_rank_fusion",
+    "SimpleVectorStore",
+    "ShardedVectorStore",
+    "SharedIndexReader",
+    "publish_snapshot",
+    "Retriever",
+    "RetrievalDocument",
+    "RetrievalChunk",
+    "mmr_rerank",
+    "merge_adjacent_chunks",
+    "BackgroundIndexer",
+    "IndexerStats",
+]
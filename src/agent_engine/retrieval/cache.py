@@ -0,0 +1,189 @@
+"""Content-hash embedding cache (in-memory LRU backed by SQLite)."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .embedder import EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """Return the sha256 hex digest used as the cache key for ``text``."""
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class EmbeddingCache:
+    """Embedding cache keyed by ``(model, sha256(text))``.
+
+    Lookups hit a bounded in-memory LRU first and fall back to an optional
+    SQLite file, so embeddings survive process restarts and are shared by every
+    Retriever pointing at the same path.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_memory_items: int = 10000) -> None:
+        self.path = path
+        self.max_memory_items = max(0, int(max_memory_items))
+        self._lru: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._opened = False
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite store on first use (caller holds the lock)."""
+        if not self._opened:
+            self._opened = True
+            if self.path:
+                self._open(self.path)
+        return self._conn
+
+    def _open(self, path: str) -> None:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+            self._conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Embedding cache %s unavailable, using memory only: %s", path, exc)
+            self._conn = None
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> List[Optional[List[float]]]:
+        """Return cached vectors for ``hashes`` (None where missing)."""
+        results: List[Optional[List[float]]] = [None] * len(hashes)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for idx, digest in enumerate(hashes):
+                key = (model, digest)
+                vec = self._lru.get(key)
+                if vec is not None:
+                    self._lru.move_to_end(key)
+                    results[idx] = vec
+                else:
+                    missing.setdefault(digest, []).append(idx)
+
+            conn = self._connection() if missing else None
+            if conn is not None:
+                digests = list(missing)
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(digests), 500):
+                    chunk = digests[start:start + 500]
+                    placeholders = ",".join("?" for _ in chunk)
+                    rows = conn.execute(
+                        "SELECT text_hash, vector FROM embeddings "
+                        f"WHERE model = ? AND text_hash IN ({placeholders})",
+                        [model, *chunk],
+                    ).fetchall()
+                    for digest, blob in rows:
+                        vec = array("d", blob).tolist()
+                        self._remember((model, digest), vec)
+                        for idx in missing.pop(digest, []):
+                            results[idx] = vec
+
+            found = sum(1 for r in results if r is not None)
+            self.hits += found
+            self.misses += len(hashes) - found
+        return results
+
+    def put_many(self, model: str, hashes: Sequence[str], vectors: Sequence[List[float]]) -> None:
+        """Store vectors for ``hashes`` in memory and on disk."""
+        with self._lock:
+            rows = []
+            for digest, vec in zip(hashes, vectors):
+                self._remember((model, digest), list(vec))
+                rows.append((model, digest, array("d", vec).tobytes()))
+            conn = self._connection() if rows else None
+            if conn is not None:
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) "
+                        "VALUES (?, ?, ?)",
+                        rows,
+                    )
+                    conn.commit()
+                except sqlite3.Error as exc:
+                    logger.warning("Failed to persist embeddings to %s: %s", self.path, exc)
+
+    def _remember(self, key: Tuple[str, str], vec: List[float]) -> None:
+        if self.max_memory_items == 0:
+            return
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_memory_items:
+            self._lru.popitem(last=False)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class CachedEmbeddingProvider:
+    """EmbeddingProvider wrapper that only embeds texts missing from the cache."""
+
+    def __init__(
+        self, embedder: EmbeddingProvider, cache: EmbeddingCache, model: Optional[str] = None
+    ) -> None:
+        self.embedder = embedder
+        self.cache = cache
+        self.model = model or getattr(embedder, "model", None) or type(embedder).__name__
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        hashes = [text_hash(t) for t in texts]
+        vectors = self.cache.get_many(self.model, hashes)
+
+        # Embed each distinct missing text once
+        pending: Dict[str, int] = {}
+        for idx, (digest, vec) in enumerate(zip(hashes, vectors)):
+            if vec is None and digest not in pending:
+                pending[digest] = idx
+        if pending:
+            miss_hashes = list(pending)
+            miss_texts = [texts[pending[d]] for d in miss_hashes]
+            fresh = self.embedder.embed(miss_texts)
+            if len(fresh) != len(miss_texts):
+                # Provider dropped failures, so vectors can no longer be matched
+                # to texts; embed the misses one at a time to recover the pairing
+                logger.warning(
+                    "Embedding provider returned %s vectors for %s texts; "
+                    "re-embedding them one by one",
+                    len(fresh),
+                    len(miss_texts),
+                )
+                embedded = [(d, self.embedder.embed([t])) for d, t in zip(miss_hashes, miss_texts)]
+                miss_hashes = [d for d, vecs in embedded if len(vecs) == 1]
+                fresh = [vecs[0] for _, vecs in embedded if len(vecs) == 1]
+            self.cache.put_many(self.model, miss_hashes, fresh)
+            by_hash = dict(zip(miss_hashes, fresh))
+            vectors = [v if v is not None else by_hash.get(d) for v, d in zip(vectors, hashes)]
+        # Stop at the first text without a vector so results stay aligned with
+        # the input, like a provider that drops its trailing failures
+        aligned: List[List[float]] = []
+        for vec in vectors:
+            if vec is None:
+                break
+            aligned.append(vec)
+        return aligned
@@ -0,0 +1,258 @@
+"""Linear-time, structure-aware chunking for workspace indexing.
+
+Chunk boundaries are chosen so that an edit only disturbs the chunks around
+it:
+
+- ``python``: one chunk per top-level function/class (large classes are split
+  per method), with module-level code grouped between them.
+- ``markdown``: one chunk per heading section.
+- ``lines`` / ``tokens``: content-defined boundaries. A chunk may end after
+  a blank line or an "anchor" line (chosen by a hash of the line text) once
+  it reaches half its budget, and must end at twice its budget. Inserting or
+  deleting lines therefore resynchronises with the old boundaries at the next
+  anchor instead of shifting every later chunk.
+
+Every mode runs in time linear in the size of the input.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import logging
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from agent_engine.utils.token_utils import estimate_tokens_rough
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MODES = ("auto", "lines", "tokens", "python", "markdown")
+
+_PYTHON_EXTENSIONS = {".py", ".pyi"}
+_MARKDOWN_EXTENSIONS = {".md", ".markdown"}
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s")
+_FENCE_RE = re.compile(r"^\s{0,3}(```|~~~)")
+
+
+@dataclass
+class Chunk:
+    """A contiguous span of lines (1-based, inclusive)."""
+
+    text: str
+    start_line: int
+    end_line: int
+    kind: str = "lines"
+    name: Optional[str] = None
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class Chunker:
+    """Split file text into chunks according to ``mode``.
+
+    Args:
+        mode: One of ``CHUNK_MODES``; "auto" picks python/markdown/lines by
+            file extension
+        chunk_size: Target chunk size in characters (lines/python/markdown)
+        chunk_overlap: Characters of trailing context repeated from the
+            previous chunk in lines mode
+        max_tokens: Target chunk size in estimated tokens (tokens mode)
+        anchor_period: Average number of lines between hash anchors
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        chunk_size: int = 1200,
+        chunk_overlap: int = 200,
+        max_tokens: int = 300,
+        anchor_period: int = 8,
+    ) -> None:
+        if mode not in CHUNK_MODES:
+            raise ValueError(f"Invalid chunk mode '{mode}'. Must be one of: {list(CHUNK_MODES)}")
+        self.mode = mode
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_overlap = max(0, chunk_overlap)
+        self.max_tokens = max(1, max_tokens)
+        self.anchor_period = max(1, anchor_period)
+
+    def resolve_mode(self, path: str = "") -> str:
+        if self.mode != "auto":
+            return self.mode
+        ext = os.path.splitext(path)[1].lower()
+        if ext in _PYTHON_EXTENSIONS:
+            return "python"
+        if ext in _MARKDOWN_EXTENSIONS:
+            return "markdown"
+        return "lines"
+
+    def chunk(self, text: str, path: str = "") -> List[Chunk]:
+        lines = _split_lines(text)
+        if not lines:
+            return []
+        mode = self.resolve_mode(path)
+        if mode == "python":
+            return self._chunk_python(text, lines)
+        if mode == "markdown":
+            return self._chunk_markdown(lines)
+        if mode == "tokens":
+            return self._chunk_lines(
+                lines, 0, len(lines), self.max_tokens, estimate_tokens_rough, overlap=0
+            )
+        return self._chunk_lines(
+            lines, 0, len(lines), self.chunk_size, len, overlap=self.chunk_overlap
+        )
+
+    # --- content-defined line chunking ---------------------------------
+
+    def _is_anchor(self, line: str) -> bool:
+        stripped = line.strip()
+        if not stripped:
+            return True
+        return zlib.crc32(stripped.encode("utf-8", errors="ignore")) % self.anchor_period == 0
+
+    def _chunk_lines(
+        self,
+        lines: List[str],
+        start: int,
+        end: int,
+        budget: int,
+        measure: Callable[[str], int],
+        overlap: int = 0,
+        kind: str = "lines",
+        name: Optional[str] = None,
+    ) -> List[Chunk]:
+        """Content-defined chunking of ``lines[start:end]``."""
+        spans: List[Tuple[int, int]] = []
+        min_size = max(1, budget // 2)
+        max_size = budget * 2
+        span_start = start
+        size = 0
+        for i in range(start, end):
+            size += measure(lines[i]) + 1
+            at_end = i == end - 1
+            if at_end or size >= max_size or (size >= min_size and self._is_anchor(lines[i])):
+                spans.append((span_start, i + 1))
+                span_start = i + 1
+                size = 0
+
+        chunks: List[Chunk] = []
+        for span_start, span_end in spans:
+            first = span_start
+            if overlap and chunks:
+                # Walk back over the previous span; bounded by the overlap size
+                carried = 0
+                while first > start and carried + len(lines[first - 1]) <= overlap:
+                    carried += len(lines[first - 1]) + 1
+                    first -= 1
+            chunks.append(self._make_chunk(lines, first, span_end, kind, name))
+        return chunks
+
+    def _make_chunk(
+        self, lines: List[str], start: int, end: int, kind: str, name: Optional[str]
+    ) -> Chunk:
+        return Chunk(
+            text="\n".join(lines[start:end]),
+            start_line=start + 1,
+            end_line=end,
+            kind=kind,
+            name=name,
+        )
+
+    def _emit(
+        self, lines: List[str], start: int, end: int, kind: str, name: Optional[str] = None
+    ) -> List[Chunk]:
+        """Emit one chunk for a span, falling back to line chunking if it is too large."""
+        if end <= start:
+            return []
+        size = sum(len(lines[i]) + 1 for i in range(start, end))
+        if size > self.chunk_size * 2:
+            return self._chunk_lines(lines, start, end, self.chunk_size, len, kind=kind, name=name)
+        if not any(lines[i].strip() for i in range(start, end)):
+            return []
+        return [self._make_chunk(lines, start, end, kind, name)]
+
+    # --- python ----------------------------------------------------------
+
+    def _chunk_python(self, text: str, lines: List[str]) -> List[Chunk]:
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return self._chunk_lines(
+                lines, 0, len(lines), self.chunk_size, len, overlap=self.chunk_overlap
+            )
+
+        chunks: List[Chunk] = []
+        cursor = 0
+        for node in tree.body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            start = _node_start(node) - 1
+            end = node.end_lineno or node.lineno
+            chunks.extend(self._emit(lines, cursor, start, "module"))
+            if isinstance(node, ast.ClassDef):
+                chunks.extend(self._chunk_class(lines, node, start, end))
+            else:
+                chunks.extend(self._emit(lines, start, end, "function", node.name))
+            cursor = end
+        chunks.extend(self._emit(lines, cursor, len(lines), "module"))
+        return chunks
+
+    def _chunk_class(
+        self, lines: List[str], node: ast.ClassDef, start: int, end: int
+    ) -> List[Chunk]:
+        size = sum(len(lines[i]) + 1 for i in range(start, end))
+        if size <= self.chunk_size * 2:
+            return [self._make_chunk(lines, start, end, "class", node.name)]
+        chunks: List[Chunk] = []
+        cursor = start
+        for child in node.body:
+            if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            child_start = _node_start(child) - 1
+            child_end = child.end_lineno or child.lineno
+            chunks.extend(self._emit(lines, cursor, child_start, "class", node.name))
+            qualname = f"{node.name}.{child.name}"
+            chunks.extend(self._emit(lines, child_start, child_end, "method", qualname))
+            cursor = child_end
+        chunks.extend(self._emit(lines, cursor, end, "class", node.name))
+        return chunks
+
+    # --- markdown --------------------------------------------------------
+
+    def _chunk_markdown(self, lines: List[str]) -> List[Chunk]:
+        chunks: List[Chunk] = []
+        section_start = 0
+        section_name: Optional[str] = None
+        in_fence = False
+        for i, line in enumerate(lines):
+            if _FENCE_RE.match(line):
+                in_fence = not in_fence
+                continue
+            if not in_fence and _HEADING_RE.match(line) and i > section_start:
+                chunks.extend(self._emit(lines, section_start, i, "section", section_name))
+                section_start = i
+            if not in_fence and _HEADING_RE.match(line):
+                section_name = line.strip().lstrip("#").strip()
+        chunks.extend(self._emit(lines, section_start, len(lines), "section", section_name))
+        return chunks
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split on "\n" only, like ``ast`` line numbers (``splitlines`` also breaks
+    on form feeds, \x1c-\x1e and \u2028), dropping a trailing "\r" per line."""
+    lines = [line[:-1] if line.endswith("\r") else line for line in text.split("\n")]
+    if lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _node_start(node: ast.stmt) -> int:
+    decorators = getattr(node, "decorator_list", None) or []
+    return min([node.lineno] + [d.lineno for d in decorators])
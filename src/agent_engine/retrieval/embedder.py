@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import math
 import os
 import subprocess
-from typing import List, Protocol
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Protocol
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +23,12 @@ class EmbeddingProvider(Protocol):
 
 
 class OllamaEmbeddingProvider:
-    """Local embeddings via Ollama."""
+    """Local embeddings via Ollama.
+
+    Texts are sent in batches of ``batch_size`` to the ``/api/embed`` endpoint,
+    with up to ``max_concurrency`` batches in flight. Set ``use_batch_endpoint``
+    to False for older Ollama servers that only expose ``/api/embeddings``.
+    """
 
     def __init__(
         self,
@@ -28,22 +38,74 @@ class OllamaEmbeddingProvider:
         transport=None,
         auto_pull: bool = True,
         auto_start: bool = True,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        use_batch_endpoint: bool = True,
     ) -> None:
         self.model = model
         host = base_url or os.getenv("OLLAMA_HOST") or "http://localhost:11434"
         self.base_url = host.rstrip("/") + "/api/embeddings"
+        self.batch_url = host.rstrip("/") + "/api/embed"
         self.tags_url = host.rstrip("/") + "/api/tags"
         self.pull_url = host.rstrip("/") + "/api/pull"
         self.timeout = timeout
         self.transport = transport or self._requests_transport
         self.auto_pull = auto_pull
         self.auto_start = auto_start
+        self.batch_size = max(1, int(batch_size))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.use_batch_endpoint = use_batch_endpoint
 
     def embed(self, texts: List[str]) -> List[List[float]]:
-        embeddings: List[List[float]] = []
+        if not texts:
+            return []
         # Ensure server/model readiness before embedding calls
         self._ensure_server_ready()
         self._ensure_model_available()
+        if not self.use_batch_endpoint:
+            return self._embed_single(texts)
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            workers = min(self.max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map() preserves batch order, so output stays aligned with input
+                results = list(pool.map(self._embed_batch, batches))
+
+        embeddings: List[List[float]] = []
+        for batch_vectors in results:
+            embeddings.extend(batch_vectors)
+        return embeddings
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        try:
+            resp = self.transport(
+                self.batch_url,
+                {},
+                {
+                    "model": self.model,
+                    "input": batch,
+                },
+            )
+            vectors = _parse_batch_embedding_response(resp)
+            if vectors is not None and len(vectors) == len(batch):
+                return vectors
+            logger.warning(
+                "Ollama batch embedding returned %s vectors for %s inputs; "
+                "falling back to single requests",
+                None if vectors is None else len(vectors),
+                len(batch),
+            )
+        except Exception as exc:
+            logger.warning(
+                "Ollama batch embedding failed, falling back to single requests: %s", exc
+            )
+        return self._embed_single(batch)
+
+    def _embed_single(self, texts: List[str]) -> List[List[float]]:
+        embeddings: List[List[float]] = []
         for text in texts:
             try:
                 resp = self.transport(
@@ -62,12 +124,28 @@ class OllamaEmbeddingProvider:
         return embeddings
 
     def _requests_transport(self, url: str, headers, payload):
-        import requests
+        try:
+            import requests
+        except ImportError:
+            return self._urllib_transport(url, headers, payload)
 
         r = requests.post(url, headers=headers, json=payload, timeout=self.timeout)
         r.raise_for_status()
         return r
 
+    def _urllib_transport(self, url: str, headers, payload):
+        """Stdlib fallback used when ``requests`` is not installed."""
+        from urllib import request as urlrequest
+
+        req = urlrequest.Request(
+            url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json", **(headers or {})},
+            method="POST",
+        )
+        with urlrequest.urlopen(req, timeout=self.timeout) as resp:  # nosec B310 - local Ollama endpoint
+            return json.loads(resp.read().decode("utf-8") or "null")
+
     def _ensure_server_ready(self) -> None:
         """Best-effort attempt to verify Ollama is reachable, optionally auto-start."""
         try:
@@ -118,6 +196,90 @@ class OllamaEmbeddingProvider:
             logger.warning("Failed to auto-pull embedding model %s: %s", self.model, exc)
 
 
+class HashingEmbeddingProvider:
+    """Deterministic, network-free embeddings via signed feature hashing.
+
+    Each text is tokenized like the BM25 index (identifiers are split on
+    snake_case/camelCase and stop words dropped). Terms and adjacent-term
+    bigrams are hashed into ``dim`` buckets with a sign bit, weighted by
+    sublinear term frequency (``1 + log tf``) and L2-normalised. The same text
+    always maps to the same vector, on any host, with no model download.
+
+    Args:
+        dim: Vector dimension
+        use_bigrams: Also hash adjacent term pairs, which keeps some word order
+    """
+
+    def __init__(self, dim: int = 384, use_bigrams: bool = True) -> None:
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self.dim = int(dim)
+        self.use_bigrams = use_bigrams
+        # Used as the embedding cache namespace, so vectors of different sizes never mix
+        self.model = f"hashing-{self.dim}{'-bigrams' if use_bigrams else ''}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        from .lexical import tokenize
+
+        terms = tokenize(text)
+        features = Counter(terms)
+        if self.use_bigrams:
+            features.update(f"{a} {b}" for a, b in zip(terms, terms[1:]))
+
+        vector = [0.0] * self.dim
+        for feature, tf in features.items():
+            digest = int.from_bytes(
+                hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+            )
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dim] += sign * (1.0 + math.log(tf))
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            vector = [v / norm for v in vector]
+        return vector
+
+
+EMBEDDING_PROVIDERS = ("ollama", "hashing")
+
+
+def create_embedding_provider(config: Optional[Dict[str, Any]] = None) -> EmbeddingProvider:
+    """Build an embedding provider from a manifest ``retrieval.embedder`` section.
+
+    Args:
+        config: Mapping with ``provider`` ("ollama" or "hashing", default
+            "ollama") plus provider options: ``model``/``base_url``/
+            ``batch_size``/``max_concurrency`` for Ollama, ``dim``/
+            ``use_bigrams`` for hashing
+
+    Returns:
+        Configured embedding provider
+
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    options = dict(config or {})
+    provider = options.pop("provider", None) or "ollama"
+    if provider == "hashing":
+        return HashingEmbeddingProvider(
+            dim=options.get("dim", 384),
+            use_bigrams=options.get("use_bigrams", True),
+        )
+    if provider == "ollama":
+        kwargs = {
+            key: options[key]
+            for key in ("model", "base_url", "timeout", "batch_size", "max_concurrency")
+            if options.get(key) is not None
+        }
+        return OllamaEmbeddingProvider(**kwargs)
+    raise ValueError(
+        f"Unknown embedding provider '{provider}'. Must be one of: {list(EMBEDDING_PROVIDERS)}"
+    )
+
+
 def _parse_embedding_response(resp) -> List[float] | None:
     if hasattr(resp, "json"):
         data = resp.json()
@@ -133,3 +295,21 @@ def _parse_embedding_response(resp) -> List[float] | None:
         if isinstance(first, dict) and "embedding" in first:
             return first["embedding"]
     return None
+
+
+def _parse_batch_embedding_response(resp) -> Optional[List[List[float]]]:
+    if hasattr(resp, "json"):
+        data = resp.json()
+    else:
+        data = resp
+    if not isinstance(data, dict):
+        return None
+    # /api/embed returns {"embeddings": [[...], ...]}
+    if isinstance(data.get("embeddings"), list):
+        return data["embeddings"]
+    if isinstance(data.get("data"), list):
+        raw = [d.get("embedding") for d in data["data"] if isinstance(d, dict)]
+        vectors = [v for v in raw if isinstance(v, list)]
+        if len(vectors) == len(raw):
+            return vectors
+    return None
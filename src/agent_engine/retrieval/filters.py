@@ -0,0 +1,192 @@
+"""Metadata predicates for retrieval, backed by per-field posting lists."""
+
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Set, Union
+
+if TYPE_CHECKING:
+    from .vector_store import StoredVector
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+@dataclass
+class MetadataFilter:
+    """Restrict retrieval to chunks whose metadata matches.
+
+    Values within a field are OR-ed; fields are AND-ed. Empty fields do not
+    restrict anything.
+
+    Attributes:
+        path_globs: ``fnmatch`` patterns matched against ``metadata["path"]``
+            (``*`` also matches ``/``, so ``src/*`` covers all of ``src``)
+        extensions: File extensions such as ``.py`` (case-insensitive)
+        sources: Values of ``metadata["source"]`` (workspace chunks use "file")
+        tags: Tags of which at least one must appear in ``metadata["tags"]``
+        projects: Values of ``metadata["project_id"]``
+    """
+
+    path_globs: List[str] = field(default_factory=list)
+    extensions: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    projects: List[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.path_globs = [_normalise_path(g) for g in self.path_globs]
+        self.extensions = [
+            (e if e.startswith(".") else f".{e}").lower() for e in self.extensions
+        ]
+
+    @classmethod
+    def from_value(
+        cls, value: Union["MetadataFilter", Mapping[str, Any], None]
+    ) -> Optional["MetadataFilter"]:
+        """Coerce a filter, a mapping (e.g. profile metadata) or None.
+
+        Mappings accept ``paths`` as an alias of ``path_globs`` and single
+        strings in place of lists.
+        """
+        if value is None or isinstance(value, MetadataFilter):
+            return value
+        known = {"path_globs", "paths", "extensions", "sources", "tags", "projects"}
+        unknown = set(value) - known
+        if unknown:
+            raise ValueError(f"Unknown metadata filter fields: {sorted(unknown)}")
+
+        def as_list(key: str) -> List[str]:
+            raw = value.get(key) or []
+            return [raw] if isinstance(raw, str) else list(raw)
+
+        return cls(
+            path_globs=as_list("path_globs") + as_list("paths"),
+            extensions=as_list("extensions"),
+            sources=as_list("sources"),
+            tags=as_list("tags"),
+            projects=as_list("projects"),
+        )
+
+    def is_empty(self) -> bool:
+        return not (
+            self.path_globs or self.extensions or self.sources or self.tags or self.projects
+        )
+
+    def matches(self, metadata: Mapping[str, Any]) -> bool:
+        """Evaluate the filter directly against one metadata mapping."""
+        path = _normalise_path(str(metadata.get("path") or ""))
+        if self.path_globs and not any(fnmatch.fnmatchcase(path, g) for g in self.path_globs):
+            return False
+        if self.extensions and os.path.splitext(path)[1].lower() not in self.extensions:
+            return False
+        if self.sources and metadata.get("source") not in self.sources:
+            return False
+        if self.tags and not set(metadata.get("tags") or ()) & set(self.tags):
+            return False
+        if self.projects and metadata.get("project_id") not in self.projects:
+            return False
+        return True
+
+
+class MetadataIndex:
+    """Posting lists ``field -> value -> ids`` built from stored vectors.
+
+    Directories are posted for every ancestor of a vector's path, so a glob
+    like ``/repo/src/*.py`` only has to ``fnmatch`` the ids under
+    ``/repo/src`` instead of every vector in the store.
+    """
+
+    def __init__(self, vectors: Iterable["StoredVector"]) -> None:
+        self.extensions: Dict[str, Set[str]] = {}
+        self.sources: Dict[str, Set[str]] = {}
+        self.tags: Dict[str, Set[str]] = {}
+        self.projects: Dict[str, Set[str]] = {}
+        self.directories: Dict[str, Set[str]] = {}
+        self.paths: Dict[str, str] = {}
+        for vec in vectors:
+            self._add(vec.vector_id, vec.metadata)
+
+    def _add(self, vector_id: str, metadata: Mapping[str, Any]) -> None:
+        path = metadata.get("path")
+        if path:
+            path = _normalise_path(str(path))
+            self.paths[vector_id] = path
+            ext = os.path.splitext(path)[1].lower()
+            if ext:
+                self.extensions.setdefault(ext, set()).add(vector_id)
+            directory = path.rsplit("/", 1)[0] if "/" in path else ""
+            while directory:
+                self.directories.setdefault(directory, set()).add(vector_id)
+                if "/" not in directory:
+                    break
+                directory = directory.rsplit("/", 1)[0]
+            # Absolute paths also post under the root directory
+            if path.startswith("/"):
+                self.directories.setdefault("/", set()).add(vector_id)
+        source = metadata.get("source")
+        if source:
+            self.sources.setdefault(str(source), set()).add(vector_id)
+        for tag in metadata.get("tags") or ():
+            self.tags.setdefault(str(tag), set()).add(vector_id)
+        project = metadata.get("project_id")
+        if project:
+            self.projects.setdefault(str(project), set()).add(vector_id)
+
+    def select(self, flt: MetadataFilter) -> Set[str]:
+        """Return ids matching ``flt``, intersecting the smallest sets first."""
+        groups: List[Set[str]] = []
+        if flt.extensions:
+            groups.append(_union(self.extensions, flt.extensions))
+        if flt.sources:
+            groups.append(_union(self.sources, flt.sources))
+        if flt.tags:
+            groups.append(_union(self.tags, flt.tags))
+        if flt.projects:
+            groups.append(_union(self.projects, flt.projects))
+        if flt.path_globs:
+            groups.append(self._glob_ids(flt.path_globs))
+        if not groups:
+            return set(self.paths)
+        groups.sort(key=len)
+        selected = set(groups[0])
+        for group in groups[1:]:
+            if not selected:
+                break
+            selected &= group
+        return selected
+
+    def _glob_ids(self, globs: List[str]) -> Set[str]:
+        matched: Set[str] = set()
+        for pattern in globs:
+            literal = _GLOB_CHARS.split(pattern, 1)[0]
+            candidates = self._under(literal)
+            if literal == pattern:
+                # No wildcards: an exact file or everything under a directory
+                matched |= {i for i in candidates if self.paths[i] == pattern}
+                matched |= self.directories.get(pattern.rstrip("/") or "/", set())
+                continue
+            matched |= {i for i in candidates if fnmatch.fnmatchcase(self.paths[i], pattern)}
+        return matched
+
+    def _under(self, literal: str) -> Iterable[str]:
+        """Ids whose path lies in the deepest directory named by ``literal``."""
+        directory = literal.rsplit("/", 1)[0] if "/" in literal else ""
+        if literal.startswith("/") and not directory:
+            directory = "/"
+        if not directory:
+            return self.paths.keys()
+        return self.directories.get(directory, set())
+
+
+def _union(postings: Dict[str, Set[str]], values: Iterable[str]) -> Set[str]:
+    result: Set[str] = set()
+    for value in values:
+        result |= postings.get(value, set())
+    return result
+
+
+def _normalise_path(path: str) -> str:
+    return path.replace("\\", "/")
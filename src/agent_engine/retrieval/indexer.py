@@ -0,0 +1,177 @@
+"""Background index maintenance driven by a polling file watcher."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .shared_index import publish_snapshot
+
+if TYPE_CHECKING:
+    from .retriever import Retriever
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexerStats:
+    """Point-in-time view of background index health.
+
+    Attributes:
+        indexed_files: Files currently represented in the index
+        pending_files: Changed files detected but not yet committed
+        commits: Number of index updates committed
+        last_scan_at: Epoch seconds when the last poll finished
+        last_commit_at: Epoch seconds of the last committed update
+        lag_seconds: For the last commit, time between the start of the scan
+            that detected its changes and the moment they became searchable
+        freshness_seconds: Age of the newest snapshot known to match disk
+    """
+
+    indexed_files: int = 0
+    pending_files: int = 0
+    commits: int = 0
+    last_scan_at: Optional[float] = None
+    last_commit_at: Optional[float] = None
+    lag_seconds: float = 0.0
+    freshness_seconds: Optional[float] = None
+    errors: List[str] = field(default_factory=list)
+
+
+class BackgroundIndexer:
+    """Keep a Retriever's index current from a daemon thread.
+
+    The workspace is polled by comparing file mtimes (no inotify or other
+    platform watcher needed). Changed files are re-chunked, embedded and
+    committed in batches via ``Retriever.update_paths``. Once started, the
+    retriever's searches stop indexing inline and use whatever snapshot was
+    last committed.
+    """
+
+    def __init__(
+        self,
+        retriever: "Retriever",
+        poll_interval: float = 2.0,
+        batch_files: int = 64,
+        metrics_collector: Optional[Any] = None,
+        snapshot_path: Optional[str] = None,
+    ) -> None:
+        self.retriever = retriever
+        self.snapshot_path = snapshot_path
+        self.poll_interval = poll_interval
+        self.batch_files = max(1, batch_files)
+        self.metrics_collector = metrics_collector
+        self._known: Dict[str, float] = {}
+        self._stats = IndexerStats()
+        self._fresh_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Attach to the retriever and start polling in a daemon thread."""
+        if self.running:
+            return
+        self.retriever.indexer = self
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="agent-engine-indexer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling; the retriever goes back to indexing inline."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.retriever.indexer is self:
+            self.retriever.indexer = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as exc:  # pragma: no cover - keep the watcher alive
+                logger.warning("Background indexing failed: %s", exc)
+                with self._lock:
+                    self._stats.errors = (self._stats.errors + [str(exc)])[-10:]
+            self._stop.wait(self.poll_interval)
+
+    def poll_once(self) -> int:
+        """Scan the workspace once and commit any changes.
+
+        Returns:
+            Number of files re-indexed or removed
+        """
+        scan_started = time.time()
+        current = dict(self.retriever.iter_workspace_files())
+        changed = [p for p, mtime in current.items() if self._known.get(p) != mtime]
+        removed = [p for p in self._known if p not in current]
+        if not self._known:
+            # First pass: also drop files persisted by an earlier process that are gone now
+            removed.extend(p for p in self.retriever.indexed_paths() if p not in current)
+
+        with self._lock:
+            self._stats.pending_files = len(changed) + len(removed)
+
+        batches = [
+            changed[i:i + self.batch_files] for i in range(0, len(changed), self.batch_files)
+        ] or [[]]
+        for position, batch in enumerate(batches):
+            batch_removed = removed if position == 0 else []
+            if not batch and not batch_removed:
+                break
+            self.retriever.update_paths(batch, removed=batch_removed)
+            committed_at = time.time()
+            for path in batch:
+                self._known[path] = current[path]
+            for path in batch_removed:
+                self._known.pop(path, None)
+            with self._lock:
+                self._stats.commits += 1
+                self._stats.last_commit_at = committed_at
+                # File mtimes would measure how old the edit is, not indexing delay
+                self._stats.lag_seconds = max(0.0, committed_at - scan_started)
+                self._stats.pending_files = max(
+                    0, self._stats.pending_files - len(batch) - len(batch_removed)
+                )
+
+        self.retriever._indexed = True
+        if self.snapshot_path and (changed or removed or not os.path.exists(self.snapshot_path)):
+            publish_snapshot(self.retriever.store, self.snapshot_path)
+        now = time.time()
+        with self._lock:
+            self._fresh_at = scan_started
+            self._stats.last_scan_at = now
+            self._stats.indexed_files = len(self._known)
+        self._record_metrics()
+        return len(changed) + len(removed)
+
+    def stats(self) -> IndexerStats:
+        """Return a copy of the current stats with freshness computed now."""
+        with self._lock:
+            snapshot = IndexerStats(**{**self._stats.__dict__, "errors": list(self._stats.errors)})
+            if self._fresh_at is not None:
+                snapshot.freshness_seconds = max(0.0, time.time() - self._fresh_at)
+        return snapshot
+
+    def _record_metrics(self) -> None:
+        if self.metrics_collector is None:
+            return
+        stats = self.stats()
+        self.metrics_collector.record_gauge("retrieval_index_lag_seconds", stats.lag_seconds)
+        self.metrics_collector.record_gauge(
+            "retrieval_index_freshness_seconds", stats.freshness_seconds or 0.0
+        )
+        self.metrics_collector.record_gauge(
+            "retrieval_index_pending_files", float(stats.pending_files)
+        )
@@ -0,0 +1,195 @@
+"""Persistent BM25 inverted index and rank fusion helpers."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from agent_engine.utils.text_analysis import STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, expanding code identifiers.
+
+    ``parse_json_file`` and ``parseJsonFile`` both yield the full identifier
+    plus ``parse``, ``json`` and ``file`` so identifier-heavy queries match
+    either spelling.
+    """
+    terms: List[str] = []
+    for word in _WORD_RE.findall(text):
+        lower = word.lower()
+        parts = [p.lower() for piece in word.split("_") for p in _CAMEL_RE.findall(piece)]
+        if len(parts) > 1 or (parts and parts[0] != lower):
+            if lower not in STOP_WORDS and len(lower) > 1:
+                terms.append(lower)
+            terms.extend(p for p in parts if p not in STOP_WORDS and len(p) > 1)
+        elif lower not in STOP_WORDS and len(lower) > 1:
+            terms.append(lower)
+    return terms
+
+
+class BM25Index:
+    """Okapi BM25 inverted index with JSON persistence.
+
+    Postings map ``term -> {doc_id: term_frequency}``. Documents can be
+    replaced or removed individually, so the index can be maintained
+    incrementally alongside the vector store. Read-only users of a file
+    written by another process call ``refresh`` to pick up new versions.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.2, b: float = 0.75) -> None:
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+        self._loaded = False
+        # (inode, mtime_ns, size) of the file last read
+        self._file_identity: Optional[Tuple[int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.doc_lengths
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        self._read_file(self.path)
+
+    def refresh(self) -> bool:
+        """Reload the index if its file was replaced since it was last read.
+
+        Returns:
+            True if the file was reloaded
+        """
+        if not self.path:
+            return False
+        identity = _file_identity(self.path)
+        if identity is None or (self._loaded and identity == self._file_identity):
+            return False
+        self._loaded = True
+        self._read_file(self.path)
+        return True
+
+    def _read_file(self, path: str) -> None:
+        postings: Dict[str, Dict[str, int]] = {}
+        doc_lengths: Dict[str, int] = {}
+        doc_terms: Dict[str, List[str]] = {}
+        try:
+            identity = _file_identity(path)
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f) or {}
+            postings = {t: dict(p) for t, p in (raw.get("postings") or {}).items()}
+            doc_lengths = dict(raw.get("doc_lengths") or {})
+            for term, docs in postings.items():
+                for doc_id in docs:
+                    doc_terms.setdefault(doc_id, []).append(term)
+            self._file_identity = identity
+        except Exception as exc:
+            logger.warning("Failed to load lexical index %s: %s", path, exc)
+            postings, doc_lengths, doc_terms = {}, {}, {}
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self._doc_terms = doc_terms
+        self._total_length = sum(doc_lengths.values())
+
+    def persist(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"postings": self.postings, "doc_lengths": self.doc_lengths}, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index ``text`` under ``doc_id``, replacing any previous version."""
+        self.load()
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        terms = tokenize(text)
+        counts = Counter(terms)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self._doc_terms[doc_id] = list(counts)
+        self.doc_lengths[doc_id] = len(terms)
+        self._total_length += len(terms)
+
+    def remove(self, doc_id: str) -> bool:
+        self.load()
+        if doc_id not in self.doc_lengths:
+            return False
+        self._total_length -= self.doc_lengths.pop(doc_id)
+        for term in self._doc_terms.pop(doc_id, []):
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+        return True
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        candidates: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return ``(doc_id, score)`` pairs for the best ``top_k`` matches."""
+        self.load()
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        allowed = set(candidates) if candidates is not None else None
+        avg_len = (self._total_length / n_docs) or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1.0 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda kv: kv[1])
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists with reciprocal rank fusion (``sum 1 / (k + rank)``)."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
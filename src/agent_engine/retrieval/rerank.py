@@ -0,0 +1,159 @@
+"""Post-retrieval re-ranking: maximal marginal relevance and adjacent-chunk merging."""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from .retriever import RetrievalChunk
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def mmr_rerank(
+    chunks: Sequence[RetrievalChunk],
+    top_k: int,
+    lambda_mult: float = 0.5,
+    vectors: Optional[Mapping[str, Sequence[float]]] = None,
+) -> List[RetrievalChunk]:
+    """Select ``top_k`` chunks by maximal marginal relevance.
+
+    Each step picks the chunk maximising
+    ``lambda_mult * relevance - (1 - lambda_mult) * max_similarity_to_selected``.
+    Relevance is the chunk score scaled by the best score, so cosine, BM25
+    and RRF scores all land in ``[0, 1]``. Similarity is the cosine of the
+    stored vectors when both chunks have one in ``vectors``, otherwise the
+    Jaccard overlap of their words.
+
+    Args:
+        chunks: Candidates, typically over-fetched (e.g. ``3 * top_k``)
+        top_k: Number of chunks to keep
+        lambda_mult: 1.0 is pure relevance order, 0.0 is pure diversity
+        vectors: Optional ``chunk_id -> embedding`` for the candidates
+
+    Returns:
+        Selected chunks in selection order
+    """
+    candidates = list(chunks)
+    if top_k <= 0 or not candidates:
+        return []
+    if len(candidates) <= 1:
+        return candidates[:top_k]
+    vectors = vectors or {}
+    best = max(c.score for c in candidates)
+    relevance = [c.score / best if best > 0 else 0.0 for c in candidates]
+    words: Dict[int, set] = {}
+
+    def similarity(i: int, j: int) -> float:
+        a, b = vectors.get(candidates[i].chunk_id), vectors.get(candidates[j].chunk_id)
+        if a is not None and b is not None:
+            return _cosine(a, b)
+        wa = words.setdefault(i, set(_WORD_RE.findall(candidates[i].text.lower())))
+        wb = words.setdefault(j, set(_WORD_RE.findall(candidates[j].text.lower())))
+        union = len(wa | wb)
+        return len(wa & wb) / union if union else 0.0
+
+    selected: List[int] = []
+    # Highest similarity of each remaining candidate to anything selected so far
+    max_sim = [0.0] * len(candidates)
+    remaining = set(range(len(candidates)))
+    while remaining and len(selected) < top_k:
+        pick = max(
+            remaining,
+            key=lambda i: (lambda_mult * relevance[i] - (1.0 - lambda_mult) * max_sim[i], -i),
+        )
+        remaining.discard(pick)
+        selected.append(pick)
+        for i in remaining:
+            max_sim[i] = max(max_sim[i], similarity(i, pick))
+    return [candidates[i] for i in selected]
+
+
+def merge_adjacent_chunks(
+    chunks: Sequence[RetrievalChunk], max_gap: int = 1
+) -> List[RetrievalChunk]:
+    """Merge chunks of the same file whose line ranges overlap or nearly touch.
+
+    Overlapping lines (from chunk overlap) are emitted once. The merged chunk
+    keeps the best score and takes the position of its best-ranked part.
+
+    Args:
+        chunks: Ranked chunks; chunks without ``path``/line metadata pass through
+        max_gap: Largest number of unretrieved lines allowed between two
+            chunks for them to merge (the gap itself is not filled in)
+    """
+    groups: Dict[str, List[int]] = {}
+    for idx, chunk in enumerate(chunks):
+        meta = chunk.metadata
+        if meta.get("path") and meta.get("start_line") and meta.get("end_line"):
+            groups.setdefault(meta["path"], []).append(idx)
+
+    merged_into: Dict[int, RetrievalChunk] = {}
+    absorbed: set = set()
+    for indices in groups.values():
+        ordered = sorted(indices, key=lambda i: chunks[i].metadata["start_line"])
+        run = [ordered[0]]
+        for idx in ordered[1:]:
+            prev_end = max(chunks[i].metadata["end_line"] for i in run)
+            if chunks[idx].metadata["start_line"] <= prev_end + max_gap + 1:
+                run.append(idx)
+            else:
+                _flush(chunks, run, merged_into, absorbed)
+                run = [idx]
+        _flush(chunks, run, merged_into, absorbed)
+
+    result: List[RetrievalChunk] = []
+    for idx, chunk in enumerate(chunks):
+        if idx in absorbed:
+            continue
+        result.append(merged_into.get(idx, chunk))
+    return result
+
+
+def _flush(
+    chunks: Sequence[RetrievalChunk],
+    run: List[int],
+    merged_into: Dict[int, RetrievalChunk],
+    absorbed: set,
+) -> None:
+    if len(run) < 2:
+        return
+    lines: List[str] = []
+    covered_to = 0
+    for idx in run:
+        meta = chunks[idx].metadata
+        start = meta["start_line"]
+        chunk_lines = chunks[idx].text.splitlines()
+        if lines and start <= covered_to:
+            chunk_lines = chunk_lines[covered_to - start + 1:]
+        elif lines and start > covered_to + 1:
+            # Mark the lines skipped between the chunks
+            lines.append("...")
+        lines.extend(chunk_lines)
+        covered_to = max(covered_to, meta["end_line"])
+
+    # The merged chunk sits where its best-ranked part was
+    lead = min(run)
+    metadata = dict(chunks[lead].metadata)
+    metadata["start_line"] = min(chunks[i].metadata["start_line"] for i in run)
+    metadata["end_line"] = covered_to
+    metadata["merged_chunk_ids"] = [chunks[i].chunk_id for i in run]
+    merged_into[lead] = RetrievalChunk(
+        chunk_id=f"{metadata['path']}:{metadata['start_line']}-{covered_to}",
+        text="\n".join(lines),
+        score=max(chunks[i].score for i in run),
+        metadata=metadata,
+    )
+    absorbed.update(i for i in run if i != lead)
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
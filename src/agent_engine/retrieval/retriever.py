@@ -4,16 +4,43 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
+from agent_engine.utils.workspace_scanner import WorkspaceScanner, get_workspace_scanner
+
+from .cache import CachedEmbeddingProvider, EmbeddingCache
+from .chunking import Chunker
 from .embedder import EmbeddingProvider
-from .vector_store import SimpleVectorStore
+from .filters import MetadataFilter
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .sharded_store import ShardedVectorStore
+from .shared_index import SharedIndexReader
+from .vector_store import SimpleVectorStore, StoredVector
+
+if TYPE_CHECKING:
+    from .indexer import BackgroundIndexer
 
 logger = logging.getLogger(__name__)
 
+# Bytes sniffed for NUL before a file is read in full
+_BINARY_SNIFF_BYTES = 8192
+
 
 @dataclass
 class RetrievalDocument:
@@ -37,61 +64,268 @@ class Retriever:
         self,
         workspace_root: str,
         embedder: EmbeddingProvider,
-        store: SimpleVectorStore,
+        store: SimpleVectorStore | ShardedVectorStore | SharedIndexReader,
         chunk_size: int = 1200,
         chunk_overlap: int = 200,
         include_extensions: Optional[Sequence[str]] = None,
         max_file_kb: int = 512,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        lexical_index: Optional[BM25Index] = None,
+        fusion_k: int = 60,
+        lexical_candidates: int = 50,
+        chunker: Optional[Chunker] = None,
+        project_id: Optional[str] = None,
+        read_workers: Optional[int] = None,
+        respect_gitignore: bool = True,
+        telemetry: Optional[Any] = None,
+        progress_every: int = 500,
     ) -> None:
         self.workspace_root = workspace_root
+        # Recorded on every chunk so shared or sharded stores can separate projects
+        self.project_id = project_id
+        # Wrap the provider so indexing, queries and memory scoring share one cache
+        if embedding_cache is not None and not isinstance(embedder, CachedEmbeddingProvider):
+            embedder = CachedEmbeddingProvider(embedder, embedding_cache)
         self.embedder = embedder
         self.store = store
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.chunker = chunker or Chunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
         self.include_extensions = set(include_extensions or [".py", ".md", ".txt", ".json", ".yaml", ".yml"])
         self.max_file_kb = max_file_kb
+        # File reads are I/O bound, so a thread pool overlaps them despite the GIL
+        self.read_workers = max(1, read_workers or min(8, (os.cpu_count() or 1) + 4))
+        self.respect_gitignore = respect_gitignore
+        self.scanner = (
+            get_workspace_scanner(workspace_root)
+            if respect_gitignore
+            else WorkspaceScanner(workspace_root, respect_gitignore=False)
+        )
+        self.telemetry = telemetry
+        self.progress_every = max(1, progress_every)
+        self.lexical_index = lexical_index if lexical_index is not None else BM25Index()
+        self.fusion_k = fusion_k
+        self.lexical_candidates = lexical_candidates
+        # Set by BackgroundIndexer.start(); searches then never index inline
+        self.indexer: Optional["BackgroundIndexer"] = None
         self._indexed = False
+        self._path_ids: Optional[Dict[str, List[str]]] = None
+        self._write_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
 
     def index_workspace(self) -> None:
         """Index workspace files into the vector store (idempotent per process)."""
         if self._indexed:
             return
-        documents = []
-        for root, _, files in os.walk(self.workspace_root):
-            for fname in files:
-                if not self._is_allowed_file(fname):
-                    continue
-                fpath = os.path.join(root, fname)
-                if os.path.getsize(fpath) > self.max_file_kb * 1024:
-                    continue
-                try:
-                    with open(fpath, "r", encoding="utf-8", errors="ignore") as f:
-                        text = f.read()
-                except Exception:
-                    continue
-                documents.extend(self._chunk_text(text, fpath))
+        paths = [path for path, _ in self.iter_workspace_files()]
+        on_disk = set(paths)
+        removed = [p for p in self.indexed_paths() if p not in on_disk]
+        self.update_paths(paths, removed=removed)
+        self._indexed = True
+
+    def iter_workspace_files(self) -> Iterator[Tuple[str, float]]:
+        """Yield ``(path, mtime)`` for every indexable workspace file.
+
+        Files come from the shared ``WorkspaceScanner``: hidden and
+        ``SKIP_DIRS`` directories and ``.gitignore`` matches are pruned, and
+        unchanged directories are served from cached snapshots. Extension and
+        size checks use the scanned stats, so nothing is opened here.
+        """
+        max_bytes = self.max_file_kb * 1024
+        # Fresh stats: a file edited in place must be re-indexed
+        for scanned in self.scanner.scan(fresh_stats=True):
+            if scanned.size > max_bytes or not self._is_allowed_file(scanned.rel_path):
+                continue
+            yield os.path.join(self.workspace_root, *scanned.rel_path.split("/")), scanned.mtime
+
+    def update_paths(self, paths: Iterable[str], removed: Iterable[str] = ()) -> int:
+        """Re-index ``paths`` and drop ``removed`` from the index.
+
+        Chunking and embedding run before the commit lock is taken, so
+        concurrent searches keep using the previous snapshot until the new
+        vectors are swapped in.
 
-        if not documents:
-            self._indexed = True
+        Returns:
+            Number of chunks written
+        """
+        paths = list(paths)
+        removed = list(removed)
+        with self._write_lock:
+            documents = self._read_documents(paths)
+
+            path_ids = self._ids_by_path()
+            stale: List[str] = []
+            for path in set(paths) | set(removed):
+                stale.extend(path_ids.pop(path, []))
+
+            # Chunks whose text is unchanged keep their existing vectors
+            reusable: Dict[str, Sequence[float]] = {}
+            for vector_id in stale:
+                old = self.store.get(vector_id)
+                if old is not None and old.metadata.get("content_hash"):
+                    reusable[old.metadata["content_hash"]] = old.values
+            vectors: List[Optional[Sequence[float]]] = [
+                reusable.get(doc.metadata.get("content_hash", "")) for doc in documents
+            ]
+            to_embed = [i for i, vec in enumerate(vectors) if vec is None]
+            if to_embed:
+                embeddings = self.embedder.embed([documents[i].text for i in to_embed])
+                if len(embeddings) != len(to_embed):
+                    logger.warning(
+                        "Embedding provider returned %s vectors for %s chunks; "
+                        "index may be incomplete",
+                        len(embeddings),
+                        len(to_embed),
+                    )
+                for i, emb in zip(to_embed, embeddings):
+                    vectors[i] = emb
+            additions = [
+                StoredVector(vector_id=doc.doc_id, values=vec, metadata=doc.metadata)
+                for doc, vec in zip(documents, vectors)
+                if vec is not None
+            ]
+            indexed_docs = [doc for doc, vec in zip(documents, vectors) if vec is not None]
+            for vec in additions:
+                path_ids.setdefault(vec.metadata["path"], []).append(vec.vector_id)
+
+            with self._commit_lock:
+                self.store.replace(stale, additions)
+                for doc_id in stale:
+                    self.lexical_index.remove(doc_id)
+                for doc in indexed_docs:
+                    self.lexical_index.add(doc.doc_id, doc.text)
+
+            if stale or additions:
+                self.lexical_index.persist()
+                self.store.persist()
+            return len(additions)
+
+    def _read_documents(self, paths: List[str]) -> List[RetrievalDocument]:
+        """Read and chunk ``paths`` on a thread pool, reporting progress to telemetry."""
+        started = time.time()
+        stats = {"files": len(paths), "read": 0, "skipped_binary": 0, "bytes": 0, "chunks": 0}
+        documents: List[RetrievalDocument] = []
+        workers = min(self.read_workers, len(paths))
+        pool = (
+            ThreadPoolExecutor(workers, thread_name_prefix="agent-engine-read")
+            if workers > 1
+            else None
+        )
+        try:
+            # map() keeps path order, so chunk order stays deterministic
+            loader = pool.map if pool else map
+            loaded = loader(self._load_documents, paths)
+            for done, (docs, size) in enumerate(loaded, 1):
+                if size is None:
+                    stats["skipped_binary"] += 1
+                else:
+                    stats["read"] += 1
+                    stats["bytes"] += size
+                stats["chunks"] += len(docs)
+                documents.extend(docs)
+                if done % self.progress_every == 0 and done < len(paths):
+                    self._emit_index_event("retrieval_index_progress", stats, done, started)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if paths:
+            self._emit_index_event("retrieval_index_read", stats, len(paths), started)
+        return documents
+
+    def _load_documents(self, path: str) -> Tuple[List[RetrievalDocument], Optional[int]]:
+        """Chunk one file; returns ``(documents, bytes read)`` with None bytes for binary files."""
+        try:
+            with open(path, "rb") as f:
+                head = f.read(_BINARY_SNIFF_BYTES)
+                if b"\x00" in head:
+                    return [], None
+                data = head + f.read()
+        except OSError:
+            return [], 0
+        return self._chunk_text(data.decode("utf-8", errors="ignore"), path), len(data)
+
+    def _emit_index_event(
+        self, name: str, stats: Dict[str, int], done: int, started: float
+    ) -> None:
+        if self.telemetry is None:
             return
+        elapsed = max(time.time() - started, 1e-9)
+        self.telemetry.emit_event(name, {
+            **stats,
+            "done": done,
+            "elapsed_ms": int(elapsed * 1000),
+            "files_per_sec": round(done / elapsed, 1),
+            "mb_per_sec": round(stats["bytes"] / elapsed / (1024 * 1024), 2),
+        })
 
-        embeddings = self.embedder.embed([d.text for d in documents])
-        for doc, emb in zip(documents, embeddings):
-            self.store.add(doc.doc_id, emb, doc.metadata)
-        self.store.persist()
-        self._indexed = True
+    def indexed_paths(self) -> List[str]:
+        """Paths that currently have chunks in the index."""
+        return list(self._ids_by_path())
 
-    def search(self, query: str, top_k: int = 5) -> List[RetrievalChunk]:
-        """Search the vector store with a query string."""
-        self.index_workspace()
+    def _ids_by_path(self) -> Dict[str, List[str]]:
+        if self._path_ids is None:
+            self.store.load()
+            path_ids: Dict[str, List[str]] = {}
+            for vec in self.store.vectors:
+                if self.project_id and vec.metadata.get("project_id") != self.project_id:
+                    continue
+                path = vec.metadata.get("path")
+                if path:
+                    path_ids.setdefault(path, []).append(vec.vector_id)
+            self._path_ids = path_ids
+        return self._path_ids
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        policy: str = "semantic",
+        filters: Optional[MetadataFilter | Dict[str, Any]] = None,
+    ) -> List[RetrievalChunk]:
+        """Search indexed chunks with a query string.
+
+        Args:
+            query: Query text
+            top_k: Number of chunks to return
+            policy: "semantic" (vector only), "lexical" (BM25 only) or
+                "hybrid" (BM25 prefilter + vector scoring, fused with RRF)
+            filters: Optional MetadataFilter (or mapping of its fields).
+                Relative path globs are resolved against the workspace root.
+                Matching ids are selected before any scoring.
+
+        Returns:
+            Chunks ordered by descending score
+        """
+        # Read-only stores (shared snapshots) are kept current by another process,
+        # which also rewrites the lexical index file
+        if getattr(self.store, "read_only", False):
+            if policy != "semantic":
+                with self._commit_lock:
+                    self.lexical_index.refresh()
+        elif self.indexer is None:
+            self.index_workspace()
         start = time.time()
-        q_embeds = self.embedder.embed([query])
-        if not q_embeds:
+        allowed = self._allowed_ids(filters)
+        if allowed is not None and not allowed:
             return []
-        results = self.store.search(q_embeds[0], top_k=top_k)
+        if policy == "lexical":
+            with self._commit_lock:
+                ranked = self.lexical_index.search(query, top_k=top_k, candidates=allowed)
+            results: Sequence[Optional[Dict[str, Any]]] = [
+                self._result_for(doc_id, score) for doc_id, score in ranked
+            ]
+        elif policy == "hybrid":
+            results = self._hybrid_search(query, top_k, allowed)
+        else:
+            q_embeds = self.embedder.embed([query])
+            if not q_embeds:
+                return []
+            results = self.store.search(q_embeds[0], top_k=top_k, ids=allowed)
         latency_ms = int((time.time() - start) * 1000)
         chunks: List[RetrievalChunk] = []
         for res in results:
+            if res is None:
+                continue
             chunks.append(
                 RetrievalChunk(
                     chunk_id=res["id"],
@@ -103,62 +337,129 @@ class Retriever:
         # Attach latency info on chunks metadata for downstream use
         for chunk in chunks:
             chunk.metadata.setdefault("retrieval_latency_ms", latency_ms)
+            chunk.metadata.setdefault("retrieval_policy", policy)
         return chunks
 
+    def _allowed_ids(
+        self, filters: Optional[MetadataFilter | Dict[str, Any]]
+    ) -> Optional[Set[str]]:
+        flt = MetadataFilter.from_value(filters)
+        if flt is None or flt.is_empty():
+            return None
+        globs = [
+            g if os.path.isabs(g) else os.path.join(self.workspace_root, g) for g in flt.path_globs
+        ]
+        resolved = MetadataFilter(
+            path_globs=globs,
+            extensions=flt.extensions,
+            sources=flt.sources,
+            tags=flt.tags,
+            projects=flt.projects,
+        )
+        with self._commit_lock:
+            return self.store.filter_ids(resolved)
+
+    def _hybrid_search(
+        self, query: str, top_k: int, allowed: Optional[Set[str]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Fuse BM25 and vector rankings with reciprocal rank fusion.
+
+        The vector scorer only sees the lexical candidates when there are at
+        least ``top_k`` of them; otherwise it falls back to scanning every
+        allowed vector so purely semantic matches are not lost.
+        """
+        with self._commit_lock:
+            lexical = self.lexical_index.search(
+                query, top_k=max(self.lexical_candidates, top_k), candidates=allowed
+            )
+        lexical_ids = [doc_id for doc_id, _ in lexical]
+        q_embeds = self.embedder.embed([query])
+        vector_results: List[Dict[str, Any]] = []
+        if q_embeds:
+            ids = lexical_ids if len(lexical_ids) >= top_k else allowed
+            vector_results = self.store.search(
+                q_embeds[0], top_k=max(len(lexical_ids), top_k), ids=ids
+            )
+        vector_scores = {r["id"]: r["score"] for r in vector_results}
+        lexical_scores = dict(lexical)
+        fused = reciprocal_rank_fusion(
+            [lexical_ids, [r["id"] for r in vector_results]], k=self.fusion_k
+        )
+        results: List[Optional[Dict[str, Any]]] = []
+        for doc_id, score in fused[:top_k]:
+            res = self._result_for(doc_id, score)
+            if res is None:
+                continue
+            res["metadata"] = dict(
+                res["metadata"],
+                vector_score=vector_scores.get(doc_id),
+                lexical_score=lexical_scores.get(doc_id),
+            )
+            results.append(res)
+        return results
+
+    def vectors_for(self, ids: Iterable[str]) -> Dict[str, Sequence[float]]:
+        """Return stored embeddings for ``ids`` (missing ids are skipped)."""
+        vectors: Dict[str, Sequence[float]] = {}
+        for doc_id in ids:
+            stored = self.store.get(doc_id)
+            if stored is not None:
+                vectors[doc_id] = stored.values
+        return vectors
+
+    def _result_for(self, doc_id: str, score: float) -> Optional[Dict[str, Any]]:
+        stored = self.store.get(doc_id)
+        if stored is None:
+            return None
+        return {"id": doc_id, "score": score, "metadata": stored.metadata}
+
     def _is_allowed_file(self, filename: str) -> bool:
         _, ext = os.path.splitext(filename)
         return ext.lower() in self.include_extensions
 
     def _chunk_text(self, text: str, path: str) -> List[RetrievalDocument]:
-        """Chunk text by characters with overlap, including line references."""
-        chunks: List[RetrievalDocument] = []
-        lines = text.splitlines()
-        current: List[str] = []
-        start_line = 1
-        i = 0
-        while i < len(lines):
-            current.append(lines[i])
-            if sum(len(l) for l in current) >= self.chunk_size:
-                end_line = i + 1
-                chunk_text = "\n".join(current)
-                chunks.append(
-                    RetrievalDocument(
-                        doc_id=f"{path}:{start_line}-{end_line}",
-                        text=chunk_text,
-                        metadata={
-                            "path": path,
-                            "start_line": start_line,
-                            "end_line": end_line,
-                            "text": chunk_text,
-                        },
-                    )
-                )
-                # overlap
-                overlap_lines = self.chunk_overlap // max(len(current[0]) or 1, 1)
-                current = current[-overlap_lines:] if overlap_lines > 0 else []
-                start_line = end_line - len(current)
-            i += 1
-
-        if current:
-            end_line = len(lines)
-            chunk_text = "\n".join(current)
-            chunks.append(
+        """Chunk text with the configured chunker, including line references."""
+        documents: List[RetrievalDocument] = []
+        for chunk in self.chunker.chunk(text, path):
+            metadata: Dict[str, Any] = {
+                "path": path,
+                "source": "file",
+                "start_line": chunk.start_line,
+                "end_line": chunk.end_line,
+                "text": chunk.text,
+                "chunk_kind": chunk.kind,
+                "content_hash": chunk.content_hash,
+            }
+            if chunk.name:
+                metadata["symbol"] = chunk.name
+            if self.project_id:
+                metadata["project_id"] = self.project_id
+            documents.append(
                 RetrievalDocument(
-                    doc_id=f"{path}:{start_line}-{end_line}",
-                    text=chunk_text,
-                    metadata={
-                        "path": path,
-                        "start_line": start_line,
-                        "end_line": end_line,
-                        "text": chunk_text,
-                    },
+                    doc_id=f"{path}:{chunk.start_line}-{chunk.end_line}",
+                    text=chunk.text,
+                    metadata=metadata,
                 )
             )
-        return chunks
+        return documents
+
 
+def embed_memory_items(
+    embedder: EmbeddingProvider,
+    items: List[Dict[str, Any]],
+    query: str,
+    top_k: int = 3,
+    filters: Optional[MetadataFilter | Dict[str, Any]] = None,
+) -> List[RetrievalChunk]:
+    """Compute relevance of memory items on the fly.
 
-def embed_memory_items(embedder: EmbeddingProvider, items: List[Dict[str, Any]], query: str, top_k: int = 3) -> List[RetrievalChunk]:
-    """Compute relevance of memory items on the fly."""
+    Memory items have no path, so only the ``sources`` and ``tags`` parts of
+    ``filters`` apply; non-matching items are dropped before embedding.
+    """
+    flt = MetadataFilter.from_value(filters)
+    if flt is not None and (flt.sources or flt.tags):
+        item_filter = MetadataFilter(sources=flt.sources, tags=flt.tags)
+        items = [i for i in items if item_filter.matches(i)]
     if not items:
         return []
     texts = [_stringify_payload(i) for i in items]
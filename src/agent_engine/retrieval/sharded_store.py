@@ -0,0 +1,396 @@
+"""Vector index split into per-project, per-directory shards searched in parallel."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .filters import MetadataFilter
+from .vector_store import SimpleVectorStore, StoredVector
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "shards.json"
+SEARCH_EXECUTORS = ("thread", "process")
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+class ShardedVectorStore:
+    """A drop-in replacement for ``SimpleVectorStore`` that splits the index.
+
+    Each vector is assigned to a shard named ``<project>/<top-level dir>``
+    (see ``shard_key``). Shards are separate ``SimpleVectorStore`` files
+    under ``root_dir``, loaded on first use and kept in an LRU of at most
+    ``max_open_shards``; evicted shards are persisted first if dirty.
+
+    Searches fan out to the shards that can match (``MetadataFilter``
+    projects and path globs prune whole shards) and merge each shard's
+    top-k. With ``executor="thread"`` shards are searched by a thread pool
+    in this process. Pure-Python scoring holds the GIL, so for CPU scaling
+    use ``executor="process"``: persisted shards are then searched by a
+    process pool whose workers cache the shards they have loaded, and this
+    process never loads them at all.
+
+    Args:
+        root_dir: Directory holding the shard files and ``shards.json``
+        workspace_root: Paths are sharded by their first component relative
+            to this directory
+        max_open_shards: Shards kept loaded in memory (per process)
+        max_workers: Parallel shard searches (default: CPU count)
+        quantization: Passed to every shard's ``SimpleVectorStore``
+        executor: "thread" or "process"
+        shard_key: Optional ``metadata -> shard name`` override
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        workspace_root: Optional[str] = None,
+        max_open_shards: int = 8,
+        max_workers: Optional[int] = None,
+        quantization: Optional[str] = None,
+        executor: str = "thread",
+        shard_key: Optional[Callable[[Dict[str, Any]], str]] = None,
+    ) -> None:
+        if executor not in SEARCH_EXECUTORS:
+            raise ValueError(
+                f"Invalid executor '{executor}'. Must be one of: {list(SEARCH_EXECUTORS)}"
+            )
+        self.root_dir = root_dir
+        self.path = os.path.join(root_dir, MANIFEST_NAME)
+        self.workspace_root = workspace_root
+        self.max_open_shards = max(1, max_open_shards)
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.quantization = quantization
+        self.executor = executor
+        self._shard_key = shard_key or self.shard_key
+        self._files: Dict[str, str] = {}
+        self._open: "OrderedDict[str, SimpleVectorStore]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self._pool: Optional[Executor] = None
+        self._loaded = False
+
+    # --- sharding ---------------------------------------------------------
+
+    def shard_key(self, metadata: Dict[str, Any]) -> str:
+        """Default shard name: ``<project_id or "default">/<top-level dir>``."""
+        project = str(metadata.get("project_id") or "default")
+        return f"{project}/{self._top_dir(metadata.get('path'))}"
+
+    def _top_dir(self, path: Optional[str]) -> str:
+        if not path:
+            return "_misc"
+        rel = str(path)
+        if self.workspace_root:
+            try:
+                rel = os.path.relpath(rel, self.workspace_root)
+            except ValueError:
+                pass
+        parts = rel.replace("\\", "/").lstrip("/").split("/")
+        if len(parts) < 2 or parts[0] == "..":
+            return "_root"
+        return parts[0]
+
+    def shard_names(self) -> List[str]:
+        self.load()
+        return sorted(self._files)
+
+    # --- persistence --------------------------------------------------------
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._files = dict((json.load(f) or {}).get("shards") or {})
+                except Exception as exc:
+                    logger.warning("Failed to load shard manifest %s: %s", self.path, exc)
+            self._loaded = True
+
+    def persist(self) -> None:
+        with self._lock:
+            for name in sorted(self._dirty):
+                store = self._open.get(name)
+                if store is not None:
+                    store.persist()
+            self._dirty.clear()
+            self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        os.makedirs(self.root_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"shards": self._files}, f)
+        os.replace(tmp_path, self.path)
+
+    def _shard_path(self, name: str) -> str:
+        return os.path.join(self.root_dir, self._files[name])
+
+    def _shard(self, name: str, create: bool = False) -> Optional[SimpleVectorStore]:
+        """Return the loaded shard, loading it (and evicting the LRU shard) if needed."""
+        self.load()
+        with self._lock:
+            store = self._open.get(name)
+            if store is not None:
+                self._open.move_to_end(name)
+                return store
+            if name not in self._files:
+                if not create:
+                    return None
+                digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+                self._files[name] = f"{_UNSAFE_CHARS.sub('_', name)}-{digest}.json"
+            store = SimpleVectorStore(self._shard_path(name), quantization=self.quantization)
+            store.load()
+            self._open[name] = store
+            while len(self._open) > self.max_open_shards:
+                evicted, old = self._open.popitem(last=False)
+                if evicted in self._dirty:
+                    old.persist()
+                    self._dirty.discard(evicted)
+                    self._write_manifest()
+            return store
+
+    # --- SimpleVectorStore interface ---------------------------------------
+
+    @property
+    def vectors(self) -> Iterator[StoredVector]:
+        """Iterate every vector in every shard (loads shards one at a time)."""
+        for name in self.shard_names():
+            store = self._shard(name)
+            if store is not None:
+                yield from list(store.vectors)
+
+    def add(self, vector_id: str, values: List[float], metadata: Dict[str, Any]) -> None:
+        self.replace([], [StoredVector(vector_id=vector_id, values=values, metadata=metadata)])
+
+    def replace(self, remove_ids: Iterable[str], additions: Iterable[StoredVector]) -> None:
+        """Apply removals and additions shard by shard."""
+        additions = list(additions)
+        by_shard: Dict[str, List[StoredVector]] = {}
+        for vec in additions:
+            by_shard.setdefault(self._shard_key(vec.metadata), []).append(vec)
+        # Re-added ids are dropped by their own shard's replace()
+        removals: Dict[str, List[str]] = {}
+        for vector_id in remove_ids:
+            name = self._locate(vector_id)
+            if name is not None:
+                removals.setdefault(name, []).append(vector_id)
+        with self._lock:
+            for name in set(by_shard) | set(removals):
+                store = self._shard(name, create=name in by_shard)
+                if store is None:
+                    continue
+                store.replace(removals.get(name, []), by_shard.get(name, []))
+                self._dirty.add(name)
+
+    def get(self, vector_id: str) -> Optional[StoredVector]:
+        name = self._locate(vector_id)
+        if name is None:
+            return None
+        store = self._shard(name)
+        return store.get(vector_id) if store is not None else None
+
+    def _locate(self, vector_id: str) -> Optional[str]:
+        """Find the shard holding ``vector_id``.
+
+        Checks open shards, then the shards implied by a ``<path>:<lines>``
+        id (the Retriever's format). Only a custom ``shard_key`` breaks that
+        implication, so only then are all remaining shards scanned.
+        """
+        self.load()
+        with self._lock:
+            for name, store in self._open.items():
+                if store.get(vector_id) is not None:
+                    return name
+            path = vector_id.rsplit(":", 1)[0]
+            for name in self._files:
+                if name in self._open:
+                    continue
+                if name.endswith("/" + self._top_dir(path)):
+                    shard = self._shard(name)
+                    if shard is not None and shard.get(vector_id) is not None:
+                        return name
+            if self._shard_key == self.shard_key:
+                return None
+            for name in list(self._files):
+                if name in self._open:
+                    continue
+                shard = self._shard(name)
+                if shard is not None and shard.get(vector_id) is not None:
+                    return name
+        return None
+
+    def filter_ids(self, filters: MetadataFilter) -> Set[str]:
+        ids: Set[str] = set()
+        for name in self._candidate_shards(filters):
+            store = self._shard(name)
+            if store is not None:
+                ids |= store.filter_ids(filters)
+        return ids
+
+    def search(
+        self,
+        query: List[float],
+        top_k: int = 5,
+        ids: Optional[Iterable[str]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[Dict[str, Any]]:
+        """Search candidate shards in parallel and merge their top-k."""
+        if not query:
+            return []
+        id_set = set(ids) if ids is not None else None
+        shards = self._candidate_shards(filters)
+        if not shards:
+            return []
+        results: List[Dict[str, Any]] = []
+        for shard_results in self._map_shards(shards, query, top_k, id_set, filters):
+            results.extend(shard_results)
+        return heapq.nlargest(top_k, results, key=lambda r: r["score"])
+
+    def _candidate_shards(self, filters: Optional[MetadataFilter]) -> List[str]:
+        names = self.shard_names()
+        if filters is None:
+            return names
+        if filters.projects:
+            names = [n for n in names if n.split("/", 1)[0] in filters.projects]
+        top_dirs = self._glob_top_dirs(filters.path_globs)
+        if top_dirs is not None:
+            names = [n for n in names if n.split("/", 1)[-1] in top_dirs]
+        return names
+
+    def _glob_top_dirs(self, globs: Sequence[str]) -> Optional[Set[str]]:
+        """Top-level directories the globs are confined to, or None if unconfined."""
+        if not globs:
+            return None
+        top_dirs: Set[str] = set()
+        for pattern in globs:
+            literal = _GLOB_CHARS.split(pattern, 1)[0]
+            if literal == pattern:
+                # A plain directory or file path
+                literal = pattern.rstrip("/") + "/"
+            if "/" not in literal:
+                return None
+            directory = literal.rsplit("/", 1)[0]
+            top = self._top_dir(directory + "/x")
+            if top in ("_root", "_misc"):
+                return None
+            top_dirs.add(top)
+        return top_dirs
+
+    # --- parallel search ---------------------------------------------------
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            if self.executor == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="agent-engine-shard"
+                )
+        return self._pool
+
+    def _map_shards(
+        self,
+        shards: List[str],
+        query: List[float],
+        top_k: int,
+        ids: Optional[Set[str]],
+        filters: Optional[MetadataFilter],
+    ) -> Iterator[List[Dict[str, Any]]]:
+        if len(shards) == 1:
+            store = self._shard(shards[0])
+            yield store.search(query, top_k, ids=ids, filters=filters) if store else []
+            return
+        pool = self._executor()
+        futures = []
+        for name in shards:
+            with self._lock:
+                local = self.executor == "thread" or name in self._dirty
+            if local:
+                futures.append(pool.submit(self._search_local, name, query, top_k, ids, filters))
+                continue
+            path = self._shard_path(name)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            futures.append(
+                pool.submit(
+                    _search_shard_file,
+                    path,
+                    mtime_ns,
+                    self.quantization,
+                    self.max_open_shards,
+                    query,
+                    top_k,
+                    ids,
+                    filters,
+                )
+            )
+        for future in futures:
+            try:
+                yield future.result()
+            except Exception as exc:
+                logger.warning("Shard search failed: %s", exc)
+
+    def _search_local(
+        self,
+        name: str,
+        query: List[float],
+        top_k: int,
+        ids: Optional[Set[str]],
+        filters: Optional[MetadataFilter],
+    ) -> List[Dict[str, Any]]:
+        store = self._shard(name)
+        return store.search(query, top_k, ids=ids, filters=filters) if store else []
+
+    def close(self) -> None:
+        """Persist dirty shards and shut the search pool down."""
+        self.persist()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+# Shards cached by each search worker process, keyed by (path, mtime)
+_WORKER_SHARDS: "OrderedDict[Tuple[str, int], SimpleVectorStore]" = OrderedDict()
+
+
+def _search_shard_file(
+    path: str,
+    mtime_ns: int,
+    quantization: Optional[str],
+    max_open: int,
+    query: List[float],
+    top_k: int,
+    ids: Optional[Set[str]],
+    filters: Optional[MetadataFilter],
+) -> List[Dict[str, Any]]:
+    key = (path, mtime_ns)
+    store = _WORKER_SHARDS.get(key)
+    if store is None:
+        for stale in [k for k in _WORKER_SHARDS if k[0] == path]:
+            del _WORKER_SHARDS[stale]
+        store = SimpleVectorStore(path, quantization=quantization)
+        store.load()
+        _WORKER_SHARDS[key] = store
+        while len(_WORKER_SHARDS) > max(1, max_open):
+            _WORKER_SHARDS.popitem(last=False)
+    else:
+        _WORKER_SHARDS.move_to_end(key)
+    return store.search(query, top_k, ids=ids, filters=filters)
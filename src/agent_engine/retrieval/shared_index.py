@@ -0,0 +1,266 @@
+"""Read-only vector index snapshots shared between processes through mmap.
+
+One process (the indexer) publishes a snapshot file; any number of worker
+processes attach to it with ``SharedIndexReader``. Readers memory-map the
+file and score vectors straight from the mapping, so the vectors live once
+in the host's page cache instead of once per worker.
+
+Snapshot layout (little-endian)::
+
+    header   magic "AEVS", version, count, dim, directory offset, directory length
+    vectors  count * dim float32
+    norms    count float32
+    records  full metadata of each vector as JSON, concatenated
+    directory JSON: ids, filterable metadata and (offset, length) of each record
+
+A new snapshot is written to a temporary file and moved into place with
+``os.replace``, so readers see either the old or the new snapshot. Readers
+notice the swap by the file's inode/mtime and remap on their next search.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import mmap
+import operator
+import os
+import struct
+import threading
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Set
+
+from .filters import MetadataFilter, MetadataIndex
+from .vector_store import StoredVector, _norm
+
+logger = logging.getLogger(__name__)
+
+SHARED_INDEX_MODES = ("publish", "attach")
+
+_MAGIC = b"AEVS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIIQQ")
+# Metadata fields kept in the directory so filters work without decoding records
+_FILTER_FIELDS = ("path", "source", "tags", "project_id")
+
+
+class SnapshotSource(Protocol):
+    """What ``publish_snapshot`` reads: a simple or sharded vector store."""
+
+    def load(self) -> None: ...
+
+    @property
+    def vectors(self) -> Iterable[StoredVector]: ...
+
+
+def publish_snapshot(store: SnapshotSource, path: str) -> int:
+    """Write ``store`` as a shared snapshot at ``path`` and swap it in atomically.
+
+    Args:
+        store: Store to snapshot (vectors with a different dimension than the
+            first one are skipped)
+        path: Snapshot file path
+
+    Returns:
+        Number of vectors published
+    """
+    store.load()
+    vectors = list(store.vectors)
+    dim = len(vectors[0].values) if vectors else 0
+    kept = [v for v in vectors if len(v.values) == dim]
+    if len(kept) != len(vectors):
+        logger.warning(
+            "Skipping %s vectors whose dimension differs from %s", len(vectors) - len(kept), dim
+        )
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    matrix_offset = _HEADER.size
+    records_offset = matrix_offset + 4 * dim * len(kept) + 4 * len(kept)
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        norms = array("f")
+        for vec in kept:
+            values = vec.values if isinstance(vec.values, array) else array("f", vec.values)
+            f.write(values.tobytes())
+            norms.append(vec.norm or _norm(values))
+        f.write(norms.tobytes())
+
+        records = []
+        position = records_offset
+        for vec in kept:
+            blob = json.dumps(vec.metadata).encode("utf-8")
+            f.write(blob)
+            records.append((position, len(blob)))
+            position += len(blob)
+        directory_blob = json.dumps(
+            {
+                "ids": [v.vector_id for v in kept],
+                "filter_metadata": [
+                    {k: v.metadata[k] for k in _FILTER_FIELDS if k in v.metadata} for v in kept
+                ],
+                "records": records,
+            }
+        ).encode("utf-8")
+        f.write(directory_blob)
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(kept), dim, position, len(directory_blob)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(kept)
+
+
+class _Snapshot:
+    """One mapped snapshot file; dropped (and unmapped) once no search uses it."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self.mm, 0)
+        magic, version, self.count, self.dim, dir_offset, dir_length = header
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a vector index snapshot")
+        matrix_end = _HEADER.size + 4 * self.count * self.dim
+        # Zero-copy float views over the mapping
+        self.matrix = memoryview(self.mm)[_HEADER.size:matrix_end].cast("f")
+        self.norms = memoryview(self.mm)[matrix_end:matrix_end + 4 * self.count].cast("f")
+        directory = json.loads(self.mm[dir_offset:dir_offset + dir_length])
+        self.ids: List[str] = directory["ids"]
+        self.filter_metadata: List[Dict[str, Any]] = directory["filter_metadata"]
+        self.records: List[List[int]] = directory["records"]
+        self.rows: Dict[str, int] = {vector_id: row for row, vector_id in enumerate(self.ids)}
+        self._metadata_index: Optional[MetadataIndex] = None
+
+    def row_values(self, row: int) -> "memoryview[float]":
+        return self.matrix[row * self.dim:(row + 1) * self.dim]
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        offset, length = self.records[row]
+        return json.loads(self.mm[offset:offset + length])
+
+    def metadata_index(self) -> MetadataIndex:
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex(
+                StoredVector(vector_id=i, values=(), metadata=m)
+                for i, m in zip(self.ids, self.filter_metadata)
+            )
+        return self._metadata_index
+
+
+class SharedIndexReader:
+    """Read-only, store-compatible view of a published snapshot.
+
+    Supports the read side of the ``SimpleVectorStore`` interface (``load``,
+    ``get``, ``search``, ``filter_ids``, ``vectors``); writes raise
+    ``RuntimeError``. Retrievers over a reader never index inline.
+    """
+
+    read_only = True
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.quantization: Optional[str] = None
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> Optional[_Snapshot]:
+        """Return the mapped snapshot, remapping if a newer one was published."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return self._snapshot
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.identity == identity:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.identity != identity:
+                try:
+                    self._snapshot = _Snapshot(self.path)
+                except (OSError, ValueError, struct.error) as exc:
+                    logger.warning("Failed to map vector snapshot %s: %s", self.path, exc)
+            return self._snapshot
+
+    def load(self) -> None:
+        self._current()
+
+    @property
+    def vectors(self) -> Iterator[StoredVector]:
+        snapshot = self._current()
+        if snapshot is None:
+            return
+        for row, vector_id in enumerate(snapshot.ids):
+            yield StoredVector(
+                vector_id=vector_id,
+                values=snapshot.row_values(row),
+                metadata=snapshot.filter_metadata[row],
+            )
+
+    def get(self, vector_id: str) -> Optional[StoredVector]:
+        snapshot = self._current()
+        if snapshot is None or vector_id not in snapshot.rows:
+            return None
+        row = snapshot.rows[vector_id]
+        return StoredVector(
+            vector_id=vector_id,
+            values=snapshot.row_values(row),
+            metadata=snapshot.metadata(row),
+            norm=snapshot.norms[row],
+        )
+
+    def filter_ids(self, filters: MetadataFilter) -> Set[str]:
+        snapshot = self._current()
+        return snapshot.metadata_index().select(filters) if snapshot is not None else set()
+
+    def search(
+        self,
+        query: List[float],
+        top_k: int = 5,
+        ids: Optional[Iterable[str]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[Dict[str, Any]]:
+        snapshot = self._current()
+        if snapshot is None or not query or len(query) != snapshot.dim:
+            return []
+        qnorm = _norm(query)
+        if qnorm == 0:
+            return []
+        if filters is not None and not filters.is_empty():
+            allowed = snapshot.metadata_index().select(filters)
+            ids = allowed if ids is None else [i for i in ids if i in allowed]
+        if ids is not None:
+            rows: Iterable[int] = [
+                snapshot.rows[i] for i in dict.fromkeys(ids) if i in snapshot.rows
+            ]
+        else:
+            rows = range(snapshot.count)
+
+        mul = operator.mul
+        norms = snapshot.norms
+
+        def score(row: int) -> float:
+            norm = norms[row]
+            if norm == 0:
+                return 0.0
+            return sum(map(mul, query, snapshot.row_values(row))) / (qnorm * norm)
+
+        best = heapq.nlargest(top_k, ((score(r), r) for r in rows))
+        return [
+            {"id": snapshot.ids[row], "score": value, "metadata": snapshot.metadata(row)}
+            for value, row in best
+        ]
+
+    def add(self, *args: Any, **kwargs: Any) -> None:
+        raise RuntimeError("Shared vector snapshots are read-only")
+
+    def replace(self, *args: Any, **kwargs: Any) -> None:
+        raise RuntimeError("Shared vector snapshots are read-only")
+
+    def persist(self) -> None:
+        raise RuntimeError("Shared vector snapshots are read-only")
@@ -1,30 +1,127 @@
-"""Lightweight file-backed vector store with cosine similarity."""
+"""Lightweight file-backed vector store with cosine similarity.
+
+Vectors can optionally be quantized (``"int8"`` scalar or ``"binary"`` sign
+bits). Quantized stores keep only the codes resident: full-precision values
+live in a float32 sidecar file that is memory-mapped, and only the best
+``top_k * rerank_factor`` candidates of the cheap code pass read their floats
+to be re-ranked with exact cosine similarity.
+"""
 
 from __future__ import annotations
 
+import heapq
 import json
 import logging
 import math
+import mmap
+import operator
 import os
+import re
+from array import array
+from collections.abc import Sequence as SequenceABC
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from uuid import uuid4
+
+from .filters import MetadataFilter, MetadataIndex
 
 logger = logging.getLogger(__name__)
 
+QUANTIZATION_MODES = ("int8", "binary")
+# Sign bits discard far more information than int8, so binary codes need a wider re-rank pool
+DEFAULT_RERANK_FACTORS = {"int8": 4, "binary": 16}
+_FLOAT_SIZE = array("f").itemsize
+
+
+class Sidecar:
+    """Read-only memory map of a float32 sidecar file.
+
+    The mapping stays valid after the file is replaced or unlinked, so
+    vectors that still point at an older sidecar keep working.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, offset: int, dim: int) -> array:
+        """Return ``dim`` floats starting at float index ``offset``."""
+        values = array("f")
+        if self._map is not None and dim:
+            values.frombytes(self._map[offset * _FLOAT_SIZE:(offset + dim) * _FLOAT_SIZE])
+        return values
+
+
+class SidecarValues(SequenceABC):
+    """Lazy float32 values of one vector, read from a ``Sidecar`` on access."""
+
+    __slots__ = ("sidecar", "offset", "dim")
 
-@dataclass
+    def __init__(self, sidecar: Sidecar, offset: int, dim: int):
+        self.sidecar = sidecar
+        self.offset = offset
+        self.dim = dim
+
+    def __len__(self) -> int:
+        return self.dim
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.to_array()[index]
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.to_array())
+
+    def to_array(self) -> array:
+        return self.sidecar.read(self.offset, self.dim)
+
+
+@dataclass(slots=True)
 class StoredVector:
     vector_id: str
-    values: List[float]
+    values: Sequence[float]
     metadata: Dict[str, Any]
+    # Populated by quantized stores: the quantized code, its scale and the float norm
+    code: Any = None
+    scale: float = 0.0
+    norm: float = 0.0
 
 
 class SimpleVectorStore:
-    """JSON-backed vector store with cosine similarity search."""
+    """JSON-backed vector store with cosine similarity search.
 
-    def __init__(self, path: str):
+    Args:
+        path: JSON file holding ids and metadata (and values when unquantized)
+        quantization: None for exact float search, "int8" for per-vector
+            symmetric scalar quantization or "binary" for 1-bit sign codes
+            compared by Hamming distance
+        rerank_factor: Quantized stores re-rank ``top_k * rerank_factor``
+            candidates with exact cosine similarity (defaults per mode from
+            ``DEFAULT_RERANK_FACTORS``)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        quantization: Optional[str] = None,
+        rerank_factor: Optional[int] = None,
+    ):
+        if quantization is not None and quantization not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Invalid quantization '{quantization}'. Must be one of: {list(QUANTIZATION_MODES)}"
+            )
         self.path = path
+        self.quantization = quantization
+        if rerank_factor is None:
+            rerank_factor = DEFAULT_RERANK_FACTORS.get(quantization or "", 1)
+        self.rerank_factor = max(1, rerank_factor)
         self.vectors: List[StoredVector] = []
+        self._by_id: Dict[str, StoredVector] = {}
+        self._vectors_file: Optional[str] = None
+        # (vectors snapshot, postings built from it); rebuilt lazily after writes
+        self._metadata_index: Optional[Tuple[List[StoredVector], MetadataIndex]] = None
         self._loaded = False
 
     def load(self) -> None:
@@ -34,42 +131,172 @@ class SimpleVectorStore:
             try:
                 with open(self.path, "r", encoding="utf-8") as f:
                     raw = json.load(f) or []
-                for entry in raw:
-                    self.vectors.append(
+                entries = raw
+                sidecar: Optional[Sidecar] = None
+                if isinstance(raw, dict):
+                    # Quantized layout: metadata in JSON, float32 values in a sidecar file
+                    entries = raw.get("entries") or []
+                    self._vectors_file = raw.get("vectors_file")
+                    if self._vectors_file:
+                        sidecar = Sidecar(self._sidecar_path(self._vectors_file))
+                for entry in entries:
+                    values: Sequence[float] = entry.get("values") or entry.get("vector") or []
+                    if sidecar is not None and "offset" in entry:
+                        values = SidecarValues(sidecar, entry["offset"], entry.get("dim", 0))
+                    vec = self._prepare(
                         StoredVector(
                             vector_id=entry.get("id") or entry.get("vector_id"),
-                            values=entry.get("values") or entry.get("vector") or [],
+                            values=values,
                             metadata=entry.get("metadata") or {},
                         )
                     )
+                    self.vectors.append(vec)
+                    self._by_id[vec.vector_id] = vec
             except Exception as exc:
                 logger.warning("Failed to load vector store %s: %s", self.path, exc)
         self._loaded = True
 
+    def _sidecar_path(self, name: str) -> str:
+        return os.path.join(os.path.dirname(self.path), name)
+
     def persist(self) -> None:
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if self.quantization:
+            self._persist_quantized()
+            return
         data = [
-            {"id": v.vector_id, "values": v.values, "metadata": v.metadata}
+            {"id": v.vector_id, "values": list(v.values), "metadata": v.metadata}
             for v in self.vectors
         ]
-        with open(self.path, "w", encoding="utf-8") as f:
+        # Write-then-rename so readers in other processes never see a partial file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _persist_quantized(self) -> None:
+        # Values go to a new uniquely named sidecar before the JSON that points at
+        # it is swapped in, so the two files can never disagree. The sidecar being
+        # replaced is kept until the next persist, for readers in other processes
+        # that parsed the previous JSON but have not opened its sidecar yet.
+        vectors_file = f"{os.path.basename(self.path)}.{uuid4().hex[:12]}.f32"
+        vectors = self.vectors
+        entries: List[Dict[str, Any]] = []
+        offset = 0
+        with open(self._sidecar_path(vectors_file), "wb") as f:
+            for v in vectors:
+                values = _float_array(v.values)
+                f.write(values.tobytes())
+                entries.append(
+                    {
+                        "id": v.vector_id,
+                        "offset": offset,
+                        "dim": len(values),
+                        "metadata": v.metadata,
+                    }
+                )
+                offset += len(values)
+        data = {
+            "format": 2,
+            "quantization": self.quantization,
+            "vectors_file": vectors_file,
+            "entries": entries,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        previous, self._vectors_file = self._vectors_file, vectors_file
+        # Point resident vectors at the new sidecar, releasing their float arrays
+        sidecar = Sidecar(self._sidecar_path(vectors_file))
+        for v, entry in zip(vectors, entries):
+            v.values = SidecarValues(sidecar, entry["offset"], entry["dim"])
+        self._prune_sidecars(keep={vectors_file, previous})
+
+    def _prune_sidecars(self, keep: Set[Optional[str]]) -> None:
+        """Delete this store's sidecar files other than those in ``keep``."""
+        directory = os.path.dirname(self.path)
+        pattern = re.compile(re.escape(os.path.basename(self.path)) + r"\.[0-9a-f]{12}\.f32")
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            if name not in keep and pattern.fullmatch(name):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
 
     def add(self, vector_id: str, values: List[float], metadata: Dict[str, Any]) -> None:
         self.load()
-        self.vectors.append(StoredVector(vector_id=vector_id, values=values, metadata=metadata))
+        vec = self._prepare(StoredVector(vector_id=vector_id, values=values, metadata=metadata))
+        self.vectors.append(vec)
+        self._by_id[vector_id] = vec
+        self._metadata_index = None
+
+    def replace(self, remove_ids: Iterable[str], additions: Iterable[StoredVector]) -> None:
+        """Remove and add vectors as one update.
+
+        Builds new containers and swaps them in, so a concurrent search sees
+        either the old snapshot or the new one, never a half-applied update.
+        """
+        self.load()
+        additions = [self._prepare(v) for v in additions]
+        drop = set(remove_ids) | {v.vector_id for v in additions}
+        vectors = [v for v in self.vectors if v.vector_id not in drop]
+        vectors.extend(additions)
+        by_id = {v.vector_id: v for v in vectors}
+        self.vectors = vectors
+        self._by_id = by_id
 
-    def search(self, query: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def get(self, vector_id: str) -> Optional[StoredVector]:
+        self.load()
+        return self._by_id.get(vector_id)
+
+    def filter_ids(self, filters: MetadataFilter) -> Set[str]:
+        """Return the ids whose metadata matches ``filters``."""
+        self.load()
+        vectors = self.vectors
+        cached = self._metadata_index
+        if cached is None or cached[0] is not vectors:
+            cached = (vectors, MetadataIndex(vectors))
+            self._metadata_index = cached
+        return cached[1].select(filters)
+
+    def search(
+        self,
+        query: List[float],
+        top_k: int = 5,
+        ids: Optional[Iterable[str]] = None,
+        filters: Optional[MetadataFilter] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the ``top_k`` most similar vectors.
+
+        If ``ids`` is given, only those vectors are scored. ``filters`` are
+        resolved against metadata posting lists before any scoring.
+        """
         self.load()
         if not query:
             return []
 
-        scored: List[tuple[float, StoredVector]] = []
         qnorm = _norm(query)
         if qnorm == 0:
             return []
-        for vec in self.vectors:
-            score = _cosine_similarity(query, vec.values, qnorm)
+        if filters is not None and not filters.is_empty():
+            allowed = self.filter_ids(filters)
+            ids = allowed if ids is None else [i for i in ids if i in allowed]
+        if ids is not None:
+            by_id = self._by_id
+            candidates = [by_id[i] for i in dict.fromkeys(ids) if i in by_id]
+        else:
+            candidates = self.vectors
+        if self.quantization and len(candidates) > top_k * self.rerank_factor:
+            candidates = self._quantized_candidates(query, candidates, top_k * self.rerank_factor)
+
+        scored: List[tuple[float, StoredVector]] = []
+        for vec in candidates:
+            score = _cosine_similarity(query, vec.values, qnorm, vec.norm or None)
             scored.append((score, vec))
 
         scored.sort(key=lambda x: x[0], reverse=True)
@@ -84,16 +311,78 @@ class SimpleVectorStore:
             )
         return results
 
+    def _prepare(self, vec: StoredVector) -> StoredVector:
+        """Attach float32 values and quantized codes when quantization is enabled.
+
+        Sidecar-backed values stay lazy; their floats are read once for the codes.
+        """
+        if not self.quantization:
+            return vec
+        values = _float_array(vec.values)
+        if not isinstance(vec.values, SidecarValues):
+            vec.values = values
+        vec.norm = _norm(values)
+        if self.quantization == "binary":
+            vec.code = _binary_code(values)
+        else:
+            vec.code, vec.scale = _int8_code(values)
+        return vec
+
+    def _quantized_candidates(
+        self, query: List[float], candidates: List[StoredVector], limit: int
+    ) -> List[StoredVector]:
+        """Cheap first pass over quantized codes; returns the best ``limit`` vectors."""
+        if self.quantization == "binary":
+            qbits = _binary_code(query)
+            dim = len(query)
+            return heapq.nsmallest(
+                limit,
+                (v for v in candidates if len(v.values) == dim),
+                key=lambda v: (qbits ^ v.code).bit_count(),
+            )
+        qcode, _ = _int8_code(query)
+        mul = operator.mul
+        # Query scale and norm are shared by every candidate, so they drop out of the ranking
+        return heapq.nlargest(
+            limit,
+            candidates,
+            key=lambda v: sum(map(mul, qcode, v.code)) * v.scale / v.norm if v.norm else 0.0,
+        )
+
+
+def _float_array(values: Sequence[float]) -> array:
+    if isinstance(values, SidecarValues):
+        return values.to_array()
+    return values if isinstance(values, array) else array("f", values)
+
+
+def _int8_code(values: Sequence[float]) -> tuple[array, float]:
+    peak = max((abs(x) for x in values), default=0.0)
+    if peak == 0:
+        return array("b", bytes(len(values))), 0.0
+    scale = peak / 127.0
+    return array("b", [round(x / scale) for x in values]), scale
+
+
+def _binary_code(values: Sequence[float]) -> int:
+    # Bit i is set when component i is positive
+    return int("".join("1" if x > 0 else "0" for x in reversed(values)) or "0", 2)
+
 
-def _norm(vec: List[float]) -> float:
+def _norm(vec: Sequence[float]) -> float:
     return math.sqrt(sum(v * v for v in vec)) if vec else 0.0
 
 
-def _cosine_similarity(a: List[float], b: List[float], norm_a: Optional[float] = None) -> float:
+def _cosine_similarity(
+    a: Sequence[float],
+    b: Sequence[float],
+    norm_a: Optional[float] = None,
+    norm_b: Optional[float] = None,
+) -> float:
     if not a or not b:
         return 0.0
     norm_a = norm_a or _norm(a)
-    norm_b = _norm(b)
+    norm_b = norm_b or _norm(b)
     if norm_a == 0 or norm_b == 0 or len(a) != len(b):
         return 0.0
     dot = sum(x * y for x, y in zip(a, b))
@@ -3,27 +3,48 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+import json
 import os
+import re
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from agent_engine.schemas import (
     ContextItem,
     ContextPackage,
     ContextProfile,
+    ContextProfileSource,
     ContextRequest,
     Task,
     MemoryConfig,
 )
 from agent_engine.runtime.memory import (
-    TaskMemoryStore,
     ProjectMemoryStore,
     GlobalMemoryStore,
     InMemoryBackend,
+    MemoryBackend,
+    MemoryPressurePolicy,
+    MemoryReadCache,
+    ProjectStorePool,
+    TaskStorePool,
+)
+from agent_engine.retrieval import (
+    BackgroundIndexer,
+    BM25Index,
+    EmbeddingCache,
+    EmbeddingProvider,
+    OllamaEmbeddingProvider,
+    Retriever,
+    ShardedVectorStore,
+    SharedIndexReader,
+    SimpleVectorStore,
+    merge_adjacent_chunks,
+    mmr_rerank,
 )
-from agent_engine.retrieval import Retriever, OllamaEmbeddingProvider, SimpleVectorStore
 from agent_engine.retrieval.retriever import embed_memory_items
+from agent_engine.utils.symbol_index import Symbol, SymbolIndex
 
 
 @dataclass
@@ -38,9 +59,9 @@ class ContextAssembler:
     Legacy ContextStore support has been removed; only multi-tier stores are supported.
     """
 
-    # Multi-tier memory stores
-    task_stores: Dict[str, TaskMemoryStore] = field(default_factory=dict)
-    project_stores: Dict[str, ProjectMemoryStore] = field(default_factory=dict)
+    # Multi-tier memory stores; plain dicts passed for task/project stores are adopted
+    task_stores: TaskStorePool = field(default_factory=TaskStorePool)
+    project_stores: ProjectStorePool = field(default_factory=ProjectStorePool)
     global_store: GlobalMemoryStore = field(default_factory=lambda: GlobalMemoryStore(
         backend=InMemoryBackend()
     ))
@@ -50,21 +71,96 @@ class ContextAssembler:
     workspace_root: Optional[str] = None
     retriever: Optional[Retriever] = None
     rag_index_path: Optional[str] = None
+    # Embedder for the workspace index; defaults to Ollama
+    embedding_provider: Optional[EmbeddingProvider] = None
     head_tail_conversation_count: int = 3
+    # Keep the workspace index current from a polling thread instead of on first search
+    background_indexing: bool = False
+    index_poll_interval: float = 2.0
+    # None (exact float search), "int8" or "binary"; see SimpleVectorStore
+    vector_quantization: Optional[str] = None
+    # Split the index into per-project/per-directory shards loaded on demand
+    index_shards: bool = False
+    max_open_shards: int = 8
+    # "publish": the background indexer writes an mmap snapshot for worker processes;
+    # "attach": search that snapshot read-only instead of indexing here
+    shared_index_mode: Optional[str] = None
+    shared_index_path: Optional[str] = None
+    # TelemetryBus receiving workspace indexing progress events
+    telemetry: Optional[Any] = None
+    # Definition index for symbol lookups; built lazily over workspace_root
+    symbol_index: Optional[SymbolIndex] = None
+    # Opens a project's persistent backend (e.g. MemoryStore.open_partition); with
+    # it set, at most max_resident_projects project stores stay loaded (LRU)
+    project_backend_factory: Optional[Callable[[str], Optional[MemoryBackend]]] = None
+    max_resident_projects: int = 128
+    # Spill idle task stores to disk under memory pressure (None = never)
+    memory_pressure: Optional[MemoryPressurePolicy] = None
+    # Task items copied to project memory when a task concludes (None = none)
+    task_promotion_filter: Optional[Callable[[ContextItem], bool]] = None
+    # Memory reads of build_context_for_profile, reused across a task's nodes until
+    # the store is written (None = read the backends every time)
+    read_cache: Optional[MemoryReadCache] = field(default_factory=MemoryReadCache)
+    indexer: Optional[BackgroundIndexer] = field(default=None, init=False)
     _last_retrieval_metadata: Dict[str, Any] = field(default_factory=dict, init=False)
 
     def __post_init__(self):
+        if not isinstance(self.task_stores, TaskStorePool):
+            pool = TaskStorePool()
+            pool.update(self.task_stores)
+            self.task_stores = pool
+        if self.memory_pressure is not None:
+            self.task_stores.pressure = self.memory_pressure
+        if not isinstance(self.project_stores, ProjectStorePool):
+            pool = ProjectStorePool()
+            pool.update(self.project_stores)
+            self.project_stores = pool
+        if self.project_backend_factory is not None:
+            self.project_stores.backend_factory = self.project_backend_factory
+            self.project_stores.max_resident = self.max_resident_projects
+        if self.read_cache is not None:
+            read_cache = self.read_cache
+            self.project_stores.on_release = lambda store: read_cache.invalidate(store.backend)
+        if self.shared_index_mode == "attach" and self.background_indexing:
+            raise ValueError("background_indexing cannot be used with shared_index_mode='attach'")
         if self.workspace_root and not self.retriever:
             index_path = self.rag_index_path or os.path.join(
                 self.workspace_root, ".agent_engine", "rag_index.json"
             )
-            embedder = OllamaEmbeddingProvider()
-            store = SimpleVectorStore(index_path)
+            embedder = self.embedding_provider or OllamaEmbeddingProvider()
+            index_dir = os.path.dirname(index_path)
+            if self.shared_index_mode and not self.shared_index_path:
+                self.shared_index_path = os.path.join(index_dir, "rag_snapshot.bin")
+            store: SimpleVectorStore | ShardedVectorStore | SharedIndexReader
+            if self.shared_index_mode == "attach":
+                store = SharedIndexReader(self.shared_index_path or "")
+            elif self.index_shards:
+                store = ShardedVectorStore(
+                    os.path.join(index_dir, "rag_shards"),
+                    workspace_root=self.workspace_root,
+                    max_open_shards=self.max_open_shards,
+                    quantization=self.vector_quantization,
+                )
+            else:
+                store = SimpleVectorStore(index_path, quantization=self.vector_quantization)
+            cache = EmbeddingCache(os.path.join(index_dir, "embedding_cache.sqlite"))
+            lexical_index = BM25Index(os.path.join(index_dir, "rag_lexical.json"))
             self.retriever = Retriever(
                 workspace_root=self.workspace_root,
                 embedder=embedder,
                 store=store,
+                embedding_cache=cache,
+                lexical_index=lexical_index,
+                telemetry=self.telemetry,
+            )
+        publish = self.shared_index_mode == "publish"
+        if (self.background_indexing or publish) and self.retriever:
+            self.indexer = BackgroundIndexer(
+                self.retriever,
+                poll_interval=self.index_poll_interval,
+                snapshot_path=self.shared_index_path if publish else None,
             )
+            self.indexer.start()
 
     def resolve_context_profile(
         self, context_spec: Optional[str], profiles: Optional[Dict[str, ContextProfile]] = None
@@ -167,18 +263,8 @@ class ContextAssembler:
         """
         self._last_retrieval_metadata = {}
         # Get or create memory stores for this task/project
-        task_store = self.task_stores.get(task.task_id)
-        if not task_store:
-            task_store = TaskMemoryStore(task_id=task.task_id)
-            self.task_stores[task.task_id] = task_store
-
-        project_id = task.spec.metadata.get("project_id", "default")
-        project_store = self.project_stores.get(project_id)
-        if not project_store:
-            project_store = ProjectMemoryStore(
-                project_id=project_id, backend=InMemoryBackend()
-            )
-            self.project_stores[project_id] = project_store
+        task_store = self.task_stores.acquire(task.task_id)
+        project_store = self._get_project_store(task)
 
         # Collect items from specified sources per profile
         all_items: List[ContextItem] = []
@@ -186,17 +272,23 @@ class ContextAssembler:
 
         for source in profile.sources:
             if source.store == "task":
-                items = task_store.backend.list_all()
+                backend = task_store.backend
             elif source.store == "project":
-                items = project_store.backend.list_all()
+                backend = project_store.backend
             elif source.store == "global":
-                items = self.global_store.backend.list_all()
+                backend = self.global_store.backend
             else:
                 continue  # Skip unknown stores
 
-            # Apply tag filtering if specified
-            if source.tags:
-                items = self._filter_items_by_tags(items, source.tags)
+            if source.text_search:
+                items = self._search_source_text(backend, source, task)
+            # Tag filters are evaluated by the backend (indexed in SQLite)
+            elif source.tags:
+                items = self._read_backend(
+                    backend, "query", {"tags": list(source.tags)}, limit=None
+                )
+            else:
+                items = self._read_backend(backend, "list_all")
 
             all_items.extend(items)
             memory_dicts.extend([self._context_item_to_dict(i) for i in items])
@@ -209,6 +301,9 @@ class ContextAssembler:
             )
             all_items.extend(rag_items)
 
+        if (profile.metadata or {}).get("symbol_lookup"):
+            all_items.extend(self._symbol_definition_items(task, profile))
+
         # Sort by recency (timestamp, newest first)
         all_items.sort(key=lambda i: i.timestamp or "", reverse=True)
         protected = self._protected_items(all_items)
@@ -233,26 +328,43 @@ class ContextAssembler:
             compression_ratio=compression_ratio,
         )
 
-    def _filter_items_by_tags(
-        self, items: List[ContextItem], tags: List[str]
+    def _get_project_store(self, task: Task) -> ProjectMemoryStore:
+        """Return the task's project store, loading it from its backend on first use."""
+        project_id = task.spec.metadata.get("project_id", "default")
+        return self.project_stores.acquire(project_id)
+
+    def _search_source_text(
+        self, backend: Any, source: ContextProfileSource, task: Task
     ) -> List[ContextItem]:
-        """Filter items by tag membership.
+        """Select a source's items by full-text search.
 
         Args:
-            items: Items to filter
-            tags: Tags to match (OR logic: item must have any of these tags)
+            backend: Memory backend of the source's store
+            source: Profile source with text_search enabled
+            task: Task whose request is the default query
 
         Returns:
-            Items matching any of the specified tags
+            Matching items (restricted to source.tags, if any), most relevant first
         """
-        if not tags:
-            return items
+        query = source.text_query
+        if query is None:
+            request = task.spec.request
+            query = request if isinstance(request, str) else json.dumps(request, default=str)
+        items = self._read_backend(
+            backend, "search_text", query, limit=source.text_search_limit
+        )
+        if source.tags:
+            wanted = set(source.tags)
+            items = [item for item in items if wanted.intersection(item.tags)]
+        return items
 
-        filtered = []
-        for item in items:
-            if any(tag in item.tags for tag in tags):
-                filtered.append(item)
-        return filtered
+    def _read_backend(
+        self, backend: Any, method: str, *args: Any, **kwargs: Any
+    ) -> List[ContextItem]:
+        """Call a backend read method, through read_cache when it is enabled."""
+        if self.read_cache is None:
+            return getattr(backend, method)(*args, **kwargs)
+        return getattr(self.read_cache, method)(backend, *args, **kwargs)
 
     def _should_use_rag(self, profile: ContextProfile) -> bool:
         metadata = profile.metadata or {}
@@ -294,12 +406,37 @@ class ContextAssembler:
             return [], {}
 
         top_k = self._resolve_rag_top_k(profile)
+        policy = "hybrid" if profile.retrieval_policy == "hybrid" else "semantic"
         start = time.time()
-        chunks = self.retriever.search(query, top_k=top_k)
+        profile_meta = profile.metadata or {}
+        # Optional metadata predicates, e.g. {"paths": ["src/*"], "extensions": [".py"]}
+        filters = profile_meta.get("rag_filters")
+        # MMR over-fetches candidates and keeps the top_k most relevant *and* distinct ones
+        mmr_lambda = profile_meta.get("rag_mmr_lambda")
+        fetch_k = top_k
+        if mmr_lambda is not None:
+            fetch_k = max(top_k, top_k * int(profile_meta.get("rag_mmr_fetch_factor", 3)))
+        chunks = self.retriever.search(query, top_k=fetch_k, policy=policy, filters=filters)
+        fetched = len(chunks)
+        if mmr_lambda is not None:
+            chunks = mmr_rerank(
+                chunks,
+                top_k,
+                lambda_mult=float(mmr_lambda),
+                vectors=self.retriever.vectors_for(c.chunk_id for c in chunks),
+            )
+        if profile_meta.get("rag_merge_adjacent"):
+            chunks = merge_adjacent_chunks(
+                chunks, max_gap=int(profile_meta.get("rag_merge_gap", 1))
+            )
         mem_chunks = []
         if memory_items:
             mem_chunks = embed_memory_items(
-                self.retriever.embedder, memory_items, query, top_k=max(1, top_k // 2)
+                self.retriever.embedder,
+                memory_items,
+                query,
+                top_k=max(1, top_k // 2),
+                filters=filters,
             )
         latency_ms = int((time.time() - start) * 1000)
 
@@ -332,6 +469,9 @@ class ContextAssembler:
             "rag_enabled": True,
             "query": query,
             "top_k": top_k,
+            "policy": policy,
+            "mmr_lambda": mmr_lambda,
+            "candidates_fetched": fetched,
             "retrieval_latency_ms": latency_ms,
             "results": [
                 {
@@ -345,6 +485,67 @@ class ContextAssembler:
         }
         return rag_items, rag_metadata
 
+    def find_symbol(self, name: str) -> List[Symbol]:
+        """Look up workspace definitions by bare or qualified name (e.g. "Engine.run")."""
+        index = self._refreshed_symbol_index()
+        return index.lookup(name) if index is not None else []
+
+    def _refreshed_symbol_index(self) -> Optional[SymbolIndex]:
+        """Return the symbol index brought up to date (None without a workspace)."""
+        if self.symbol_index is None:
+            if not self.workspace_root:
+                return None
+            self.symbol_index = SymbolIndex(Path(self.workspace_root))
+        self.symbol_index.refresh()
+        return self.symbol_index
+
+    def _symbol_definition_items(self, task: Task, profile: ContextProfile) -> List[ContextItem]:
+        """Add definitions of identifiers named in the task request.
+
+        Enabled by ``symbol_lookup`` in profile metadata; at most
+        ``symbol_lookup_max`` (default 5) definitions are included.
+        """
+        profile_meta = profile.metadata or {}
+        limit = int(profile_meta.get("symbol_lookup_max", 5))
+        query = self._infer_query(task)
+        items: List[ContextItem] = []
+        names = list(dict.fromkeys(re.findall(r"[A-Za-z_][\w.]*\w", query)))
+        # One refresh (a workspace scan) per request, not per identifier
+        index = self._refreshed_symbol_index() if names else None
+        if index is None:
+            return items
+        seen = set()
+        for name in names:
+            if len(items) >= limit:
+                break
+            for symbol in index.lookup(name):
+                key = (symbol.path, symbol.start_line)
+                if key in seen or len(items) >= limit:
+                    continue
+                seen.add(key)
+                text = index.definition(symbol, max_lines=80)
+                if not text:
+                    continue
+                items.append(
+                    ContextItem(
+                        context_item_id=f"symbol-{symbol.path}:{symbol.start_line}",
+                        kind="symbol_definition",
+                        source="file",
+                        timestamp=None,
+                        tags=["symbol", symbol.kind],
+                        importance=1.0,
+                        token_cost=len(text.split()),
+                        payload=text,
+                        metadata={
+                            "path": str(symbol.path),
+                            "qualname": symbol.qualname,
+                            "start_line": symbol.start_line,
+                            "end_line": symbol.end_line,
+                        },
+                    )
+                )
+        return items
+
     def _protected_items(self, items: List[ContextItem]) -> List[ContextItem]:
         """Protect system prompt + last N conversation turns from displacement."""
         protected: List[ContextItem] = []
@@ -442,21 +643,11 @@ class ContextAssembler:
 
         """
 
-        # Get or create task store
-        task_store = self.task_stores.get(task.task_id)
-        if not task_store:
-            task_store = TaskMemoryStore(task_id=task.task_id)
-            self.task_stores[task.task_id] = task_store
+        # Get or create task store (reloaded if it was spilled)
+        task_store = self.task_stores.acquire(task.task_id)
 
-        # Get or create project store (from task spec metadata)
-        project_id = task.spec.metadata.get("project_id", "default")
-        project_store = self.project_stores.get(project_id)
-        if not project_store:
-            project_store = ProjectMemoryStore(
-                project_id=project_id,
-                backend=InMemoryBackend()  # TODO: file-backed in future
-            )
-            self.project_stores[project_id] = project_store
+        # Get or load project store (from task spec metadata)
+        project_store = self._get_project_store(task)
 
         # Query all three tiers
         budget = request.budget_tokens
@@ -551,9 +742,28 @@ class ContextAssembler:
         Project and global memory persist.
         """
         if task_id in self.task_stores:
-            self.task_stores[task_id].clear()
+            if self.read_cache is not None and self.task_stores.is_resident(task_id):
+                self.read_cache.invalidate(self.task_stores[task_id].backend)
             del self.task_stores[task_id]
 
+    def conclude_task(self, task: Task) -> None:
+        """Tear down a task's memory once it reaches a terminal state.
+
+        Items accepted by ``task_promotion_filter`` are first copied to the
+        task's project memory; the task store is then removed (see cleanup_task).
+
+        Args:
+            task: Concluded task
+        """
+        if task.task_id not in self.task_stores:
+            return
+        if self.task_promotion_filter is not None:
+            items = self.task_stores[task.task_id].backend.list_all()
+            promoted = [item for item in items if self.task_promotion_filter(item)]
+            if promoted:
+                self._get_project_store(task).add_items(promoted)
+        self.cleanup_task(task.task_id)
+
     def get_context_metadata(self, context_package) -> Dict[str, Any]:
         """Extract context metadata for history recording.
 
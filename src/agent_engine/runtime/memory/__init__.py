@@ -3,6 +3,8 @@
 from .backend import InMemoryBackend, MemoryBackend
 from .global_store import GlobalMemoryStore
 from .project_store import ProjectMemoryStore
+from .read_cache import MemoryReadCache
+from .store_pool import MemoryPressurePolicy, ProjectStorePool, TaskStorePool
 from .task_store import TaskMemoryStore
 
 __all__ = [
@@ -10,5 +12,9 @@ __all__ = [
     "InMemoryBackend",
     "GlobalMemoryStore",
     "ProjectMemoryStore",
+    "ProjectStorePool",
+    "TaskStorePool",
+    "MemoryPressurePolicy",
+    "MemoryReadCache",
     "TaskMemoryStore",
 ]
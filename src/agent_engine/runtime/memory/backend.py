@@ -2,12 +2,55 @@
 
 from __future__ import annotations
 
+import json
 import operator
+import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, TypeVar
 
 from agent_engine.schemas.memory import ContextItem
 
+from .compact import CompactItemStore, HasItemFields
+from .ordered_index import RetentionIndex
+
+_TERM_RE = re.compile(r"\w+")
+
+# ContextItems or ItemViews; search returns the same type it was given
+_ItemT = TypeVar("_ItemT", bound=HasItemFields)
+
+
+def text_search_terms(query: str) -> List[str]:
+    """Split a free-text query into lowercase search terms (order kept, duplicates dropped)."""
+    return list(dict.fromkeys(t.lower() for t in _TERM_RE.findall(query or "")))
+
+
+def search_items_by_text(
+    items: Sequence[_ItemT], query: str, limit: Optional[int] = 20
+) -> List[_ItemT]:
+    """Rank items by how often the query terms occur in their payload.
+
+    Linear-scan fallback for backends without a full-text index.
+
+    Args:
+        items: Candidate items (anything with ``payload`` and ``timestamp``)
+        query: Free-text query (any term may match)
+        limit: Maximum items to return (None = no limit)
+
+    Returns:
+        Matching items, best first (ties broken by newest timestamp)
+    """
+    terms = set(text_search_terms(query))
+    if not terms:
+        return []
+    scored = []
+    for item in items:
+        words = _TERM_RE.findall(json.dumps(item.payload).lower())
+        score = sum(1 for word in words if word in terms)
+        if score:
+            scored.append((score, item.timestamp or "", item))
+    scored.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+    return [item for _, _, item in scored[:limit]]
+
 
 class MemoryBackend(Protocol):
     """Abstract interface for memory storage backends."""
@@ -23,10 +66,21 @@ class MemoryBackend(Protocol):
         """
         ...
 
+    def add_many(self, items: List[ContextItem]) -> None:
+        """Add a batch of context items in one operation.
+
+        Args:
+            items: ContextItems to store (later duplicates of an id win)
+
+        Raises:
+            MemoryError: If storage fails
+        """
+        ...
+
     def query(
         self,
         filters: Dict[str, Any],
-        limit: int = 100,
+        limit: Optional[int] = 100,
         order_by: str = "timestamp"
     ) -> List[ContextItem]:
         """Query items matching filters.
@@ -36,7 +90,7 @@ class MemoryBackend(Protocol):
                 Examples:
                   {"kind": "code", "tags": ["bug_fix"]}
                   {"source": "user", "importance": {"$gte": 0.7}}
-            limit: Maximum items to return
+            limit: Maximum items to return (None = no limit)
             order_by: Field to sort by (default: timestamp desc)
 
         Returns:
@@ -86,6 +140,18 @@ class MemoryBackend(Protocol):
         """
         ...
 
+    def search_text(self, query: str, limit: int = 20) -> List[ContextItem]:
+        """Full-text search over item payloads.
+
+        Args:
+            query: Free-text query; items matching any term are returned
+            limit: Maximum items to return
+
+        Returns:
+            Matching ContextItems, most relevant first
+        """
+        ...
+
 
 @dataclass
 class InMemoryBackend:
@@ -99,24 +165,67 @@ class InMemoryBackend:
     Not suitable for:
     - Large-scale production (use SQLite/Redis backend)
     - Persistent project/global memory (use file-backed backend)
+
+    With ``max_items`` set, adds evict per ``retention`` ("fifo": oldest
+    timestamp first, "lru": least recently added/read first) via an ordered
+    index, never a full sort. With ``ttl_seconds`` set, items older than the
+    TTL are swept lazily on the next access.
+
+    Items are held in a ``CompactItemStore`` (columnar slots); filtering and
+    sorting read the columns and only returned items become ContextItems.
     """
 
-    items: Dict[str, ContextItem] = field(default_factory=dict)
+    items: CompactItemStore = field(default_factory=CompactItemStore)
+    retention: str = "fifo"
+    max_items: Optional[int] = None
+    ttl_seconds: Optional[float] = None
+    _retention_index: RetentionIndex = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if isinstance(self.items, dict):
+            self.items = CompactItemStore(self.items.values())
+        self._retention_index = RetentionIndex(self.retention, self.ttl_seconds)
+        for view in self.items.views():
+            self._retention_index.track(view)
 
     def add(self, item: ContextItem) -> None:
-        self.items[item.context_item_id] = item
+        self.add_many([item])
+
+    def add_many(self, items: List[ContextItem]) -> None:
+        for item in items:
+            self.items.put(item)
+            self._retention_index.track(item)
+        self.sweep_expired()
+        self.enforce_retention(self.max_items)
+
+    def enforce_retention(self, max_items: Optional[int]) -> None:
+        """Delete items beyond max_items in retention order (O(k log n))."""
+        for item_id in self._retention_index.evict(max_items):
+            self.items.pop(item_id)
+
+    def sweep_expired(self) -> int:
+        """Delete items older than ttl_seconds.
+
+        Returns:
+            Number of items removed
+        """
+        expired = self._retention_index.expired()
+        for item_id in expired:
+            self.items.pop(item_id)
+        return len(expired)
 
     def query(
         self,
         filters: Dict[str, Any],
-        limit: int = 100,
+        limit: Optional[int] = 100,
         order_by: str = "timestamp"
     ) -> List[ContextItem]:
-        # Filter items
+        self.sweep_expired()
+        # Filter items on column views
         results = []
-        for item in self.items.values():
-            if self._matches_filters(item, filters):
-                results.append(item)
+        for view in self.items.views():
+            if self._matches_filters(view, filters):
+                results.append(view)
 
         # Sort
         reverse = True  # Newest first by default
@@ -129,12 +238,15 @@ class InMemoryBackend:
             reverse=reverse
         )
 
-        return results[:limit]
+        items = [view.materialize() for view in results[:limit]]
+        for item in items:
+            self._retention_index.touch(item.context_item_id)
+        return items
 
-    def _matches_filters(self, item: ContextItem, filters: Dict[str, Any]) -> bool:
+    def _matches_filters(self, item: Any, filters: Dict[str, Any]) -> bool:
         """Check if item matches all filters."""
-        for field, value in filters.items():
-            item_value = getattr(item, field, None)
+        for field_name, value in filters.items():
+            item_value = getattr(item, field_name, None)
 
             # Handle dict-based operators like {"$gte": 0.7}
             if isinstance(value, dict):
@@ -184,19 +296,41 @@ class InMemoryBackend:
         return False
 
     def get(self, item_id: str) -> Optional[ContextItem]:
-        return self.items.get(item_id)
+        self.sweep_expired()
+        item = self.items.get(item_id)
+        if item is not None:
+            self._retention_index.touch(item_id)
+        return item
+
+    def touch(self, item_ids: Iterable[str]) -> None:
+        """Mark items as just read for "lru" retention (e.g. served from a read cache)."""
+        for item_id in item_ids:
+            self._retention_index.touch(item_id)
 
     def delete(self, item_id: str) -> bool:
-        if item_id in self.items:
-            del self.items[item_id]
+        if self.items.pop(item_id):
+            self._retention_index.forget(item_id)
             return True
         return False
 
     def list_all(self) -> List[ContextItem]:
-        return list(self.items.values())
+        self.sweep_expired()
+        return self.items.values()
 
     def clear(self) -> None:
         self.items.clear()
+        self._retention_index.clear()
 
     def count(self) -> int:
+        self.sweep_expired()
         return len(self.items)
+
+    def search_text(self, query: str, limit: int = 20) -> List[ContextItem]:
+        self.sweep_expired()
+        views = search_items_by_text(list(self.items.views()), query, limit)
+        return [view.materialize() for view in views]
+
+    def write_generation(self) -> int:
+        """Return a counter that changes whenever the stored items change."""
+        self.sweep_expired()
+        return self.items.generation
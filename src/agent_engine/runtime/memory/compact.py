@@ -0,0 +1,249 @@
+"""Compact slot-based storage for large in-memory ContextItem collections."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from agent_engine.schemas.memory import ContextItem
+
+# Float column marker for None (importance/token_cost are never NaN in practice)
+_MISSING = math.nan
+
+
+class StringTable:
+    """Interns repeated strings (kinds, sources) as small integer codes."""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def code(self, value: str) -> int:
+        """Return the code for a string, adding it on first use."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+
+    def value(self, code: int) -> str:
+        """Return the string for a code."""
+        return self._values[code]
+
+    def clear(self) -> None:
+        self._codes.clear()
+        self._values.clear()
+
+
+class HasItemFields(Protocol):
+    """The ContextItem fields that retention and text search read.
+
+    Satisfied by ContextItem and by ItemView, so those helpers work on stored
+    items without materializing them.
+    """
+
+    @property
+    def context_item_id(self) -> str: ...
+
+    @property
+    def timestamp(self) -> Optional[str]: ...
+
+    @property
+    def payload(self) -> Any: ...
+
+
+class ItemView:
+    """Read-only attribute view of one stored item, without building a ContextItem.
+
+    Lets filters, sort keys and text search read fields straight from the
+    columns; ``materialize`` builds the ContextItem for items that are returned.
+    """
+
+    __slots__ = ("_store", "slot")
+
+    # Served by __getattr__; declared for type checkers
+    context_item_id: str
+    timestamp: Optional[str]
+    payload: Any
+
+    def __init__(self, store: CompactItemStore, slot: int):
+        self._store = store
+        self.slot = slot
+
+    def __getattr__(self, name: str) -> Any:
+        return self._store.field(self.slot, name)
+
+    def materialize(self) -> ContextItem:
+        return self._store.materialize(self.slot)
+
+
+class CompactItemStore:
+    """Columnar, slot-based container of ContextItems keyed by id.
+
+    Each item occupies one slot across parallel columns instead of being a
+    Pydantic model with its own ``__dict__``:
+
+    - ``kind`` and ``source`` are interned as 4-byte codes
+    - ``importance`` and ``token_cost`` live in ``array('d')`` columns
+    - identical tag lists share one interned tuple
+    - payloads are kept by reference (stored once) and empty metadata as None
+
+    Slots of deleted items are reused. Iteration follows insertion order, like
+    the dict it replaces. ``generation`` increases on every write, so readers
+    can tell whether cached results are still current. ContextItems are only
+    built by ``get``/``materialize`` (via ``model_construct``, as stored values
+    were validated on the way in), so callers should filter and sort on
+    ``views()`` and materialize the results.
+    """
+
+    def __init__(self, items: Optional[Iterable[ContextItem]] = None):
+        """Initialize store.
+
+        Args:
+            items: Optional initial items
+        """
+        self.generation = 0
+        self._reset()
+        for item in items or ():
+            self.put(item)
+
+    def _reset(self) -> None:
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._strings = StringTable()
+        self._tag_sets: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._kinds = array("I")
+        self._sources = array("I")
+        self._importance = array("d")
+        self._token_cost = array("d")
+        self._timestamps: List[Optional[str]] = []
+        self._tags: List[Tuple[str, ...]] = []
+        self._payloads: List[Any] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._getters = {
+            "context_item_id": self._id_at,
+            "kind": lambda slot: self._strings.value(self._kinds[slot]),
+            "source": lambda slot: self._strings.value(self._sources[slot]),
+            "timestamp": self._timestamps.__getitem__,
+            "tags": lambda slot: list(self._tags[slot]),
+            "importance": lambda slot: _unpack_float(self._importance[slot]),
+            "token_cost": lambda slot: _unpack_float(self._token_cost[slot]),
+            "payload": self._payloads.__getitem__,
+            "metadata": lambda slot: dict(self._metadata[slot] or {}),
+        }
+        self._ids: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._slots
+
+    def put(self, item: ContextItem) -> None:
+        """Insert an item or replace the stored item with the same id."""
+        item_id = item.context_item_id
+        self.generation += 1
+        slot = self._slots.get(item_id)
+        if slot is None:
+            slot = self._free.pop() if self._free else self._grow()
+            self._slots[item_id] = slot
+        tags = tuple(item.tags or ())
+        self._ids[slot] = item_id
+        self._kinds[slot] = self._strings.code(item.kind)
+        self._sources[slot] = self._strings.code(item.source)
+        self._importance[slot] = _pack_float(item.importance)
+        self._token_cost[slot] = _pack_float(item.token_cost)
+        self._timestamps[slot] = item.timestamp
+        self._tags[slot] = self._tag_sets.setdefault(tags, tags)
+        self._payloads[slot] = item.payload
+        self._metadata[slot] = item.metadata or None
+
+    def get(self, item_id: str) -> Optional[ContextItem]:
+        """Materialize the item with this id, or return None."""
+        slot = self._slots.get(item_id)
+        return None if slot is None else self.materialize(slot)
+
+    def pop(self, item_id: str) -> bool:
+        """Remove an item, freeing its slot for reuse.
+
+        Returns:
+            True if the item was present
+        """
+        slot = self._slots.pop(item_id, None)
+        if slot is None:
+            return False
+        self.generation += 1
+        self._ids[slot] = None
+        self._timestamps[slot] = None
+        self._tags[slot] = ()
+        self._payloads[slot] = None
+        self._metadata[slot] = None
+        self._free.append(slot)
+        return True
+
+    def clear(self) -> None:
+        """Remove all items and release the columns."""
+        self._reset()
+        self.generation += 1
+
+    def ids(self) -> List[str]:
+        """Return stored ids in insertion order."""
+        return list(self._slots)
+
+    def views(self) -> Iterator[ItemView]:
+        """Iterate lightweight views of all items in insertion order."""
+        for slot in self._slots.values():
+            yield ItemView(self, slot)
+
+    def values(self) -> List[ContextItem]:
+        """Materialize all items in insertion order."""
+        return [self.materialize(slot) for slot in self._slots.values()]
+
+    def field(self, slot: int, name: str) -> Any:
+        """Read one field of the item in a slot (None for unknown fields)."""
+        getter = self._getters.get(name)
+        return getter(slot) if getter is not None else None
+
+    def materialize(self, slot: int) -> ContextItem:
+        """Build the ContextItem stored in a slot."""
+        metadata = self._metadata[slot]
+        return ContextItem.model_construct(
+            context_item_id=self._ids[slot],
+            kind=self._strings.value(self._kinds[slot]),
+            source=self._strings.value(self._sources[slot]),
+            timestamp=self._timestamps[slot],
+            tags=list(self._tags[slot]),
+            importance=_unpack_float(self._importance[slot]),
+            token_cost=_unpack_float(self._token_cost[slot]),
+            payload=self._payloads[slot],
+            metadata=dict(metadata) if metadata else {},
+        )
+
+    def _id_at(self, slot: int) -> Optional[str]:
+        return self._ids[slot]
+
+    def _grow(self) -> int:
+        slot = len(self._ids)
+        self._ids.append(None)
+        self._kinds.append(0)
+        self._sources.append(0)
+        self._importance.append(_MISSING)
+        self._token_cost.append(_MISSING)
+        self._timestamps.append(None)
+        self._tags.append(())
+        self._payloads.append(None)
+        self._metadata.append(None)
+        return slot
+
+
+def _pack_float(value: Optional[float]) -> float:
+    return _MISSING if value is None else value
+
+
+def _unpack_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
@@ -0,0 +1,202 @@
+"""Ordered id indexes for memory retention and expiry."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .compact import HasItemFields
+
+
+class OrderedIndex:
+    """Min-heap of item ids ordered by a sortable key.
+
+    Updating or discarding an id leaves its old heap entry in place; stale
+    entries are skipped when popped and the heap is rebuilt once they
+    outnumber live ones. ``set`` and ``discard`` are O(log n) / O(1), and
+    popping the k smallest ids is O(k log n), so eviction never sorts the
+    whole store.
+    """
+
+    def __init__(self, entries: Optional[Iterable[Tuple[str, Any]]] = None):
+        """Initialize index.
+
+        Args:
+            entries: Optional initial ``(item_id, key)`` pairs (heapified in O(n))
+        """
+        self._seq = itertools.count()
+        self._live: Dict[str, int] = {}
+        self._heap: List[Tuple[Any, int, str]] = []
+        if entries is not None:
+            for item_id, key in entries:
+                seq = next(self._seq)
+                self._live[item_id] = seq
+                self._heap.append((key, seq, item_id))
+            # Ids repeated in entries leave stale heap entries; they are skipped on pop
+            heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._live
+
+    def set(self, item_id: str, key: Any) -> None:
+        """Insert an id or move it to a new key."""
+        seq = next(self._seq)
+        self._live[item_id] = seq
+        heapq.heappush(self._heap, (key, seq, item_id))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._rebuild()
+
+    def discard(self, item_id: str) -> None:
+        """Remove an id if present."""
+        self._live.pop(item_id, None)
+
+    def clear(self) -> None:
+        """Remove all ids."""
+        self._live.clear()
+        self._heap.clear()
+
+    def peek(self) -> Optional[Tuple[Any, str]]:
+        """Return the smallest ``(key, item_id)`` without removing it."""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        key, _, item_id = self._heap[0]
+        return key, item_id
+
+    def pop_smallest(self, count: int) -> List[str]:
+        """Remove and return up to ``count`` ids with the smallest keys, in order."""
+        popped: List[str] = []
+        while len(popped) < count:
+            self._drop_stale()
+            if not self._heap:
+                break
+            _, _, item_id = heapq.heappop(self._heap)
+            del self._live[item_id]
+            popped.append(item_id)
+        return popped
+
+    def pop_below(self, bound: Any) -> List[str]:
+        """Remove and return all ids whose key is strictly less than ``bound``."""
+        popped: List[str] = []
+        while True:
+            self._drop_stale()
+            if not self._heap or not self._heap[0][0] < bound:
+                return popped
+            _, _, item_id = heapq.heappop(self._heap)
+            del self._live[item_id]
+            popped.append(item_id)
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def _rebuild(self) -> None:
+        self._heap = [entry for entry in self._heap if self._live.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+
+RETENTION_POLICIES = ("fifo", "lru")
+
+
+def item_epoch(item: HasItemFields) -> Optional[float]:
+    """Return an item's timestamp as epoch seconds, or None if absent/unparseable.
+
+    Naive timestamps are taken as local time, matching ``datetime.now().isoformat()``.
+    """
+    if not item.timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(item.timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class RetentionIndex:
+    """Eviction and expiry order for a memory backend's items.
+
+    - "fifo" evicts items with the oldest ``timestamp`` first (missing
+      timestamps count as oldest, as in a timestamp sort)
+    - "lru" evicts the items least recently added or read (see ``touch``)
+
+    With ``ttl_seconds`` set, ``expired`` returns items whose timestamp (or,
+    without one, the time they were tracked) is older than the TTL.
+    """
+
+    def __init__(self, policy: str = "fifo", ttl_seconds: Optional[float] = None):
+        """Initialize retention index.
+
+        Args:
+            policy: "fifo" or "lru"
+            ttl_seconds: Maximum item age; None disables expiry
+
+        Raises:
+            ValueError: If policy is unknown or ttl_seconds is not positive
+        """
+        if policy not in RETENTION_POLICIES:
+            policies = ", ".join(RETENTION_POLICIES)
+            raise ValueError(f"Unknown retention policy '{policy}'; expected one of {policies}")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
+        self.policy = policy
+        self.ttl_seconds = ttl_seconds
+        self._order = OrderedIndex()
+        self._expiry = OrderedIndex() if ttl_seconds is not None else None
+        self._clock = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def track(self, item: HasItemFields) -> None:
+        """Record an added or replaced item."""
+        item_id = item.context_item_id
+        if self.policy == "lru":
+            self._order.set(item_id, next(self._clock))
+        else:
+            self._order.set(item_id, item.timestamp or "")
+        if self._expiry is not None:
+            epoch = item_epoch(item)
+            self._expiry.set(item_id, epoch if epoch is not None else time.time())
+
+    def touch(self, item_id: str) -> None:
+        """Mark an item as just read (affects "lru" only)."""
+        if self.policy == "lru" and item_id in self._order:
+            self._order.set(item_id, next(self._clock))
+
+    def forget(self, item_id: str) -> None:
+        """Stop tracking a deleted item."""
+        self._order.discard(item_id)
+        if self._expiry is not None:
+            self._expiry.discard(item_id)
+
+    def clear(self) -> None:
+        """Stop tracking all items."""
+        self._order.clear()
+        if self._expiry is not None:
+            self._expiry.clear()
+
+    def evict(self, max_items: Optional[int]) -> List[str]:
+        """Untrack and return the ids to delete so at most max_items remain."""
+        if max_items is None or len(self._order) <= max_items:
+            return []
+        victims = self._order.pop_smallest(len(self._order) - max_items)
+        if self._expiry is not None:
+            for item_id in victims:
+                self._expiry.discard(item_id)
+        return victims
+
+    def expired(self, now: Optional[float] = None) -> List[str]:
+        """Untrack and return the ids of items older than the TTL."""
+        if self._expiry is None or self.ttl_seconds is None:
+            return []
+        cutoff = (time.time() if now is None else now) - self.ttl_seconds
+        victims = self._expiry.pop_below(cutoff)
+        for item_id in victims:
+            self._order.discard(item_id)
+        return victims
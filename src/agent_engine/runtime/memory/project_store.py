@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
 from uuid import uuid4
@@ -11,6 +11,7 @@ from agent_engine.schemas.errors import FailureSignature
 from agent_engine.schemas.memory import ContextItem
 
 from .backend import MemoryBackend
+from .ordered_index import OrderedIndex
 
 
 @dataclass
@@ -24,6 +25,10 @@ class ProjectMemoryStore:
     project_id: str
     backend: MemoryBackend
     max_items: int = 1000
+    # Eviction order (importance, then age); rebuilt if the backend changes underneath
+    _eviction_index: OrderedIndex = field(
+        default_factory=OrderedIndex, init=False, repr=False, compare=False
+    )
 
     def add_decision(self, decision: str, tags: List[str]) -> ContextItem:
         """Add a design decision.
@@ -46,6 +51,7 @@ class ProjectMemoryStore:
             payload={"decision": decision}
         )
         self.backend.add(item)
+        self._eviction_index.set(item.context_item_id, self._eviction_key(item))
         self._maybe_evict()
         return item
 
@@ -70,6 +76,7 @@ class ProjectMemoryStore:
             payload={"convention": convention, "scope": scope}
         )
         self.backend.add(item)
+        self._eviction_index.set(item.context_item_id, self._eviction_key(item))
         self._maybe_evict()
         return item
 
@@ -94,9 +101,23 @@ class ProjectMemoryStore:
             payload={"failure": failure.model_dump(), "lesson": lesson}
         )
         self.backend.add(item)
+        self._eviction_index.set(item.context_item_id, self._eviction_key(item))
         self._maybe_evict()
         return item
 
+    def add_items(self, items: List[ContextItem]) -> None:
+        """Add existing items (e.g. promoted from task memory) in one batch.
+
+        Args:
+            items: ContextItems to store
+        """
+        if not items:
+            return
+        self.backend.add_many(items)
+        for item in items:
+            self._eviction_index.set(item.context_item_id, self._eviction_key(item))
+        self._maybe_evict()
+
     def query_decisions(self, tags: Optional[List[str]] = None) -> List[ContextItem]:
         """Query design decisions, optionally filtered by tags.
 
@@ -111,14 +132,26 @@ class ProjectMemoryStore:
             filters["tags"] = tags
         return self.backend.query(filters, limit=100)
 
+    @staticmethod
+    def _eviction_key(item: ContextItem) -> tuple:
+        return (item.importance or 0, item.timestamp or "")
+
     def _maybe_evict(self) -> None:
-        """Evict low-importance old items if over threshold."""
-        if self.backend.count() > self.max_items:
-            # Get all items sorted by importance (ascending) then age (oldest first)
-            all_items = self.backend.list_all()
-            all_items.sort(key=lambda i: (i.importance or 0, i.timestamp or ""))
-
-            # Evict bottom 10%
-            to_evict = all_items[:len(all_items) // 10]
-            for item in to_evict:
-                self.backend.delete(item.context_item_id)
+        """Evict low-importance old items if over threshold.
+
+        Victims come from an ordered index, so an eviction pass costs
+        O(k log n) rather than a sort of every stored item.
+        """
+        count = self.backend.count()
+        if count <= self.max_items:
+            return
+        if len(self._eviction_index) != count:
+            # Items were added or removed behind this store's back
+            self._eviction_index = OrderedIndex(
+                (item.context_item_id, self._eviction_key(item))
+                for item in self.backend.list_all()
+            )
+
+        # Evict bottom 10%
+        for item_id in self._eviction_index.pop_smallest(count // 10):
+            self.backend.delete(item_id)
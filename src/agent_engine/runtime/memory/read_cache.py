@@ -0,0 +1,158 @@
+"""Read-through cache for memory backend reads."""
+
+from __future__ import annotations
+
+import json
+import threading
+import weakref
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from agent_engine.schemas.memory import ContextItem
+
+
+class MemoryReadCache:
+    """Caches ``list_all``/``query``/``search_text`` results per backend.
+
+    Each entry records the backend's ``write_generation()`` when it was
+    filled and is served only while the generation is unchanged, so any
+    write (or, for SQLite, a commit by another process) invalidates every
+    cached read of that backend. Backends without ``write_generation`` are
+    read directly.
+
+    The cache is bounded by entry count and by the total number of cached
+    items, and drops a backend's entries once the backend is garbage
+    collected (or explicitly via ``invalidate``, e.g. when a pool closes it).
+
+    Cached ContextItems are shared between callers and must not be mutated.
+    A ``query`` hit calls the backend's ``touch`` (if any) with the returned
+    ids, so "lru" retention sees the read as if the backend had served it.
+    """
+
+    def __init__(self, max_entries: int = 256, max_items: int = 10000):
+        """Initialize cache.
+
+        Args:
+            max_entries: Cached results kept (least recently used dropped first)
+            max_items: Total ContextItems held across all cached results;
+                larger results are returned without being cached
+
+        Raises:
+            ValueError: If max_entries or max_items is not positive
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1")
+        self.max_entries = max_entries
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        # (id(backend), method, args) -> (backend ref, generation, items)
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[Any, Any, List[ContextItem]]]" = (
+            OrderedDict()
+        )
+        self._cached_items = 0
+        # id(backend) -> finalizer that reports the backend's collection
+        self._finalizers: Dict[int, weakref.finalize] = {}
+        # Ids of collected backends; appended from finalizers (which may run
+        # during garbage collection in any thread) and purged under the lock
+        self._collected: Deque[int] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge_collected()
+            return len(self._entries)
+
+    @property
+    def cached_items(self) -> int:
+        """Total ContextItems currently held by cached results."""
+        with self._lock:
+            self._purge_collected()
+            return self._cached_items
+
+    def list_all(self, backend: Any) -> List[ContextItem]:
+        """Return ``backend.list_all()``, cached."""
+        return self._read(backend, ("list_all",), backend.list_all)
+
+    def query(
+        self, backend: Any, filters: Dict[str, Any], limit: Optional[int] = 100
+    ) -> List[ContextItem]:
+        """Return ``backend.query(filters, limit=limit)``, cached."""
+        key = ("query", json.dumps(filters, sort_keys=True, default=str), limit)
+        # query (unlike list_all/search_text) counts as a read for "lru" retention
+        return self._read(backend, key, lambda: backend.query(filters, limit=limit), touch=True)
+
+    def search_text(self, backend: Any, query: str, limit: int = 20) -> List[ContextItem]:
+        """Return ``backend.search_text(query, limit)``, cached."""
+        return self._read(
+            backend, ("search_text", query, limit), lambda: backend.search_text(query, limit)
+        )
+
+    def invalidate(self, backend: Any = None) -> None:
+        """Drop the cached reads of one backend (None = all backends)."""
+        with self._lock:
+            self._purge_collected()
+            if backend is None:
+                self._entries.clear()
+                self._cached_items = 0
+                return
+            self._drop_backend(id(backend))
+
+    def _drop_backend(self, backend_id: int) -> None:
+        for key in [key for key in self._entries if key[0] == backend_id]:
+            self._cached_items -= len(self._entries.pop(key)[2])
+
+    def _purge_collected(self) -> None:
+        while self._collected:
+            backend_id = self._collected.popleft()
+            self._finalizers.pop(backend_id, None)
+            self._drop_backend(backend_id)
+
+    def _read(
+        self,
+        backend: Any,
+        key: Tuple[Any, ...],
+        load: Callable[[], List[ContextItem]],
+        touch: bool = False,
+    ) -> List[ContextItem]:
+        write_generation = getattr(backend, "write_generation", None)
+        if write_generation is None:
+            return load()
+        key = (id(backend),) + key
+        generation = write_generation()
+        with self._lock:
+            self._purge_collected()
+            entry = self._entries.get(key)
+            # The backend check guards against a new backend reusing a dead one's id
+            cached: Optional[List[ContextItem]] = None
+            if entry is not None and entry[0]() is backend and entry[1] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                cached = list(entry[2])
+            else:
+                self.misses += 1
+        if cached is not None:
+            touch_items = getattr(backend, "touch", None) if touch else None
+            if touch_items is not None:
+                touch_items(item.context_item_id for item in cached)
+            return cached
+        items = load()
+        if len(items) > self.max_items:
+            return items
+        with self._lock:
+            self._purge_collected()
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._cached_items -= len(old[2])
+            if id(backend) not in self._finalizers:
+                self._finalizers[id(backend)] = weakref.finalize(
+                    backend, self._collected.append, id(backend)
+                )
+            self._entries[key] = (weakref.ref(backend), generation, list(items))
+            self._cached_items += len(items)
+            while len(self._entries) > self.max_entries or self._cached_items > self.max_items:
+                _, (_, _, dropped) = self._entries.popitem(last=False)
+                self._cached_items -= len(dropped)
+        return items
@@ -0,0 +1,313 @@
+"""Bounded pools of project and task memory stores."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+from agent_engine.schemas.memory import ContextItem
+
+from .backend import InMemoryBackend, MemoryBackend
+from .project_store import ProjectMemoryStore
+from .task_store import TaskMemoryStore
+
+logger = logging.getLogger(__name__)
+
+# Characters replaced when a task id becomes a spill file name (a hash of the
+# id is appended, so ids that sanitize alike never share a file)
+_UNSAFE_FILE_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# Returns the backend holding one project's memory, or None for an in-memory one
+ProjectBackendFactory = Callable[[str], Optional[MemoryBackend]]
+
+
+class ProjectStorePool(MutableMapping):
+    """``project_id -> ProjectMemoryStore`` mapping with LRU residency.
+
+    Stores are created on first ``acquire`` from ``backend_factory``. When
+    more than ``max_resident`` stores are loaded, the least recently used one
+    is flushed (its backend's ``close()``) and dropped; the next ``acquire``
+    reopens it from the backend's file. With ``max_resident=None`` nothing is
+    evicted, which is required when backends keep data only in memory.
+
+    Dict-style access (``pool[project_id] = store``, ``in``, ``get``) is kept
+    for callers that manage stores themselves; assigned stores count toward
+    the residency bound like loaded ones. ``on_release`` is called with each
+    store that is flushed and dropped (e.g. to drop cached reads of it).
+    """
+
+    def __init__(
+        self,
+        backend_factory: Optional[ProjectBackendFactory] = None,
+        max_resident: Optional[int] = None,
+        max_items: int = 1000,
+    ):
+        """Initialize pool.
+
+        Args:
+            backend_factory: Opens the backend for a project id (None = InMemoryBackend)
+            max_resident: Maximum stores kept loaded (None = unbounded)
+            max_items: max_items of the ProjectMemoryStores created by acquire
+
+        Raises:
+            ValueError: If max_resident is not positive
+        """
+        if max_resident is not None and max_resident < 1:
+            raise ValueError("max_resident must be >= 1")
+        self.backend_factory = backend_factory
+        self.max_resident = max_resident
+        self.max_items = max_items
+        self.loads = 0
+        self.evictions = 0
+        self.on_release: Optional[Callable[[ProjectMemoryStore], None]] = None
+        self._stores: "OrderedDict[str, ProjectMemoryStore]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def acquire(self, project_id: str) -> ProjectMemoryStore:
+        """Return a project's store, loading it (and evicting the LRU store) if needed."""
+        with self._lock:
+            store = self._stores.get(project_id)
+            if store is not None:
+                self._stores.move_to_end(project_id)
+                return store
+            backend = self.backend_factory(project_id) if self.backend_factory else None
+            store = ProjectMemoryStore(
+                project_id=project_id,
+                backend=backend if backend is not None else InMemoryBackend(),
+                max_items=self.max_items,
+            )
+            self.loads += 1
+            self[project_id] = store
+            return store
+
+    def __getitem__(self, project_id: str) -> ProjectMemoryStore:
+        with self._lock:
+            store = self._stores[project_id]
+            self._stores.move_to_end(project_id)
+            return store
+
+    def __setitem__(self, project_id: str, store: ProjectMemoryStore) -> None:
+        with self._lock:
+            old = self._stores.pop(project_id, None)
+            if old is not None and old is not store:
+                self._flush(old)
+            self._stores[project_id] = store
+            while self.max_resident is not None and len(self._stores) > self.max_resident:
+                _, evicted = self._stores.popitem(last=False)
+                self._flush(evicted)
+                self.evictions += 1
+
+    def __delitem__(self, project_id: str) -> None:
+        with self._lock:
+            self._flush(self._stores.pop(project_id))
+
+    def __contains__(self, project_id: object) -> bool:
+        return project_id in self._stores
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._stores))
+
+    def __len__(self) -> int:
+        return len(self._stores)
+
+    def close(self) -> None:
+        """Flush and drop every resident store."""
+        with self._lock:
+            while self._stores:
+                _, store = self._stores.popitem(last=False)
+                self._flush(store)
+
+    def _flush(self, store: ProjectMemoryStore) -> None:
+        if self.on_release is not None:
+            self.on_release(store)
+        close = getattr(store.backend, "close", None)
+        if close is not None:
+            close()
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Return this process's resident set size, or None if it cannot be read."""
+    try:
+        import psutil
+
+        return int(psutil.Process().memory_info().rss)
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+@dataclass
+class MemoryPressurePolicy:
+    """When idle task stores are spilled from RAM to disk.
+
+    The policy is under pressure when resident task items exceed
+    ``max_resident_items`` or the process RSS exceeds ``max_rss_bytes``.
+    Only stores unused for ``min_idle_seconds`` are spilled, least recently
+    used first, until the pressure is relieved.
+    """
+
+    max_resident_items: Optional[int] = None
+    max_rss_bytes: Optional[int] = None
+    min_idle_seconds: float = 30.0
+    # Directory for spill files; a temporary directory by default
+    spill_dir: Optional[str] = None
+
+    def under_pressure(self, resident_items: int) -> bool:
+        if self.max_resident_items is not None and resident_items > self.max_resident_items:
+            return True
+        if self.max_rss_bytes is not None:
+            rss = current_rss_bytes()
+            return rss is not None and rss > self.max_rss_bytes
+        return False
+
+
+class TaskStorePool(MutableMapping):
+    """``task_id -> TaskMemoryStore`` mapping that can spill idle stores to disk.
+
+    Stores are created on first ``acquire``. After each acquire the
+    ``pressure`` policy (if any) is checked and idle stores are written to
+    JSONL spill files and dropped; acquiring a spilled task reloads it into a
+    new in-memory store. Deleting a task clears its store and spill file.
+    """
+
+    def __init__(self, pressure: Optional[MemoryPressurePolicy] = None):
+        """Initialize pool.
+
+        Args:
+            pressure: Spill policy (None = never spill)
+        """
+        self.pressure = pressure
+        self.spills = 0
+        self._stores: "OrderedDict[str, TaskMemoryStore]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._spilled: Dict[str, Path] = {}
+        self._spill_dir: Optional[Path] = None
+        self._lock = threading.RLock()
+
+    def acquire(self, task_id: str) -> TaskMemoryStore:
+        """Return a task's store, reloading or creating it, then relieve memory pressure."""
+        with self._lock:
+            store = self[task_id] if task_id in self else TaskMemoryStore(task_id=task_id)
+            self[task_id] = store
+            self.relieve_pressure(keep=task_id)
+            return store
+
+    def relieve_pressure(self, keep: Optional[str] = None) -> int:
+        """Spill idle stores (LRU first) while the pressure policy is exceeded.
+
+        Args:
+            keep: Task id that must stay resident
+
+        Returns:
+            Number of stores spilled
+        """
+        if self.pressure is None:
+            return 0
+        spilled = 0
+        with self._lock:
+            resident = sum(store.backend.count() for store in self._stores.values())
+            idle_before = time.monotonic() - self.pressure.min_idle_seconds
+            for task_id in list(self._stores):
+                if not self.pressure.under_pressure(resident):
+                    break
+                if task_id == keep or self._last_used.get(task_id, 0.0) > idle_before:
+                    continue
+                if self._stores[task_id].backend.count() == 0:
+                    continue
+                resident -= self._spill(task_id)
+                spilled += 1
+        return spilled
+
+    def __getitem__(self, task_id: str) -> TaskMemoryStore:
+        with self._lock:
+            store = self._stores.get(task_id)
+            if store is None:
+                store = self._reload(task_id)
+            self._stores.move_to_end(task_id)
+            self._last_used[task_id] = time.monotonic()
+            return store
+
+    def __setitem__(self, task_id: str, store: TaskMemoryStore) -> None:
+        with self._lock:
+            self._discard_spill(task_id)
+            self._stores[task_id] = store
+            self._stores.move_to_end(task_id)
+            self._last_used[task_id] = time.monotonic()
+
+    def __delitem__(self, task_id: str) -> None:
+        with self._lock:
+            if task_id not in self:
+                raise KeyError(task_id)
+            store = self._stores.pop(task_id, None)
+            if store is not None:
+                store.clear()
+            self._last_used.pop(task_id, None)
+            self._discard_spill(task_id)
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self._stores or task_id in self._spilled
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._stores) + list(self._spilled))
+
+    def __len__(self) -> int:
+        return len(self._stores) + len(self._spilled)
+
+    def is_resident(self, task_id: str) -> bool:
+        """Return True if the task's store is loaded in memory."""
+        return task_id in self._stores
+
+    def _spill(self, task_id: str) -> int:
+        """Write a resident store to its spill file and drop it; returns items spilled."""
+        store = self._stores.pop(task_id)
+        self._last_used.pop(task_id, None)
+        items = store.backend.list_all()
+        path = self._spill_path(task_id)
+        with open(path, "w") as f:
+            for item in items:
+                f.write(item.model_dump_json() + "\n")
+        store.clear()
+        self._spilled[task_id] = path
+        self.spills += 1
+        logger.debug(f"Spilled task memory {task_id} ({len(items)} items) to {path}")
+        return len(items)
+
+    def _reload(self, task_id: str) -> TaskMemoryStore:
+        path = self._spilled.pop(task_id)
+        with open(path) as f:
+            items = [ContextItem.model_validate_json(line) for line in f if line.strip()]
+        path.unlink(missing_ok=True)
+        store = TaskMemoryStore(task_id=task_id)
+        store.backend.add_many(items)
+        self._stores[task_id] = store
+        return store
+
+    def _discard_spill(self, task_id: str) -> None:
+        path = self._spilled.pop(task_id, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def _spill_path(self, task_id: str) -> Path:
+        if self._spill_dir is None:
+            spill_dir = self.pressure.spill_dir if self.pressure else None
+            if spill_dir:
+                self._spill_dir = Path(spill_dir)
+                self._spill_dir.mkdir(parents=True, exist_ok=True)
+            else:
+                self._spill_dir = Path(tempfile.mkdtemp(prefix="agent-engine-task-memory-"))
+        digest = hashlib.sha1(task_id.encode("utf-8")).hexdigest()[:8]
+        return self._spill_dir / f"{_UNSAFE_FILE_CHARS.sub('_', task_id)}-{digest}.jsonl"
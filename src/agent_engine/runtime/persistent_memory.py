@@ -6,17 +6,105 @@ memory items and artifacts with automatic persistence and retention policies.
 
 from __future__ import annotations
 
+import hashlib
 import json
 import sqlite3
 import os
+import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Protocol
+from typing import Any, Dict, Iterable, List, Optional, Protocol, TextIO
 from datetime import datetime
 from zoneinfo import ZoneInfo
+import logging
 import threading
+import time
 
+from agent_engine.runtime.memory.backend import search_items_by_text, text_search_terms
+from agent_engine.runtime.memory.compact import CompactItemStore
+from agent_engine.runtime.memory.ordered_index import RetentionIndex, item_epoch
 from agent_engine.schemas.memory import ContextItem
 
+logger = logging.getLogger(__name__)
+
+JSONL_FSYNC_POLICIES = ("always", "interval", "never")
+
+# Marks a JSONL log record that deletes an earlier item
+_TOMBSTONE_KEY = "__deleted__"
+
+# Characters replaced when a partition name becomes a file name
+_UNSAFE_PARTITION_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# Per-connection prepared statement cache entries and page cache (negative = KiB)
+_SQLITE_STATEMENT_CACHE_SIZE = 256
+_SQLITE_CACHE_SIZE = -16000
+
+_ITEM_COLUMNS = (
+    "id, context_item_id, kind, source, timestamp, tags, "
+    "importance, token_cost, payload, metadata, created_at"
+)
+_SQL_UPSERT_ITEM = (
+    f"INSERT OR REPLACE INTO memory_items ({_ITEM_COLUMNS}, expires_from) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_GET_ITEM = f"SELECT {_ITEM_COLUMNS} FROM memory_items WHERE context_item_id = ?"
+
+# Columns SQLiteBackend.query filters and sorts on (interpolated only after this check)
+_FILTER_COLUMNS = frozenset({
+    "context_item_id", "kind", "source", "timestamp", "importance", "token_cost",
+})
+_SORTABLE_COLUMNS = _FILTER_COLUMNS | {"created_at"}
+_SQL_OPERATORS = {
+    "$eq": "=",
+    "$ne": "!=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+_PY_OPERATORS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+}
+
+
+def _expires_from(timestamp: Optional[str], created_at: str) -> float:
+    """Return the epoch second TTL expiry counts from for a stored row."""
+    for value in (timestamp, created_at):
+        if value:
+            try:
+                return datetime.fromisoformat(value).timestamp()
+            except (TypeError, ValueError):
+                continue
+    return time.time()
+
+
+def _matches_filters(item: ContextItem, filters: Dict[str, Any]) -> bool:
+    """Check an item against filters with InMemoryBackend semantics."""
+    for field, value in filters.items():
+        item_value = getattr(item, field, None)
+        if isinstance(value, dict):
+            for op, target in value.items():
+                if item_value is None:
+                    ok = (op == "$eq" and target is None) or (op == "$ne" and target is not None)
+                else:
+                    try:
+                        ok = _PY_OPERATORS[op](item_value, target)
+                    except (KeyError, TypeError, AttributeError):
+                        ok = False
+                if not ok:
+                    return False
+        elif isinstance(value, list):
+            if not isinstance(item_value, list) or not any(v in item_value for v in value):
+                return False
+        elif item_value != value:
+            return False
+    return True
+
+
 
 class PersistentBackend(Protocol):
     """Abstract interface for persistent storage backends."""
@@ -32,17 +120,31 @@ class PersistentBackend(Protocol):
         """
         ...
 
+    def add_many(
+        self, items: List[ContextItem], max_items: Optional[int] = None
+    ) -> None:
+        """Add a batch of items in one write, then enforce retention once.
+
+        Args:
+            items: ContextItems to store (later duplicates of an id win)
+            max_items: Retention limit applied after the batch (None = no limit)
+
+        Raises:
+            IOError: If persistence fails
+        """
+        ...
+
     def query(
         self,
         filters: Dict[str, Any],
-        limit: int = 100,
+        limit: Optional[int] = 100,
         order_by: str = "timestamp"
     ) -> List[ContextItem]:
         """Query items matching filters.
 
         Args:
             filters: Dict of field->value filters
-            limit: Maximum items to return
+            limit: Maximum items to return (None = no limit)
             order_by: Field to sort by
 
         Returns:
@@ -100,37 +202,103 @@ class PersistentBackend(Protocol):
         """
         ...
 
+    def search_text(self, query: str, limit: int = 20) -> List[ContextItem]:
+        """Full-text search over item payloads.
+
+        Args:
+            query: Free-text query; items matching any term are returned
+            limit: Maximum items to return
+
+        Returns:
+            Matching ContextItems, most relevant first
+        """
+        ...
+
 
 class JsonLinesBackend:
     """JSONL file-backed storage for context items.
 
-    Each line in the file is a complete JSON record. Provides:
-    - Automatic flushing on every write
-    - Efficient append-on-write semantics
-    - Automatic retention enforcement
+    The file is an append-only log: ``add`` appends the item's record and
+    ``delete`` appends a tombstone, so a write costs one line regardless of
+    store size. Loading replays the log (the last record per id wins). When
+    superseded records and tombstones make up more than
+    ``compaction_threshold`` of the log, it is compacted by rewriting the live
+    items to a temporary file and atomically replacing the log, by default
+    on a background thread so writers are not blocked.
+
+    Durability follows ``fsync``:
+    - "always": fsync after every write
+    - "interval": fsync at most every ``fsync_interval`` seconds
+    - "never": flush to the OS only (the default)
+
+    Retention and TTL expiry use an ordered index (see ``RetentionIndex``),
+    so evicting k items costs O(k log n) instead of a sort of the store.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        fsync: str = "never",
+        fsync_interval: float = 1.0,
+        compaction_threshold: float = 0.5,
+        min_compaction_records: int = 64,
+        background_compaction: bool = True,
+        retention: str = "fifo",
+        ttl_seconds: Optional[float] = None,
+    ):
         """Initialize JSONL backend.
 
         Args:
             file_path: Path to JSONL file (created if doesn't exist)
+            fsync: Fsync policy - "always", "interval" or "never"
+            fsync_interval: Seconds between fsyncs for the "interval" policy
+            compaction_threshold: Dead-record ratio (0-1) above which the log is compacted
+            min_compaction_records: Logs with fewer records are never compacted
+            background_compaction: Compact on a background thread instead of inline
+            retention: Eviction order for enforce_retention - "fifo" or "lru"
+            ttl_seconds: Items older than this are deleted lazily (None = never)
 
         Raises:
             OSError: If directory cannot be created
+            ValueError: If fsync policy, compaction threshold or retention is invalid
         """
+        if fsync not in JSONL_FSYNC_POLICIES:
+            raise ValueError(
+                f"Unknown fsync policy '{fsync}'; expected one of {', '.join(JSONL_FSYNC_POLICIES)}"
+            )
+        if not 0 < compaction_threshold <= 1:
+            raise ValueError("compaction_threshold must be in (0, 1]")
+
         self.file_path = Path(file_path)
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # In-memory cache for faster queries
-        self._items: Dict[str, ContextItem] = {}
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compaction_threshold = compaction_threshold
+        self.min_compaction_records = min_compaction_records
+        self.background_compaction = background_compaction
+
+        # In-memory cache for faster queries, in compact columnar form
+        self._items = CompactItemStore()
+        self._retention = RetentionIndex(retention, ttl_seconds)
         self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._last_fsync = time.monotonic()
+        # Records (lines) currently in the log; dead records = records - live items
+        self._records = 0
+        # Bumped by clear() so an in-flight compaction discards its snapshot
+        self._generation = 0
+        self._compaction_thread: Optional[threading.Thread] = None
 
         # Load existing items from file
         self._load_from_file()
 
+    @property
+    def dead_records(self) -> int:
+        """Superseded records and tombstones currently in the log."""
+        return self._records - len(self._items)
+
     def _load_from_file(self) -> None:
-        """Load all items from JSONL file into memory."""
+        """Replay the JSONL log into memory."""
         if not self.file_path.exists():
             return
 
@@ -139,12 +307,18 @@ class JsonLinesBackend:
                 line = line.strip()
                 if not line:
                     continue
+                self._records += 1
                 try:
                     data = json.loads(line)
+                    if data.get(_TOMBSTONE_KEY):
+                        self._items.pop(data["context_item_id"])
+                        self._retention.forget(data["context_item_id"])
+                        continue
                     item = self._deserialize_context_item(data)
-                    self._items[item.context_item_id] = item
-                except (json.JSONDecodeError, ValueError, KeyError):
-                    # Skip malformed lines
+                    self._items.put(item)
+                    self._retention.track(item)
+                except (json.JSONDecodeError, ValueError, KeyError, AttributeError):
+                    # Skip malformed lines (counted as dead, dropped on compaction)
                     pass
 
     def _serialize_context_item(self, item: ContextItem) -> Dict[str, Any]:
@@ -175,44 +349,104 @@ class JsonLinesBackend:
             metadata=data.get("metadata", {})
         )
 
-    def _flush_to_file(self) -> None:
-        """Flush all items to file."""
-        with open(self.file_path, 'w') as f:
-            for item in self._items.values():
-                data = self._serialize_context_item(item)
-                f.write(json.dumps(data) + '\n')
+    def _handle(self):
+        """Return the append handle, opening it if needed (lock held)."""
+        if self._file is None:
+            self._file = open(self.file_path, 'a')
+        return self._file
+
+    def _append(self, lines: List[str]) -> None:
+        """Append serialized records to the log and apply the fsync policy (lock held)."""
+        f = self._handle()
+        f.write(''.join(lines))
+        f.flush()
+        self._records += len(lines)
+        if self.fsync == "always":
+            os.fsync(f.fileno())
+        elif self.fsync == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(f.fileno())
+                self._last_fsync = now
+
+    def _close_handle(self) -> None:
+        """Flush, sync (unless fsync is "never") and close the append handle (lock held)."""
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def _tombstone(self, item_id: str) -> str:
+        return json.dumps({"context_item_id": item_id, _TOMBSTONE_KEY: True}) + '\n'
 
     def add(self, item: ContextItem) -> None:
-        """Add item and flush to file.
+        """Add item and append its record to the log.
 
         Args:
             item: ContextItem to add
         """
+        self.add_many([item])
+
+    def add_many(
+        self, items: List[ContextItem], max_items: Optional[int] = None
+    ) -> None:
+        """Add a batch of items with a single log append.
+
+        Records for the batch and tombstones for items evicted by retention
+        are written together.
+
+        Args:
+            items: ContextItems to add (later duplicates of an id win)
+            max_items: Retention limit applied after the batch (None = no limit)
+        """
+        if not items:
+            return
+        lines = [json.dumps(self._serialize_context_item(item)) + '\n' for item in items]
         with self._lock:
-            self._items[item.context_item_id] = item
-            self._flush_to_file()
+            for item in items:
+                self._items.put(item)
+                self._retention.track(item)
+            removed = self._retention.expired() + self._retention.evict(max_items)
+            for item_id in removed:
+                self._items.pop(item_id)
+            lines.extend(self._tombstone(item_id) for item_id in removed)
+            self._append(lines)
+        self._maybe_compact()
+
+    def _sweep_expired(self) -> None:
+        """Delete items older than the TTL and log their tombstones (lock held)."""
+        expired = self._retention.expired()
+        if not expired:
+            return
+        for item_id in expired:
+            self._items.pop(item_id)
+        self._append([self._tombstone(item_id) for item_id in expired])
 
     def query(
         self,
         filters: Dict[str, Any],
-        limit: int = 100,
+        limit: Optional[int] = 100,
         order_by: str = "timestamp"
     ) -> List[ContextItem]:
         """Query items matching filters.
 
         Args:
             filters: Field->value filter dict
-            limit: Max items to return
+            limit: Max items to return (None = no limit)
             order_by: Field to sort by
 
         Returns:
             List of matching items
         """
         with self._lock:
+            self._sweep_expired()
             results = []
-            for item in self._items.values():
-                if self._matches_filters(item, filters):
-                    results.append(item)
+            for view in self._items.views():
+                if self._matches_filters(view, filters):
+                    results.append(view)
 
             # Sort
             reverse = True
@@ -225,9 +459,12 @@ class JsonLinesBackend:
                 reverse=reverse
             )
 
-            return results[:limit]
+            items = [view.materialize() for view in results[:limit]]
+            for item in items:
+                self._retention.touch(item.context_item_id)
+            return items
 
-    def _matches_filters(self, item: ContextItem, filters: Dict[str, Any]) -> bool:
+    def _matches_filters(self, item: Any, filters: Dict[str, Any]) -> bool:
         """Check if item matches all filters."""
         for field, value in filters.items():
             item_value = getattr(item, field, None)
@@ -275,33 +512,65 @@ class JsonLinesBackend:
     def get(self, item_id: str) -> Optional[ContextItem]:
         """Get item by ID."""
         with self._lock:
-            return self._items.get(item_id)
+            self._sweep_expired()
+            item = self._items.get(item_id)
+            if item is not None:
+                self._retention.touch(item_id)
+            return item
+
+    def touch(self, item_ids: Iterable[str]) -> None:
+        """Mark items as just read for "lru" retention (e.g. served from a read cache)."""
+        with self._lock:
+            for item_id in item_ids:
+                self._retention.touch(item_id)
 
     def delete(self, item_id: str) -> bool:
-        """Delete item by ID and flush."""
+        """Delete item by ID by appending a tombstone."""
         with self._lock:
-            if item_id in self._items:
-                del self._items[item_id]
-                self._flush_to_file()
-                return True
-            return False
+            if not self._items.pop(item_id):
+                return False
+            self._retention.forget(item_id)
+            self._append([self._tombstone(item_id)])
+        self._maybe_compact()
+        return True
 
     def list_all(self) -> List[ContextItem]:
         """List all items."""
         with self._lock:
-            return list(self._items.values())
+            self._sweep_expired()
+            return self._items.values()
 
     def clear(self) -> None:
-        """Clear all items and flush."""
+        """Clear all items and truncate the log."""
         with self._lock:
             self._items.clear()
-            self._flush_to_file()
+            self._retention.clear()
+            self._close_handle()
+            with open(self.file_path, 'w') as f:
+                if self.fsync != "never":
+                    os.fsync(f.fileno())
+            self._records = 0
+            self._generation += 1
 
     def count(self) -> int:
         """Count items."""
         with self._lock:
+            self._sweep_expired()
             return len(self._items)
 
+    def search_text(self, query: str, limit: int = 20) -> List[ContextItem]:
+        """Rank items by query-term occurrences in their payload (linear scan)."""
+        with self._lock:
+            self._sweep_expired()
+            views = search_items_by_text(list(self._items.views()), query, limit)
+            return [view.materialize() for view in views]
+
+    def write_generation(self) -> int:
+        """Return a counter that changes whenever the stored items change."""
+        with self._lock:
+            self._sweep_expired()
+            return self._items.generation
+
     def enforce_retention(self, max_items: Optional[int]) -> None:
         """Enforce retention by deleting oldest items.
 
@@ -312,16 +581,78 @@ class JsonLinesBackend:
             return
 
         with self._lock:
-            if len(self._items) > max_items:
-                # Sort by timestamp, delete oldest
-                sorted_items = sorted(
-                    self._items.values(),
-                    key=lambda i: i.timestamp or ""
+            evicted = self._retention.evict(max_items)
+            if not evicted:
+                return
+            for item_id in evicted:
+                self._items.pop(item_id)
+            self._append([self._tombstone(item_id) for item_id in evicted])
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Start a compaction if the dead-record ratio exceeds the threshold."""
+        with self._lock:
+            if self._records < self.min_compaction_records:
+                return
+            if self.dead_records / self._records <= self.compaction_threshold:
+                return
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            if self.background_compaction:
+                self._compaction_thread = threading.Thread(
+                    target=self.compact, name="jsonl-compaction", daemon=True
                 )
-                to_delete = sorted_items[:len(self._items) - max_items]
-                for item in to_delete:
-                    del self._items[item.context_item_id]
-                self._flush_to_file()
+                self._compaction_thread.start()
+                return
+        self.compact()
+
+    def compact(self) -> bool:
+        """Rewrite the log with only live items.
+
+        The live set is snapshotted under the lock and written outside it;
+        records appended meanwhile are copied over before the new file
+        atomically replaces the log.
+
+        Returns:
+            True if the log was replaced, False if a concurrent clear() made
+            the snapshot obsolete
+        """
+        with self._lock:
+            generation = self._generation
+            snapshot = self._items.values()
+            snapshot_records = self._records
+            self._handle().flush()
+            offset = os.path.getsize(self.file_path)
+
+        tmp_path = self.file_path.with_name(f"{self.file_path.name}.{os.getpid()}.compact")
+        with open(tmp_path, 'w') as out:
+            for item in snapshot:
+                out.write(json.dumps(self._serialize_context_item(item)) + '\n')
+
+            with self._lock:
+                if generation != self._generation:
+                    out.close()
+                    tmp_path.unlink(missing_ok=True)
+                    return False
+                # Carry over records appended while the snapshot was written
+                self._handle().flush()
+                with open(self.file_path, 'rb') as src:
+                    src.seek(offset)
+                    out.write(src.read().decode('utf-8'))
+                out.flush()
+                os.fsync(out.fileno())
+                self._close_handle()
+                os.replace(tmp_path, self.file_path)
+                self._records = len(snapshot) + (self._records - snapshot_records)
+        return True
+
+    def close(self) -> None:
+        """Wait for a running compaction, then sync and close the log."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            self._close_handle()
 
 
 class SQLiteBackend:
@@ -329,31 +660,102 @@ class SQLiteBackend:
 
     Provides:
     - Persistent storage with atomic writes
-    - Automatic commit on every write
+    - One long-lived connection per thread (WAL mode, so readers do not
+      block the writer), reusing each connection's prepared-statement cache
+    - Batched inserts via ``add_many`` (one transaction per batch)
     - Efficient querying via SQL
-    - Automatic retention enforcement
+    - Automatic retention enforcement and optional TTL expiry, both driven
+      by indexes so they never scan the table
+    - A ``write_generation`` that also reflects commits by other processes
     - Support for artifacts with metadata
     """
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        synchronous: str = "NORMAL",
+        busy_timeout: float = 5.0,
+        full_text_search: bool = False,
+        ttl_seconds: Optional[float] = None,
+    ):
         """Initialize SQLite backend.
 
         Args:
             db_path: Path to SQLite database (created if doesn't exist)
+            synchronous: ``PRAGMA synchronous`` level ("OFF", "NORMAL" or "FULL");
+                NORMAL is durable across application crashes in WAL mode
+            busy_timeout: Seconds to wait for a lock held by another process
+            full_text_search: Maintain an FTS5 index over item payloads for
+                ``search_text`` (ignored if SQLite lacks FTS5)
+            ttl_seconds: Items whose ``timestamp`` (or, without one, the time
+                they were stored) is older than this are deleted lazily, on
+                writes and at most once per second on reads (None = never)
 
         Raises:
             sqlite3.Error: If database operations fail
+            ValueError: If synchronous is not a known level or ttl_seconds <= 0
         """
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Unknown synchronous level: {synchronous}")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.synchronous = synchronous.upper()
+        self.busy_timeout = busy_timeout
+        self.full_text_search = full_text_search
+        self.ttl_seconds = ttl_seconds
+        self._last_sweep = 0.0
+        # Serializes writers within this process; readers use their own connections
         self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Connections opened so far, and memory_items writes made through this backend
+        self._opened = 0
+        self._writes = 0
 
         self._init_database()
 
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and configuring it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                check_same_thread=False,
+                cached_statements=_SQLITE_STATEMENT_CACHE_SIZE,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute(f"PRAGMA cache_size={_SQLITE_CACHE_SIZE}")
+            # REPLACE must fire the delete triggers that keep the tag table in sync
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._opened += 1
+                self._local.serial = self._opened
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by this backend."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
     def _init_database(self) -> None:
         """Initialize database schema if needed."""
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._conn()
+            with conn:
                 conn.execute('''
                     CREATE TABLE IF NOT EXISTS memory_items (
                         id TEXT PRIMARY KEY,
@@ -366,9 +768,29 @@ class SQLiteBackend:
                         token_cost REAL,
                         payload TEXT NOT NULL,
                         metadata TEXT,
-                        created_at TEXT NOT NULL
+                        created_at TEXT NOT NULL,
+                        expires_from REAL
                     )
                 ''')
+                self._init_expiry_column(conn)
+
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_memory_timestamp ON memory_items(timestamp)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_memory_kind ON memory_items(kind, timestamp)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_memory_created_at ON memory_items(created_at)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_memory_expires_from "
+                    "ON memory_items(expires_from)"
+                )
+                self._init_count_table(conn)
+                self._init_tag_table(conn)
+                if self.full_text_search:
+                    self.full_text_search = self._init_fts_table(conn)
 
                 conn.execute('''
                     CREATE TABLE IF NOT EXISTS artifacts (
@@ -395,7 +817,148 @@ class SQLiteBackend:
                     CREATE INDEX IF NOT EXISTS idx_artifact_type ON artifacts(artifact_type)
                 ''')
 
-                conn.commit()
+    def _init_expiry_column(self, conn: sqlite3.Connection) -> None:
+        """Add and backfill ``expires_from`` on databases created without it.
+
+        ``expires_from`` is the epoch second TTL expiry counts from: the
+        item's ``timestamp``, or the time it was stored if it has none (the
+        same rule as the in-memory and JSONL backends).
+        """
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(memory_items)")}
+        if "expires_from" in columns:
+            return
+        conn.execute("ALTER TABLE memory_items ADD COLUMN expires_from REAL")
+        rows = conn.execute("SELECT id, timestamp, created_at FROM memory_items").fetchall()
+        conn.executemany(
+            "UPDATE memory_items SET expires_from = ? WHERE id = ?",
+            [(_expires_from(ts, created_at), row_id) for row_id, ts, created_at in rows],
+        )
+
+    def _init_count_table(self, conn: sqlite3.Connection) -> None:
+        """Create the one-row item count and the triggers that maintain it.
+
+        Retention reads the count on every bounded write, so it is kept by
+        insert/delete triggers (REPLACE fires both) instead of ``COUNT(*)``,
+        which scans the whole table.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_item_count'"
+        ).fetchone()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS memory_item_count (n INTEGER NOT NULL)"
+        )
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS memory_items_count_ai AFTER INSERT ON memory_items
+            BEGIN
+                UPDATE memory_item_count SET n = n + 1;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS memory_items_count_ad AFTER DELETE ON memory_items
+            BEGIN
+                UPDATE memory_item_count SET n = n - 1;
+            END
+        ''')
+        if not exists:
+            conn.execute("INSERT INTO memory_item_count (n) SELECT COUNT(*) FROM memory_items")
+
+    def _init_tag_table(self, conn: sqlite3.Connection) -> None:
+        """Create the normalized tag table and the triggers that maintain it.
+
+        ``memory_items.tags`` stays the source of truth (a JSON array); the
+        triggers mirror it into ``memory_item_tags`` on insert and drop the
+        rows on delete (including REPLACE), so tag filters can use the
+        ``(tag, item_id)`` primary key instead of scanning every item.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_item_tags'"
+        ).fetchone()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS memory_item_tags (
+                tag TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                PRIMARY KEY (tag, item_id)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_memory_item_tags_item ON memory_item_tags(item_id)"
+        )
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS memory_items_tags_ai AFTER INSERT ON memory_items
+            BEGIN
+                INSERT OR IGNORE INTO memory_item_tags (tag, item_id)
+                SELECT value, new.context_item_id FROM json_each(new.tags);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS memory_items_tags_ad AFTER DELETE ON memory_items
+            BEGIN
+                DELETE FROM memory_item_tags WHERE item_id = old.context_item_id;
+            END
+        ''')
+        if not exists:
+            # Databases created before the tag table: backfill from the JSON column
+            conn.execute('''
+                INSERT OR IGNORE INTO memory_item_tags (tag, item_id)
+                SELECT j.value, m.context_item_id FROM memory_items m, json_each(m.tags) j
+            ''')
+
+    def _init_fts_table(self, conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 index over payloads and its sync triggers.
+
+        The index is an external-content table over ``memory_items`` (only
+        the inverted index is stored); triggers add and remove entries as
+        rows are inserted, replaced and deleted.
+
+        Returns:
+            False if this SQLite build has no FTS5 support
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_items_fts'"
+        ).fetchone()
+        try:
+            conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS memory_items_fts USING fts5(
+                    payload, content='memory_items', content_rowid='rowid'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search disabled for {self.db_path}: {e}")
+            return False
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS memory_items_fts_ai AFTER INSERT ON memory_items
+            BEGIN
+                INSERT INTO memory_items_fts (rowid, payload) VALUES (new.rowid, new.payload);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS memory_items_fts_ad AFTER DELETE ON memory_items
+            BEGIN
+                INSERT INTO memory_items_fts (memory_items_fts, rowid, payload)
+                VALUES ('delete', old.rowid, old.payload);
+            END
+        ''')
+        if not exists:
+            conn.execute("INSERT INTO memory_items_fts (memory_items_fts) VALUES ('rebuild')")
+        return True
+
+    def _item_row(self, item: ContextItem, created_at: str, stored_at: float) -> tuple:
+        """Build the memory_items parameter tuple for an item."""
+        epoch = item_epoch(item)
+        return (
+            item.context_item_id,  # Use item ID as row ID
+            item.context_item_id,
+            item.kind,
+            item.source,
+            item.timestamp,
+            json.dumps(item.tags or []),
+            item.importance,
+            item.token_cost,
+            json.dumps(item.payload),
+            json.dumps(item.metadata or {}),
+            created_at,
+            epoch if epoch is not None else stored_at,
+        )
 
     def add(self, item: ContextItem) -> None:
         """Add item to database.
@@ -403,71 +966,161 @@ class SQLiteBackend:
         Args:
             item: ContextItem to add
         """
+        self.add_many([item])
+
+    def add_many(
+        self, items: List[ContextItem], max_items: Optional[int] = None
+    ) -> None:
+        """Add a batch of items and apply retention in a single transaction.
+
+        Args:
+            items: ContextItems to add (later duplicates of an id win)
+            max_items: Retention limit applied after the batch (None = no limit)
+        """
+        if not items:
+            return
+        stored_at = time.time()
+        created_at = datetime.fromtimestamp(stored_at, ZoneInfo("UTC")).isoformat()
+        rows = [self._item_row(item, created_at, stored_at) for item in items]
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    INSERT OR REPLACE INTO memory_items
-                    (id, context_item_id, kind, source, timestamp, tags,
-                     importance, token_cost, payload, metadata, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    item.context_item_id,  # Use item ID as row ID
-                    item.context_item_id,
-                    item.kind,
-                    item.source,
-                    item.timestamp,
-                    json.dumps(item.tags or []),
-                    item.importance,
-                    item.token_cost,
-                    json.dumps(item.payload),
-                    json.dumps(item.metadata or {}),
-                    datetime.now(ZoneInfo("UTC")).isoformat()
-                ))
-                conn.commit()
+            conn = self._conn()
+            with conn:
+                conn.executemany(_SQL_UPSERT_ITEM, rows)
+                self._delete_expired(conn)
+                self._delete_oldest(conn, max_items)
+            self._writes += 1
+
+    def sweep_expired(self) -> int:
+        """Delete items older than ``ttl_seconds``.
+
+        Returns:
+            Number of items deleted
+        """
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            conn = self._conn()
+            with conn:
+                return self._delete_expired(conn)
+
+    def _maybe_sweep(self) -> None:
+        """Sweep expired items before a read, at most once per second."""
+        if self.ttl_seconds is None or time.monotonic() - self._last_sweep < 1.0:
+            return
+        self.sweep_expired()
+
+    def _delete_expired(self, conn: sqlite3.Connection) -> int:
+        """Delete expired items via idx_memory_expires_from (inside the caller's transaction)."""
+        if self.ttl_seconds is None:
+            return 0
+        self._last_sweep = time.monotonic()
+        cursor = conn.execute(
+            "DELETE FROM memory_items WHERE expires_from < ?", (time.time() - self.ttl_seconds,)
+        )
+        if cursor.rowcount:
+            self._writes += 1
+        return cursor.rowcount
 
     def query(
         self,
         filters: Dict[str, Any],
-        limit: int = 100,
+        limit: Optional[int] = 100,
         order_by: str = "timestamp"
     ) -> List[ContextItem]:
         """Query items with SQL filtering.
 
+        Column equality, ``$eq``/``$ne``/``$gt``/``$gte``/``$lt``/``$lte``
+        operators and tag lists (any-of) are evaluated in SQL; filters on
+        other fields are applied to the fetched rows in Python, with the same
+        semantics as ``InMemoryBackend``.
+
         Args:
             filters: Field->value filter dict
-            limit: Max items
-            order_by: Field to sort by
+            limit: Max items (None = no limit)
+            order_by: Column to sort by, newest/largest first; prefix "-" for ascending
 
         Returns:
             List of matching items
-        """
-        with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                query = "SELECT * FROM memory_items WHERE 1=1"
-                params = []
-
-                for field, value in filters.items():
-                    if field in ["kind", "source", "importance", "token_cost"]:
-                        query += f" AND {field} = ?"
-                        params.append(value)
-
-                # Handle timestamp ordering
-                reverse = True
-                if order_by.startswith("-"):
-                    order_by = order_by[1:]
-                    reverse = False
 
-                query += f" ORDER BY {order_by} {'DESC' if reverse else 'ASC'}"
-                query += f" LIMIT {limit}"
-
-                rows = conn.execute(query, params).fetchall()
-
-                items = []
-                for row in rows:
-                    item = self._deserialize_row(row)
-                    items.append(item)
+        Raises:
+            ValueError: If order_by is not a sortable column
+        """
+        reverse = True
+        if order_by.startswith("-"):
+            order_by = order_by[1:]
+            reverse = False
+        if order_by not in _SORTABLE_COLUMNS:
+            columns = ", ".join(sorted(_SORTABLE_COLUMNS))
+            raise ValueError(f"Cannot order by '{order_by}'; expected one of {columns}")
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        residual: Dict[str, Any] = {}
+        for field, value in filters.items():
+            if not self._push_down(field, value, clauses, params):
+                residual[field] = value
+
+        query = f"SELECT {_ITEM_COLUMNS} FROM memory_items"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {order_by} {'DESC' if reverse else 'ASC'}"
+        if limit is not None and not residual:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        self._maybe_sweep()
+        rows = self._conn().execute(query, params).fetchall()
+        items = [self._deserialize_row(row) for row in rows]
+        if residual:
+            items = [item for item in items if _matches_filters(item, residual)]
+            if limit is not None:
+                items = items[:limit]
+        return items
+
+    @staticmethod
+    def _push_down(field: str, value: Any, clauses: List[str], params: List[Any]) -> bool:
+        """Translate one filter into SQL, returning False if it must run in Python."""
+        if field == "tags":
+            if not isinstance(value, list):
+                return False
+            if not value:
+                # No tag can match an empty any-of list
+                clauses.append("0")
+                return True
+            placeholders = ", ".join("?" for _ in value)
+            clauses.append(
+                "context_item_id IN (SELECT item_id FROM memory_item_tags "
+                f"WHERE tag IN ({placeholders}))"
+            )
+            params.extend(value)
+            return True
 
-                return items
+        if field not in _FILTER_COLUMNS:
+            return False
+        if isinstance(value, list):
+            # Scalar columns never match list membership
+            clauses.append("0")
+            return True
+        if not isinstance(value, dict):
+            value = {"$eq": value}
+
+        for op, target in value.items():
+            if op not in _SQL_OPERATORS:
+                clauses.append("0")
+            elif target is None:
+                # Mirror InMemoryBackend: only $eq/$ne are meaningful against None
+                clauses.append(
+                    f"{field} IS NULL" if op == "$eq"
+                    else f"{field} IS NOT NULL" if op == "$ne"
+                    else "0"
+                )
+            elif op == "$ne":
+                clauses.append(f"({field} IS NULL OR {field} != ?)")
+                params.append(target)
+            else:
+                clauses.append(f"{field} {_SQL_OPERATORS[op]} ?")
+                params.append(target)
+        return True
 
     def _deserialize_row(self, row: tuple) -> ContextItem:
         """Deserialize database row to ContextItem."""
@@ -488,50 +1141,79 @@ class SQLiteBackend:
 
     def get(self, item_id: str) -> Optional[ContextItem]:
         """Get item by ID."""
-        with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                row = conn.execute(
-                    "SELECT * FROM memory_items WHERE context_item_id = ?",
-                    (item_id,)
-                ).fetchone()
-
-                if row:
-                    return self._deserialize_row(row)
-                return None
+        self._maybe_sweep()
+        row = self._conn().execute(_SQL_GET_ITEM, (item_id,)).fetchone()
+        if row:
+            return self._deserialize_row(row)
+        return None
 
     def delete(self, item_id: str) -> bool:
         """Delete item by ID."""
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._conn()
+            with conn:
                 cursor = conn.execute(
                     "DELETE FROM memory_items WHERE context_item_id = ?",
                     (item_id,)
                 )
-                conn.commit()
-                return cursor.rowcount > 0
+            if cursor.rowcount:
+                self._writes += 1
+            return cursor.rowcount > 0
 
     def list_all(self) -> List[ContextItem]:
         """List all items."""
-        with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                rows = conn.execute("SELECT * FROM memory_items").fetchall()
-                return [self._deserialize_row(row) for row in rows]
+        self._maybe_sweep()
+        rows = self._conn().execute(f"SELECT {_ITEM_COLUMNS} FROM memory_items").fetchall()
+        return [self._deserialize_row(row) for row in rows]
 
     def clear(self) -> None:
         """Clear all items."""
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._conn()
+            with conn:
                 conn.execute("DELETE FROM memory_items")
-                conn.commit()
+            self._writes += 1
 
     def count(self) -> int:
         """Count items."""
-        with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                result = conn.execute(
-                    "SELECT COUNT(*) FROM memory_items"
-                ).fetchone()
-                return result[0] if result else 0
+        self._maybe_sweep()
+        result = self._conn().execute("SELECT n FROM memory_item_count").fetchone()
+        return result[0] if result else 0
+
+    def search_text(self, query: str, limit: int = 20) -> List[ContextItem]:
+        """Full-text search over item payloads.
+
+        Uses the FTS5 index (BM25 ranking) when ``full_text_search`` is on,
+        otherwise a ``LIKE`` scan ordered by recency.
+
+        Args:
+            query: Free-text query; items matching any term are returned
+            limit: Maximum items to return
+
+        Returns:
+            Matching items, most relevant first
+        """
+        terms = text_search_terms(query)
+        if not terms:
+            return []
+        self._maybe_sweep()
+        if self.full_text_search:
+            match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+            columns = ", ".join(f"m.{c.strip()}" for c in _ITEM_COLUMNS.split(","))
+            rows = self._conn().execute(
+                f"SELECT {columns} FROM memory_items_fts f "
+                "JOIN memory_items m ON m.rowid = f.rowid "
+                "WHERE memory_items_fts MATCH ? ORDER BY bm25(memory_items_fts) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        else:
+            where = " OR ".join("payload LIKE ?" for _ in terms)
+            rows = self._conn().execute(
+                f"SELECT {_ITEM_COLUMNS} FROM memory_items WHERE {where} "
+                "ORDER BY timestamp DESC LIMIT ?",
+                [f"%{term}%" for term in terms] + [limit]
+            ).fetchall()
+        return [self._deserialize_row(row) for row in rows]
 
     def enforce_retention(self, max_items: Optional[int]) -> None:
         """Enforce retention policy.
@@ -543,23 +1225,40 @@ class SQLiteBackend:
             return
 
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                count = conn.execute(
-                    "SELECT COUNT(*) FROM memory_items"
-                ).fetchone()[0]
+            conn = self._conn()
+            with conn:
+                self._delete_oldest(conn, max_items)
+            self._writes += 1
 
-                if count > max_items:
-                    # Delete oldest items
-                    to_delete = count - max_items
-                    conn.execute(f'''
-                        DELETE FROM memory_items
-                        WHERE context_item_id IN (
-                            SELECT context_item_id FROM memory_items
-                            ORDER BY timestamp ASC
-                            LIMIT {to_delete}
-                        )
-                    ''')
-                    conn.commit()
+    def write_generation(self) -> tuple:
+        """Return a value that changes whenever the stored items may have changed.
+
+        Combines this backend's write counter with ``PRAGMA data_version`` of
+        the calling thread's connection, which SQLite changes when any other
+        connection (e.g. another process) commits to the database.
+        """
+        self._maybe_sweep()
+        conn = self._conn()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        return (self._writes, self._local.serial, data_version)
+
+    @staticmethod
+    def _delete_oldest(conn: sqlite3.Connection, max_items: Optional[int]) -> None:
+        """Delete the oldest items beyond max_items (inside the caller's transaction)."""
+        if max_items is None:
+            return
+        count = conn.execute("SELECT n FROM memory_item_count").fetchone()[0]
+
+        if count > max_items:
+            # Delete oldest items
+            conn.execute('''
+                DELETE FROM memory_items
+                WHERE context_item_id IN (
+                    SELECT context_item_id FROM memory_items
+                    ORDER BY timestamp ASC
+                    LIMIT ?
+                )
+            ''', (count - max_items,))
 
     def add_artifact(
         self,
@@ -585,7 +1284,8 @@ class SQLiteBackend:
             additional_metadata: Additional metadata dict
         """
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._conn()
+            with conn:
                 conn.execute('''
                     INSERT OR REPLACE INTO artifacts
                     (id, artifact_id, task_id, node_id, artifact_type,
@@ -603,7 +1303,6 @@ class SQLiteBackend:
                     json.dumps(additional_metadata or {}),
                     datetime.now(ZoneInfo("UTC")).isoformat()
                 ))
-                conn.commit()
 
     def get_artifact(self, artifact_id: str) -> Optional[Dict[str, Any]]:
         """Get artifact by ID.
@@ -614,16 +1313,14 @@ class SQLiteBackend:
         Returns:
             Artifact dict or None
         """
-        with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                row = conn.execute(
-                    "SELECT * FROM artifacts WHERE artifact_id = ?",
-                    (artifact_id,)
-                ).fetchone()
+        row = self._conn().execute(
+            "SELECT * FROM artifacts WHERE artifact_id = ?",
+            (artifact_id,)
+        ).fetchone()
 
-                if row:
-                    return self._deserialize_artifact_row(row)
-                return None
+        if row:
+            return self._deserialize_artifact_row(row)
+        return None
 
     def get_artifacts_by_task(self, task_id: str) -> List[Dict[str, Any]]:
         """Get all artifacts for a task.
@@ -634,13 +1331,11 @@ class SQLiteBackend:
         Returns:
             List of artifact dicts
         """
-        with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                rows = conn.execute(
-                    "SELECT * FROM artifacts WHERE task_id = ? ORDER BY timestamp DESC",
-                    (task_id,)
-                ).fetchall()
-                return [self._deserialize_artifact_row(row) for row in rows]
+        rows = self._conn().execute(
+            "SELECT * FROM artifacts WHERE task_id = ? ORDER BY timestamp DESC",
+            (task_id,)
+        ).fetchall()
+        return [self._deserialize_artifact_row(row) for row in rows]
 
     def _deserialize_artifact_row(self, row: tuple) -> Dict[str, Any]:
         """Deserialize artifact row."""
@@ -660,12 +1355,8 @@ class SQLiteBackend:
 
     def artifact_count(self) -> int:
         """Count artifacts."""
-        with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
-                result = conn.execute(
-                    "SELECT COUNT(*) FROM artifacts"
-                ).fetchone()
-                return result[0] if result else 0
+        result = self._conn().execute("SELECT COUNT(*) FROM artifacts").fetchone()
+        return result[0] if result else 0
 
     def enforce_artifact_retention(self, max_items: Optional[int]) -> None:
         """Enforce artifact retention policy.
@@ -677,22 +1368,33 @@ class SQLiteBackend:
             return
 
         with self._lock:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._conn()
+            with conn:
                 count = conn.execute(
                     "SELECT COUNT(*) FROM artifacts"
                 ).fetchone()[0]
 
                 if count > max_items:
-                    to_delete = count - max_items
-                    conn.execute(f'''
+                    conn.execute('''
                         DELETE FROM artifacts
                         WHERE artifact_id IN (
                             SELECT artifact_id FROM artifacts
                             ORDER BY timestamp ASC
-                            LIMIT {to_delete}
+                            LIMIT ?
                         )
-                    ''')
-                    conn.commit()
+                    ''', (count - max_items,))
+
+
+def partition_path(path: Any, name: str) -> Path:
+    """Return the file for partition ``name`` of a store at ``path``.
+
+    Partitions go in a directory named after the store file's stem; the name
+    is sanitized and suffixed with a short hash so distinct names never collide.
+    """
+    path = Path(path)
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    safe = _UNSAFE_PARTITION_CHARS.sub("_", name)
+    return path.parent / path.stem / f"{safe}-{digest}{path.suffix}"
 
 
 class PersistentMemoryStore:
@@ -707,7 +1409,12 @@ class PersistentMemoryStore:
         backend_type: str = "in_memory",
         file_path: Optional[str] = None,
         db_path: Optional[str] = None,
-        max_items: Optional[int] = None
+        max_items: Optional[int] = None,
+        fsync: str = "never",
+        compaction_threshold: float = 0.5,
+        full_text_search: bool = False,
+        retention: str = "fifo",
+        ttl_seconds: Optional[float] = None
     ):
         """Initialize persistent memory store.
 
@@ -716,45 +1423,106 @@ class PersistentMemoryStore:
             file_path: Path for JSONL backend
             db_path: Path for SQLite backend
             max_items: Retention policy - max items to keep
+            fsync: JSONL fsync policy - "always", "interval" or "never"
+            compaction_threshold: JSONL dead-record ratio that triggers compaction
+            full_text_search: Maintain an SQLite FTS5 index for search_text
+            retention: Eviction order when over max_items - "fifo" (oldest
+                timestamp first) or "lru" (least recently added/read first;
+                not supported by the sqlite backend)
+            ttl_seconds: Expire items older than this, swept lazily (None = never)
 
         Raises:
-            ValueError: If backend type invalid or required paths missing
+            ValueError: If backend type or retention invalid, or required paths missing
         """
         self.backend_type = backend_type
         self.max_items = max_items
+        self.retention = retention
+        self._backend_options: Dict[str, Any] = {
+            "fsync": fsync,
+            "compaction_threshold": compaction_threshold,
+            "full_text_search": full_text_search,
+            "ttl_seconds": ttl_seconds,
+        }
 
         if backend_type == "jsonl":
             if not file_path:
                 raise ValueError("file_path required for jsonl backend")
-            self.backend = JsonLinesBackend(file_path)
+            self.backend = self._open_backend(file_path)
         elif backend_type == "sqlite":
             if not db_path:
                 raise ValueError("db_path required for sqlite backend")
-            self.backend = SQLiteBackend(db_path)
+            self.backend = self._open_backend(db_path)
         elif backend_type == "in_memory":
-            # Use a simple dict-based in-memory store
+            # Use a compact columnar in-memory store
             self.backend = None
-            self._memory_items: Dict[str, ContextItem] = {}
+            self._memory_items = CompactItemStore()
+            self._retention = RetentionIndex(retention, ttl_seconds)
         else:
             raise ValueError(f"Unknown backend type: {backend_type}")
 
+    def _open_backend(self, path: Any) -> Any:
+        """Create a backend of this store's type and options at path."""
+        options = self._backend_options
+        if self.backend_type == "jsonl":
+            return JsonLinesBackend(
+                path,
+                fsync=options["fsync"],
+                compaction_threshold=options["compaction_threshold"],
+                retention=self.retention,
+                ttl_seconds=options["ttl_seconds"],
+            )
+        if self.retention != "fifo":
+            raise ValueError(f"sqlite backend does not support retention '{self.retention}'")
+        return SQLiteBackend(
+            path,
+            full_text_search=options["full_text_search"],
+            ttl_seconds=options["ttl_seconds"],
+        )
+
+    def open_partition(self, name: str) -> Optional[Any]:
+        """Open a separate backend, like this store's, for one partition.
+
+        Used for per-project memory: partition ``name`` of a store at
+        ``memory/project.db`` lives at ``memory/project/<name>-<hash>.db``.
+
+        Args:
+            name: Partition name (e.g. a project id)
+
+        Returns:
+            A new JsonLinesBackend/SQLiteBackend, or None for in-memory stores
+        """
+        if self.backend is None:
+            return None
+        if isinstance(self.backend, JsonLinesBackend):
+            return self._open_backend(partition_path(self.backend.file_path, name))
+        return self._open_backend(partition_path(self.backend.db_path, name))
+
     def add(self, item: ContextItem) -> None:
         """Add item with automatic persistence and retention.
 
         Args:
             item: ContextItem to add
         """
+        self.add_many([item])
+
+    def add_many(self, items: List[ContextItem]) -> None:
+        """Add a batch of items with one write and one retention pass.
+
+        Args:
+            items: ContextItems to add
+        """
         if self.backend:
-            self.backend.add(item)
-            self.backend.enforce_retention(self.max_items)
+            self.backend.add_many(items, max_items=self.max_items)
         else:
-            self._memory_items[item.context_item_id] = item
+            for item in items:
+                self._memory_items.put(item)
+                self._retention.track(item)
             self._enforce_retention()
 
     def query(
         self,
         filters: Dict[str, Any],
-        limit: int = 100,
+        limit: Optional[int] = 100,
         order_by: str = "timestamp"
     ) -> List[ContextItem]:
         """Query items."""
@@ -762,10 +1530,11 @@ class PersistentMemoryStore:
             return self.backend.query(filters, limit, order_by)
         else:
             # In-memory query
+            self._sweep_expired()
             results = []
-            for item in self._memory_items.values():
-                if self._matches_filters(item, filters):
-                    results.append(item)
+            for view in self._memory_items.views():
+                if self._matches_filters(view, filters):
+                    results.append(view)
 
             reverse = True
             if order_by.startswith("-"):
@@ -776,9 +1545,12 @@ class PersistentMemoryStore:
                 key=lambda i: getattr(i, order_by, None) or "",
                 reverse=reverse
             )
-            return results[:limit]
+            items = [view.materialize() for view in results[:limit]]
+            for item in items:
+                self._retention.touch(item.context_item_id)
+            return items
 
-    def _matches_filters(self, item: ContextItem, filters: Dict[str, Any]) -> bool:
+    def _matches_filters(self, item: Any, filters: Dict[str, Any]) -> bool:
         """Check if item matches filters."""
         for field, value in filters.items():
             item_value = getattr(item, field, None)
@@ -820,15 +1592,29 @@ class PersistentMemoryStore:
         if self.backend:
             return self.backend.get(item_id)
         else:
-            return self._memory_items.get(item_id)
+            self._sweep_expired()
+            item = self._memory_items.get(item_id)
+            if item is not None:
+                self._retention.touch(item_id)
+            return item
+
+    def touch(self, item_ids: Iterable[str]) -> None:
+        """Mark items as just read for "lru" retention (e.g. served from a read cache)."""
+        if self.backend:
+            touch = getattr(self.backend, "touch", None)
+            if touch is not None:
+                touch(item_ids)
+        else:
+            for item_id in item_ids:
+                self._retention.touch(item_id)
 
     def delete(self, item_id: str) -> bool:
         """Delete item by ID."""
         if self.backend:
             return self.backend.delete(item_id)
         else:
-            if item_id in self._memory_items:
-                del self._memory_items[item_id]
+            if self._memory_items.pop(item_id):
+                self._retention.forget(item_id)
                 return True
             return False
 
@@ -837,7 +1623,8 @@ class PersistentMemoryStore:
         if self.backend:
             return self.backend.list_all()
         else:
-            return list(self._memory_items.values())
+            self._sweep_expired()
+            return self._memory_items.values()
 
     def clear(self) -> None:
         """Clear all items."""
@@ -845,21 +1632,39 @@ class PersistentMemoryStore:
             self.backend.clear()
         else:
             self._memory_items.clear()
+            self._retention.clear()
 
     def count(self) -> int:
         """Count items."""
         if self.backend:
             return self.backend.count()
         else:
+            self._sweep_expired()
             return len(self._memory_items)
 
+    def search_text(self, query: str, limit: int = 20) -> List[ContextItem]:
+        """Full-text search over item payloads."""
+        if self.backend:
+            return self.backend.search_text(query, limit)
+        else:
+            self._sweep_expired()
+            views = search_items_by_text(list(self._memory_items.views()), query, limit)
+            return [view.materialize() for view in views]
+
+    def write_generation(self) -> Any:
+        """Return a value that changes whenever the stored items change."""
+        if self.backend:
+            return self.backend.write_generation()
+        self._sweep_expired()
+        return self._memory_items.generation
+
     def _enforce_retention(self) -> None:
-        """Enforce retention for in-memory store."""
-        if self.max_items is not None and len(self._memory_items) > self.max_items:
-            sorted_items = sorted(
-                self._memory_items.values(),
-                key=lambda i: i.timestamp or ""
-            )
-            to_delete = sorted_items[:len(self._memory_items) - self.max_items]
-            for item in to_delete:
-                del self._memory_items[item.context_item_id]
+        """Enforce TTL and retention for in-memory store."""
+        self._sweep_expired()
+        for item_id in self._retention.evict(self.max_items):
+            self._memory_items.pop(item_id)
+
+    def _sweep_expired(self) -> None:
+        """Drop in-memory items older than the TTL."""
+        for item_id in self._retention.expired():
+            self._memory_items.pop(item_id)
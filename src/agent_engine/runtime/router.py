@@ -25,7 +25,17 @@ class Router:
     Handles all 7 canonical node roles: START, LINEAR, DECISION, BRANCH, SPLIT, MERGE, EXIT.
     """
 
-    def __init__(self, dag: DAG = None, task_manager=None, node_executor=None, telemetry=None, metadata=None, workflow=None, stages=None):
+    def __init__(
+        self,
+        dag: DAG = None,
+        task_manager=None,
+        node_executor=None,
+        telemetry=None,
+        metadata=None,
+        workflow=None,
+        stages=None,
+        context_assembler=None,
+    ):
         """Initialize router with DAG and runtime dependencies.
 
         Args:
@@ -36,6 +46,8 @@ class Router:
             metadata: Optional EngineMetadata instance for event metadata (Phase 11)
             workflow: Optional WorkflowGraph (tests) - converted to DAG
             stages: Optional mapping of stage_id -> Node (tests) used with workflow
+            context_assembler: Optional ContextAssembler whose task memory is torn down
+                when a task concludes (defaults to the node executor's)
         """
         if dag is None and workflow is not None and stages is not None:
             from agent_engine.dag import DAG
@@ -71,6 +83,9 @@ class Router:
             self.node_executor = node_executor
         self.telemetry = telemetry
         self.metadata = metadata
+        self.context_assembler = context_assembler or getattr(
+            self.node_executor, "context_assembler", None
+        )
 
         # Execution state
         self.work_queue: List[tuple] = []  # List of (task_id, node_id) tuples
@@ -161,19 +176,24 @@ class Router:
         if self.telemetry:
             self.telemetry.task_started(task_id=task.task_id, spec=task_spec, mode=task_spec.mode.value)
 
-        # Step 11.3: Execute start node
-        start_record, start_output = self.node_executor.execute_node(task, start_node)
-        task.history.append(start_record)
-        if start_output is not None:
-            task.current_output = start_output
+        try:
+            # Step 11.3: Execute start node
+            start_record, start_output = self.node_executor.execute_node(task, start_node)
+            task.history.append(start_record)
+            if start_output is not None:
+                task.current_output = start_output
 
-        # Step 11.4: Route from start node
-        next_node_id = self._route_by_role(task, start_node, task.current_output)
-        if next_node_id:
-            self._enqueue_work(task.task_id, next_node_id)
+            # Step 11.4: Route from start node
+            next_node_id = self._route_by_role(task, start_node, task.current_output)
+            if next_node_id:
+                self._enqueue_work(task.task_id, next_node_id)
 
-        # Step 11.5: Process worklist
-        final_task = self._process_worklist_full()
+            # Step 11.5: Process worklist
+            final_task = self._process_worklist_full()
+        finally:
+            # Tasks that end in an EngineError (e.g. a stalled run) never reach
+            # an EXIT node, so release whatever memory this run left behind
+            self._conclude_run_memory(task.task_id)
 
         # Step 11.6: Return completed task
         return final_task if final_task else task
@@ -258,6 +278,7 @@ class Router:
                     # Halt execution - fail the task
                     task.status = UniversalStatus.FAILED
                     task.lifecycle = TaskLifecycle.CONCLUDED
+                    self._conclude_task_memory(task)
                     return task  # Stop execution
 
             # Update current output if execution succeeded
@@ -650,6 +671,22 @@ class Router:
 
         return merge_inputs
 
+    def _conclude_task_memory(self, task: Task) -> None:
+        """Release a concluded task's memory (promoting selected items to project memory)."""
+        conclude = getattr(self.context_assembler, "conclude_task", None)
+        if conclude is not None:
+            conclude(task)
+
+    def _conclude_run_memory(self, task_id: str) -> None:
+        """Release the memory of a run's task and its clones/subtasks not yet concluded."""
+        pending = [task_id]
+        while pending:
+            current_id = pending.pop()
+            pending.extend(self.parent_children.get(current_id, ()))
+            task = self.task_manager.get_task(current_id)
+            if task is not None and task.lifecycle != TaskLifecycle.CONCLUDED:
+                self._conclude_task_memory(task)
+
     def _route_exit(self, task: Task, node: Node) -> None:
         """Route from EXIT node (finalize and halt)."""
         # Mark task as completed
@@ -663,6 +700,8 @@ class Router:
         if node.always_fail:
             task.status = UniversalStatus.FAILED
 
+        self._conclude_task_memory(task)
+
         # Check parent completion if this is a clone/subtask
         if task.parent_task_id:
             parent_task = self.task_manager.get_task(task.parent_task_id)
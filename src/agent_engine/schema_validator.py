@@ -11,7 +11,11 @@ from pydantic import ValidationError
 
 from .dag import DAG
 from .exceptions import SchemaValidationError
-from .schemas.memory import ContextProfile, ContextProfileSource
+from .retrieval.embedder import EMBEDDING_PROVIDERS
+from .retrieval.shared_index import SHARED_INDEX_MODES
+from .retrieval.vector_store import QUANTIZATION_MODES
+from .runtime.memory.ordered_index import RETENTION_POLICIES
+from .schemas.memory import ContextProfile, RetrievalConfig
 from .schemas.stage import Node, NodeRole, NodeKind
 from .schemas.workflow import Edge
 
@@ -168,6 +172,7 @@ def validate_memory_config(
     - Required stores: task_store, project_store, global_store
     - Each store must have a 'type' field
     - Optional context_profiles must be valid ContextProfile objects
+    - Optional retrieval section must be a valid RetrievalConfig
 
     Args:
         memory_data: Memory configuration dictionary to validate.
@@ -194,6 +199,20 @@ def validate_memory_config(
             raise SchemaValidationError(
                 file_name, f"memory.{store_name}", "Missing 'type' field"
             )
+        retention = store.get("retention")
+        if retention is not None and retention not in RETENTION_POLICIES:
+            raise SchemaValidationError(
+                file_name,
+                f"memory.{store_name}.retention",
+                f"Unknown retention '{retention}'. Must be one of: {list(RETENTION_POLICIES)}",
+            )
+        backend = store.get("backend") or store["type"]
+        if retention == "lru" and backend == "sqlite":
+            raise SchemaValidationError(
+                file_name,
+                f"memory.{store_name}.retention",
+                "Retention 'lru' is not supported by the sqlite backend",
+            )
 
     # Validate context profiles if present
     if "context_profiles" in memory_data:
@@ -212,6 +231,36 @@ def validate_memory_config(
                 field_path = f"memory.context_profiles[{i}]"
                 raise SchemaValidationError(file_name, field_path, str(e))
 
+    # Validate retrieval settings if present
+    if "retrieval" in memory_data:
+        try:
+            retrieval = RetrievalConfig(**(memory_data["retrieval"] or {}))
+        except ValidationError as e:
+            raise SchemaValidationError(file_name, "memory.retrieval", str(e))
+        except Exception as e:
+            raise SchemaValidationError(file_name, "memory.retrieval", str(e))
+        if retrieval.embedder.provider not in EMBEDDING_PROVIDERS:
+            raise SchemaValidationError(
+                file_name,
+                "memory.retrieval.embedder.provider",
+                f"Unknown provider '{retrieval.embedder.provider}'. "
+                f"Must be one of: {list(EMBEDDING_PROVIDERS)}",
+            )
+        if retrieval.quantization is not None and retrieval.quantization not in QUANTIZATION_MODES:
+            raise SchemaValidationError(
+                file_name,
+                "memory.retrieval.quantization",
+                f"Unknown quantization '{retrieval.quantization}'. "
+                f"Must be one of: {list(QUANTIZATION_MODES)}",
+            )
+        if retrieval.shared_index is not None and retrieval.shared_index not in SHARED_INDEX_MODES:
+            raise SchemaValidationError(
+                file_name,
+                "memory.retrieval.shared_index",
+                f"Unknown shared index mode '{retrieval.shared_index}'. "
+                f"Must be one of: {list(SHARED_INDEX_MODES)}",
+            )
+
     return memory_data
 
 
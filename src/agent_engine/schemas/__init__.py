@@ -14,8 +14,10 @@ from .memory import (
     ContextProfile,
     ContextProfileSource,
     ContextRequest,
+    EmbedderConfig,
     MemoryConfig,
     MemoryStoreConfig,
+    RetrievalConfig,
 )
 from .override import OverrideKind, OverrideScope, OverrideSeverity, OverrideSpec
 from .registry import SCHEMA_REGISTRY, get_schema_json
@@ -88,6 +90,8 @@ __all__ = [
     "ContextRequest",
     "MemoryConfig",
     "MemoryStoreConfig",
+    "EmbedderConfig",
+    "RetrievalConfig",
     "OverrideKind",
     "OverrideScope",
     "OverrideSeverity",
@@ -4,17 +4,36 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from .base import SchemaBase
 
 
 class MemoryStoreConfig(SchemaBase):
-    retention: Optional[str] = Field(default=None)
+    retention: Optional[str] = Field(
+        default=None, description="Eviction order: 'fifo' (default) or 'lru' (not with sqlite)"
+    )
     max_items: Optional[int] = Field(default=None)
     backend: Optional[str] = Field(default="in_memory", description="Storage backend: 'in_memory', 'jsonl', or 'sqlite'")
     file_path: Optional[str] = Field(default=None, description="Path for JSONL backend")
     db_path: Optional[str] = Field(default=None, description="Path for SQLite backend")
+    fsync: str = Field(
+        default="never", description="JSONL fsync policy: 'always', 'interval' or 'never'"
+    )
+    compaction_threshold: float = Field(
+        default=0.5, gt=0, le=1, description="JSONL dead-record ratio that triggers log compaction"
+    )
+    full_text_search: bool = Field(
+        default=False, description="Maintain an SQLite FTS5 index over item payloads"
+    )
+    ttl_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Expire items whose timestamp (or, without one, the time they were "
+            "stored) is older than this many seconds (swept lazily)"
+        ),
+    )
 
 
 class CompressionPolicy(SchemaBase):
@@ -27,6 +46,42 @@ class ContextPolicy(SchemaBase):
     middle_compress: bool = Field(default=True)
 
 
+class EmbedderConfig(SchemaBase):
+    provider: str = Field(default="ollama", description="Embedding provider: 'ollama' or 'hashing'")
+    model: Optional[str] = Field(default=None, description="Ollama model name")
+    base_url: Optional[str] = Field(default=None, description="Ollama host URL")
+    batch_size: Optional[int] = Field(default=None)
+    max_concurrency: Optional[int] = Field(default=None)
+    dim: int = Field(default=384, gt=0, description="Vector dimension for the hashing provider")
+    use_bigrams: bool = Field(default=True)
+
+
+class RetrievalConfig(SchemaBase):
+    """Workspace retrieval settings (the optional ``memory.retrieval`` manifest section)."""
+
+    embedder: EmbedderConfig = Field(default_factory=EmbedderConfig)
+    quantization: Optional[str] = Field(
+        default=None, description="Vector quantization: 'int8' or 'binary'"
+    )
+    background_indexing: bool = Field(default=False)
+    index_poll_interval: float = Field(default=2.0, gt=0)
+    sharded: bool = Field(
+        default=False, description="Split the index into per-project/per-directory shards"
+    )
+    max_open_shards: int = Field(default=8, gt=0)
+    shared_index: Optional[str] = Field(
+        default=None, description="Shared mmap index snapshot role: 'publish' or 'attach'"
+    )
+    shared_index_path: Optional[str] = Field(default=None)
+
+    @model_validator(mode="after")
+    def _check_attach_is_read_only(self) -> "RetrievalConfig":
+        """Attached workers search a snapshot they cannot write to."""
+        if self.shared_index == "attach" and self.background_indexing:
+            raise ValueError("background_indexing cannot be used with shared_index='attach'")
+        return self
+
+
 class MemoryConfig(SchemaBase):
     memory_config_id: str
     stores: Dict[str, MemoryStoreConfig] = Field(default_factory=dict)
@@ -52,15 +107,25 @@ class ContextProfileSource(SchemaBase):
     - The Context Assembler reads from one or more sources defined in the ContextProfile.
     - Items are retrieved according to the profile's retrieval_policy (recency, semantic, hybrid).
     - Items are filtered by tags if specified.
+    - With text_search, only items matching a full-text query are candidates
+      (the store backend's search_text, indexed by FTS5 for SQLite stores).
     - Assembled context is read-only and passed to the node.
 
     Fields:
         store: Memory layer name - one of "task", "project", or "global".
         tags: Optional list of tags to filter items within the memory layer.
               If empty, all items from the layer are candidates for retrieval.
+        text_search: Select items by full-text search instead of listing the layer.
+        text_query: Query for text_search; defaults to the task request.
+        text_search_limit: Maximum items returned by text_search.
     """
     store: str = Field(..., description="Memory layer: 'task', 'project', or 'global'")
     tags: List[str] = Field(default_factory=list, description="Optional filter tags")
+    text_search: bool = Field(default=False, description="Select items by full-text search")
+    text_query: Optional[str] = Field(
+        default=None, description="Full-text query (defaults to the task request)"
+    )
+    text_search_limit: int = Field(default=20, gt=0)
 
 
 class ContextProfile(SchemaBase):
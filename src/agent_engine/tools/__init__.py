@@ -7,6 +7,7 @@ and can be referenced by agents via manifest-defined tool invocations.
 
 from .builtin import (
     BUILTIN_COMMAND_RUN,
+    BUILTIN_FILESYSTEM_FIND_SYMBOL,
     BUILTIN_FILESYSTEM_LIST,
     BUILTIN_FILESYSTEM_READ,
     BUILTIN_FILESYSTEM_WRITE,
@@ -18,6 +19,7 @@ from .builtin import (
 
 __all__ = [
     "BUILTIN_COMMAND_RUN",
+    "BUILTIN_FILESYSTEM_FIND_SYMBOL",
     "BUILTIN_FILESYSTEM_LIST",
     "BUILTIN_FILESYSTEM_READ",
     "BUILTIN_FILESYSTEM_WRITE",
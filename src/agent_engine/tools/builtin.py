@@ -18,6 +18,7 @@ from agent_engine.schemas import ToolCapability, ToolDefinition, ToolKind, ToolR
 BUILTIN_FILESYSTEM_WRITE = "filesystem.write_file"
 BUILTIN_FILESYSTEM_READ = "filesystem.read_file"
 BUILTIN_FILESYSTEM_LIST = "filesystem.list"
+BUILTIN_FILESYSTEM_FIND_SYMBOL = "filesystem.find_symbol"
 BUILTIN_COMMAND_RUN = "command.run"
 
 
@@ -68,6 +69,24 @@ BUILTIN_TOOLS: Dict[str, ToolDefinition] = {
             "required_args": ["path"],
         },
     ),
+    BUILTIN_FILESYSTEM_FIND_SYMBOL: ToolDefinition(
+        tool_id=BUILTIN_FILESYSTEM_FIND_SYMBOL,
+        kind=ToolKind.DETERMINISTIC,
+        name="Find Symbol",
+        description=(
+            "Find function, class and method definitions by name within the configured "
+            "workspace root."
+        ),
+        inputs_schema_id="execution_input",
+        outputs_schema_id="execution_output",
+        capabilities=[ToolCapability.DETERMINISTIC_SAFE],
+        risk_level=ToolRiskLevel.LOW,
+        version="1.0.0",
+        metadata={
+            "handler": "agent_engine.tools.filesystem:find_symbol",
+            "required_args": ["name"],
+        },
+    ),
     BUILTIN_COMMAND_RUN: ToolDefinition(
         tool_id=BUILTIN_COMMAND_RUN,
         kind=ToolKind.DETERMINISTIC,
@@ -7,6 +7,7 @@ utilities to prevent traversal and enforce basic size limits.
 
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 from typing import Any, Dict, Tuple
 
@@ -16,6 +17,11 @@ from agent_engine.utils.filesystem_safety import (
     is_binary_file,
     validate_path_traversal,
 )
+from agent_engine.utils.symbol_index import SymbolIndex
+
+# One incrementally refreshed symbol index per workspace root
+_SYMBOL_INDEXES: Dict[Path, SymbolIndex] = {}
+_SYMBOL_INDEXES_LOCK = threading.Lock()
 
 
 def _resolve_target(workspace_root: str | Path | None, target_path: str) -> Tuple[Path, Path]:
@@ -95,3 +101,47 @@ def list_files(inputs: Dict[str, Any], workspace_root: str | Path | None = None)
         "path": str(resolved),
         "entries": entries,
     }
+
+
+def _symbol_index_for(root: Path) -> SymbolIndex:
+    with _SYMBOL_INDEXES_LOCK:
+        index = _SYMBOL_INDEXES.get(root)
+        if index is None:
+            index = _SYMBOL_INDEXES[root] = SymbolIndex(root)
+    index.refresh()
+    return index
+
+
+def find_symbol(inputs: Dict[str, Any], workspace_root: str | Path | None = None) -> Dict[str, Any]:
+    """Find function/class/method definitions by name within workspace_root."""
+    name = inputs.get("name") or inputs.get("symbol")
+    if not name:
+        raise ValueError("Missing name for find_symbol")
+    include_source = bool(inputs.get("include_source", True))
+    max_lines = int(inputs.get("max_lines") or 60)
+
+    root = Path(workspace_root or ".").expanduser().resolve()
+    index = _symbol_index_for(root)
+    matches = []
+    for symbol in index.lookup(str(name)):
+        # Symlinked files may point outside the workspace; never expose those
+        ok, _, _ = validate_path_traversal(root, str(symbol.path))
+        if not ok:
+            continue
+        match = {
+            "name": symbol.name,
+            "qualname": symbol.qualname,
+            "kind": symbol.kind,
+            "path": str(symbol.path),
+            "relative_path": str(symbol.path.relative_to(root)),
+            "start_line": symbol.start_line,
+            "end_line": symbol.end_line,
+        }
+        if include_source:
+            match["content"] = index.definition(symbol, max_lines=max_lines)
+        matches.append(match)
+
+    return {
+        "name": name,
+        "matches": matches,
+    }
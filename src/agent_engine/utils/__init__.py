@@ -31,6 +31,26 @@ from .file_context import (
     SKIP_DIRS,
 )
 
+from .keyword_index import (
+    WorkspaceKeywordIndex,
+)
+
+from .symbol_index import (
+    Symbol,
+    SymbolIndex,
+)
+
+from .workspace_scanner import (
+    ScannedFile,
+    WorkspaceScanner,
+    get_workspace_scanner,
+)
+
+from .gitignore import (
+    GitignoreMatcher,
+    parse_gitignore,
+)
+
 from .filesystem_safety import (
     validate_path_traversal,
     is_binary_file,
@@ -68,6 +88,18 @@ __all__ = [
     "RELEVANT_EXTENSIONS",
     "SKIP_EXTENSIONS",
     "SKIP_DIRS",
+    # Keyword index
+    "WorkspaceKeywordIndex",
+    # Symbol index
+    "Symbol",
+    "SymbolIndex",
+    # Workspace scanner
+    "ScannedFile",
+    "WorkspaceScanner",
+    "get_workspace_scanner",
+    # Gitignore matching
+    "GitignoreMatcher",
+    "parse_gitignore",
     # Filesystem safety utils
     "validate_path_traversal",
     "is_binary_file",
@@ -18,11 +18,17 @@ Relevance scoring considers:
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Set, Tuple
 from pathlib import Path
-import os
 import re
 import logging
 from datetime import datetime
 
+from agent_engine.utils.keyword_index import WorkspaceKeywordIndex
+from agent_engine.utils.symbol_index import SymbolIndex
+from agent_engine.utils.workspace_scanner import (
+    SKIP_DIRS,
+    WorkspaceScanner,
+    get_workspace_scanner,
+)
 from agent_engine.utils.text_analysis import extract_keywords
 
 logger = logging.getLogger(__name__)
@@ -66,14 +72,6 @@ SKIP_EXTENSIONS = {
     ".woff", ".woff2", ".ttf", ".eot",
 }
 
-# Skip directories
-SKIP_DIRS = {
-    "__pycache__", "node_modules", ".git", ".venv", "venv",
-    "build", "dist", ".pytest_cache", ".mypy_cache",
-    "coverage", ".coverage", "htmlcov",
-}
-
-
 def should_skip_file(file_path: Path) -> bool:
     """
     Determine if a file should be skipped from context.
@@ -180,13 +178,26 @@ class FileContextExtractor:
     - Summary: Generate summary for large files
     """
 
-    def __init__(self, workspace_root: Path, mode: str = "balanced"):
+    def __init__(
+        self,
+        workspace_root: Path,
+        mode: str = "balanced",
+        keyword_index: Optional[WorkspaceKeywordIndex] = None,
+        symbol_index: Optional[SymbolIndex] = None,
+        scanner: Optional[WorkspaceScanner] = None,
+    ):
         """
         Initialize file context extractor.
 
         Args:
             workspace_root: Root directory of workspace
             mode: Operation mode ("cheap", "balanced", or "max_quality")
+            keyword_index: File keyword cache; defaults to one persisted at
+                ``<workspace_root>/.agent_engine/keyword_index.json``
+            symbol_index: Definition index used for snippet extraction;
+                defaults to a new in-memory index over workspace_root
+            scanner: Workspace scanner; defaults to the shared scanner for
+                workspace_root
 
         Raises:
             ValueError: If mode is not recognized
@@ -198,6 +209,11 @@ class FileContextExtractor:
         self.workspace_root = workspace_root
         self.mode = mode
         self.thresholds = MODE_THRESHOLDS[mode]
+        self.keyword_index = keyword_index or WorkspaceKeywordIndex(
+            workspace_root, Path(workspace_root) / ".agent_engine" / "keyword_index.json"
+        )
+        self.scanner = scanner or get_workspace_scanner(str(workspace_root))
+        self.symbol_index = symbol_index or SymbolIndex(workspace_root, scanner=self.scanner)
 
     def scan_workspace_files(self, max_files: int = 100) -> List[Path]:
         """
@@ -209,40 +225,39 @@ class FileContextExtractor:
         Returns:
             List of file paths (sorted by modification time, newest first)
         """
-        files = []
+        files = self._scan_workspace_stats()
+        return [f[0] for f in files[:max_files]]
 
-        for root, dirs, filenames in os.walk(self.workspace_root):
-            # Modify dirs in-place to skip certain directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
+    def _scan_workspace_stats(self) -> List[Tuple[Path, int, float]]:
+        """Return ``(path, size, mtime)`` for all relevant files, newest first."""
+        files = []
 
-            for filename in filenames:
-                file_path = Path(root) / filename
+        # Fresh stats: the keyword index and recency scores must see in-place edits
+        for scanned in self.scanner.scan(fresh_stats=True):
+            file_path = Path(self.workspace_root) / scanned.rel_path
 
-                if should_skip_file(file_path):
-                    continue
+            if should_skip_file(file_path):
+                continue
 
-                # Check extension is relevant
-                if file_path.suffix and file_path.suffix.lower() not in RELEVANT_EXTENSIONS:
-                    continue
+            # Check extension is relevant
+            if file_path.suffix and file_path.suffix.lower() not in RELEVANT_EXTENSIONS:
+                continue
 
-                try:
-                    stat = file_path.stat()
-                    if stat.st_size > 1024 * 1024:  # Skip files > 1MB
-                        continue
-                    files.append((file_path, stat.st_mtime))
-                except (OSError, PermissionError):
-                    continue
+            if scanned.size > 1024 * 1024:  # Skip files > 1MB
+                continue
+            files.append((file_path, scanned.size, scanned.mtime))
 
-        # Sort by modification time (newest first) and limit
-        files.sort(key=lambda x: x[1], reverse=True)
-        return [f[0] for f in files[:max_files]]
+        # Sort by modification time (newest first)
+        files.sort(key=lambda x: x[2], reverse=True)
+        return files
 
     def score_file_relevance(
         self,
         file_path: Path,
         query: str,
         conversation_files: Set[str],
-        query_keywords: Optional[Set[str]] = None
+        query_keywords: Optional[Set[str]] = None,
+        file_stat: Optional[Tuple[int, float]] = None
     ) -> FileRelevance:
         """
         Score file relevance to query and conversation.
@@ -258,6 +273,8 @@ class FileContextExtractor:
             query: Query string
             conversation_files: Set of files mentioned in recent conversation
             query_keywords: Pre-extracted query keywords (optional)
+            file_stat: ``(size, mtime)`` from a workspace scan; the file is
+                stat'ed if omitted
 
         Returns:
             FileRelevance object
@@ -266,9 +283,10 @@ class FileContextExtractor:
         reasons = []
 
         try:
-            stat = file_path.stat()
-            size = stat.st_size
-            modified_time = stat.st_mtime
+            if file_stat is None:
+                stat = file_path.stat()
+                file_stat = (stat.st_size, stat.st_mtime)
+            size, modified_time = file_stat
         except (OSError, PermissionError):
             return FileRelevance(
                 path=file_path,
@@ -283,14 +301,8 @@ class FileContextExtractor:
         if query_keywords is None:
             query_keywords = extract_keywords(query)
 
-        # Try to read file content for keyword matching
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(50000)  # Read first 50KB
-            file_keywords = extract_keywords(content)
-        except Exception:
-            file_keywords = set()
-            content = ""
+        # File keywords come from the index; the file is only read if it changed
+        file_keywords = self.keyword_index.keywords_for(file_path, size, modified_time)
 
         # 1. Keyword overlap (40%)
         if query_keywords and file_keywords:
@@ -376,25 +388,45 @@ class FileContextExtractor:
         if conversation_files is None:
             conversation_files = set()
 
-        # Scan workspace files
-        files = self.scan_workspace_files(max_files=100)
-        if not files:
+        # Scan workspace files and bring the keyword index up to date
+        # (only new or changed files are read)
+        all_files = self._scan_workspace_stats()
+        self.keyword_index.prune(path for path, _, _ in all_files)
+        if not all_files:
+            self.keyword_index.save()
             return []
+        stats = {path: (size, mtime) for path, size, mtime in all_files}
+        for path, size, mtime in all_files:
+            self.keyword_index.keywords_for(path, size, mtime)
 
         # Extract query keywords
         query_keywords = extract_keywords(query)
 
-        # Score all files
+        # Candidates: files containing a query keyword (from the inverted index),
+        # files mentioned in conversation, and the most recently modified files
+        candidates = [path for path, _, _ in all_files[:100]]
+        candidates.extend(self.keyword_index.files_with_keywords(query_keywords))
+        candidates.extend(
+            path for path in stats
+            if path.name in conversation_files
+            or str(path.relative_to(self.workspace_root)) in conversation_files
+        )
+
+        # Score candidate files
         scored_files: List[FileRelevance] = []
-        for file_path in files:
+        for file_path in dict.fromkeys(candidates):
+            if file_path not in stats:
+                continue
             relevance = self.score_file_relevance(
                 file_path,
                 query,
                 conversation_files,
-                query_keywords
+                query_keywords,
+                file_stat=stats[file_path]
             )
             if relevance.score > 0.1:  # Minimum relevance threshold
                 scored_files.append(relevance)
+        self.keyword_index.save()
 
         # Sort by score and take top N
         scored_files.sort(reverse=True)
@@ -433,7 +465,9 @@ class FileContextExtractor:
 
         elif file_rel.extraction_mode == "snippet":
             # Extract relevant functions/classes
-            return self._extract_snippets(content, file_rel.path.suffix, query_keywords)
+            return self._extract_snippets(
+                content, file_rel.path.suffix, query_keywords, file_path=file_rel.path
+            )
 
         elif file_rel.extraction_mode == "summary":
             # Generate summary
@@ -442,7 +476,13 @@ class FileContextExtractor:
         else:  # skip
             return None
 
-    def _extract_snippets(self, content: str, file_ext: str, query_keywords: Set[str]) -> str:
+    def _extract_snippets(
+        self,
+        content: str,
+        file_ext: str,
+        query_keywords: Set[str],
+        file_path: Optional[Path] = None,
+    ) -> str:
         """
         Extract relevant code snippets based on query keywords.
 
@@ -450,12 +490,20 @@ class FileContextExtractor:
             content: File content
             file_ext: File extension
             query_keywords: Keywords from query
+            file_path: Path of the file; when given, symbols and their spans
+                come from the symbol index instead of scanning the text
 
         Returns:
             Extracted snippets
         """
+        spans: Dict[str, Tuple[int, int]] = {}
+        if file_path is not None:
+            self.symbol_index.update_file(file_path)
+            for sym in self.symbol_index.symbols_in(file_path):
+                spans.setdefault(sym.name, (sym.start_line, sym.end_line))
+
         # Extract function/class names
-        symbols = extract_function_names(content, file_ext)
+        symbols = set(spans) if spans else extract_function_names(content, file_ext)
 
         # Find symbols matching query keywords
         matching_symbols = set()
@@ -471,8 +519,14 @@ class FileContextExtractor:
 
         # Extract matched symbols with context
         snippets = []
+        lines = content.split('\n')
         for symbol in matching_symbols:
-            snippet = self._extract_symbol_definition(content, symbol, file_ext)
+            if symbol in spans:
+                start, end = spans[symbol]
+                # Same 30-line budget as the text scan, but starting at the real definition
+                snippet: Optional[str] = '\n'.join(lines[start - 1:min(end, start + 29)])
+            else:
+                snippet = self._extract_symbol_definition(content, symbol, file_ext)
             if snippet:
                 snippets.append(f"# {symbol}\n{snippet}")
 
@@ -0,0 +1,174 @@
+"""Minimal ``.gitignore`` matching for workspace scans.
+
+Supports the commonly used subset of gitignore syntax: comments, negation
+(``!``), directory-only patterns (trailing ``/``), anchored patterns (a
+leading or inner ``/``), ``*``, ``?``, character classes and ``**``.
+Nested ``.gitignore`` files apply to their own directory and below; later
+rules override earlier ones, and deeper files override shallower ones.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Pattern, Set
+
+GITIGNORE_NAME = ".gitignore"
+
+
+@dataclass(frozen=True)
+class GitignoreRule:
+    """One compiled gitignore pattern.
+
+    Attributes:
+        base: Directory of the ``.gitignore`` file, relative to the root ("" for the root)
+        regex: Pattern matched against paths relative to ``base``
+        negate: True for ``!pattern`` (re-include)
+        dir_only: True when the pattern ends with ``/``
+    """
+    base: str
+    regex: Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regex body (no anchors)."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape("["))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def parse_gitignore(lines: List[str], base: str = "") -> List[GitignoreRule]:
+    """Compile the lines of one ``.gitignore`` file.
+
+    Args:
+        lines: File lines
+        base: Directory containing the file, relative to the scan root
+
+    Returns:
+        Compiled rules in file order
+    """
+    rules = []
+    for raw in lines:
+        line = raw.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        body = _translate(line)
+        regex = re.compile(("^" if anchored else "^(?:.*/)?") + body + "$")
+        rules.append(GitignoreRule(base=base, regex=regex, negate=negate, dir_only=dir_only))
+    return rules
+
+
+class GitignoreMatcher:
+    """Accumulates gitignore rules while a tree is walked top-down.
+
+    Call ``load_dir`` for each directory before checking its entries so the
+    directory's own ``.gitignore`` takes effect.
+    """
+
+    def __init__(self, root: str, extra_patterns: Optional[List[str]] = None):
+        """
+        Initialize matcher.
+
+        Args:
+            root: Scan root (paths passed to ``is_ignored`` are relative to it)
+            extra_patterns: Additional root-level patterns applied before any file
+        """
+        self.root = root
+        self.rules: List[GitignoreRule] = parse_gitignore(extra_patterns or [])
+        self._loaded: Set[str] = set()
+
+    def load_dir(self, rel_dir: str) -> None:
+        """Read ``rel_dir/.gitignore`` once, if present."""
+        rel_dir = rel_dir.strip("/")
+        if rel_dir in self._loaded:
+            return
+        self._loaded.add(rel_dir)
+        path = os.path.join(self.root, rel_dir, GITIGNORE_NAME)
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        self.rules.extend(parse_gitignore(lines, base=rel_dir))
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Check a path relative to the root.
+
+        Only the path itself is tested; walkers are expected to prune ignored
+        directories instead of descending into them.
+
+        Args:
+            rel_path: Path relative to the root, "/" separated
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if the last matching rule ignores the path
+        """
+        rel_path = rel_path.replace(os.sep, "/").strip("/")
+        ignored = False
+        for rule in self.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.base:
+                if not rel_path.startswith(rule.base + "/"):
+                    continue
+                candidate = rel_path[len(rule.base) + 1:]
+            else:
+                candidate = rel_path
+            if rule.regex.match(candidate):
+                ignored = not rule.negate
+        return ignored
+
+
+__all__ = [
+    "GITIGNORE_NAME",
+    "GitignoreRule",
+    "GitignoreMatcher",
+    "parse_gitignore",
+]
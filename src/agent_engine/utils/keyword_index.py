@@ -0,0 +1,186 @@
+"""Persistent keyword index for workspace files.
+
+Keeps the ``extract_keywords`` output of each file keyed by
+``(path, size, mtime)`` so relevance scoring only re-reads files that
+changed since they were last seen. The index is stored as JSON (by default
+under ``<workspace>/.agent_engine/``) and reused across processes.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from agent_engine.utils.text_analysis import extract_keywords
+
+logger = logging.getLogger(__name__)
+
+# Characters of each file that keywords are extracted from
+KEYWORD_SAMPLE_CHARS = 50000
+KEYWORD_INDEX_VERSION = 1
+
+
+class WorkspaceKeywordIndex:
+    """
+    File keywords keyed by ``(path, size, mtime)`` with an inverted index.
+
+    Entries are refreshed lazily: ``keywords_for`` re-extracts a file only
+    when its size or mtime differs from the stored entry, and ``prune``
+    drops files that no longer exist.
+    """
+
+    def __init__(self, workspace_root: Path, index_path: Optional[Path] = None):
+        """
+        Initialize keyword index.
+
+        Args:
+            workspace_root: Root directory of workspace (entries are stored relative to it)
+            index_path: JSON file to persist to; None keeps the index in memory only
+        """
+        self.workspace_root = Path(workspace_root)
+        self.index_path = Path(index_path) if index_path else None
+        self._entries: Dict[str, Tuple[int, float, FrozenSet[str]]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """Load persisted entries, ignoring a missing or unreadable file."""
+        if self.index_path is None or not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable keyword index {self.index_path}: {e}")
+            return
+        if data.get("version") != KEYWORD_INDEX_VERSION:
+            return
+        with self._lock:
+            for rel_path, (size, mtime, keywords) in data.get("files", {}).items():
+                self._set(rel_path, size, mtime, frozenset(keywords))
+            self._dirty = False
+
+    def save(self) -> bool:
+        """
+        Persist the index if it changed since the last load/save.
+
+        Returns:
+            True if the file was written
+        """
+        if self.index_path is None or not self._dirty:
+            return False
+        with self._lock:
+            files = {
+                rel_path: [size, mtime, sorted(keywords)]
+                for rel_path, (size, mtime, keywords) in self._entries.items()
+            }
+            self._dirty = False
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(
+                json.dumps({"version": KEYWORD_INDEX_VERSION, "files": files}), encoding="utf-8"
+            )
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save keyword index {self.index_path}: {e}")
+            return False
+        return True
+
+    def keywords_for(self, file_path: Path, size: int, mtime: float) -> Set[str]:
+        """
+        Return keywords for a file, re-extracting only if it changed.
+
+        Args:
+            file_path: Absolute path to file
+            size: Current file size in bytes
+            mtime: Current modification time
+
+        Returns:
+            Set of keywords (empty if the file cannot be read)
+        """
+        rel_path = self._relative(file_path)
+        entry = self._entries.get(rel_path)
+        if entry is not None and entry[0] == size and entry[1] == mtime:
+            return set(entry[2])
+
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read(KEYWORD_SAMPLE_CHARS)
+            keywords = frozenset(extract_keywords(content))
+        except Exception:
+            keywords = frozenset()
+        with self._lock:
+            self._set(rel_path, size, mtime, keywords)
+            self._dirty = True
+        return set(keywords)
+
+    def files_with_keywords(self, keywords: Iterable[str]) -> Dict[Path, Set[str]]:
+        """
+        Look up indexed files containing any of ``keywords``.
+
+        Args:
+            keywords: Query keywords
+
+        Returns:
+            Mapping of absolute file path to the matched keywords
+        """
+        matches: Dict[str, Set[str]] = {}
+        for keyword in keywords:
+            for rel_path in self._postings.get(keyword, ()):
+                matches.setdefault(rel_path, set()).add(keyword)
+        return {self.workspace_root / rel_path: found for rel_path, found in matches.items()}
+
+    def prune(self, existing: Iterable[Path]) -> int:
+        """
+        Drop entries for files not in ``existing``.
+
+        Args:
+            existing: Paths of all files currently in the workspace
+
+        Returns:
+            Number of entries removed
+        """
+        keep = {self._relative(p) for p in existing}
+        with self._lock:
+            stale = [rel_path for rel_path in self._entries if rel_path not in keep]
+            for rel_path in stale:
+                self._remove(rel_path)
+            if stale:
+                self._dirty = True
+        return len(stale)
+
+    def _relative(self, file_path: Path) -> str:
+        try:
+            return Path(file_path).relative_to(self.workspace_root).as_posix()
+        except ValueError:
+            return Path(file_path).as_posix()
+
+    def _set(self, rel_path: str, size: int, mtime: float, keywords: FrozenSet[str]) -> None:
+        self._remove(rel_path)
+        self._entries[rel_path] = (size, mtime, keywords)
+        for keyword in keywords:
+            self._postings.setdefault(keyword, set()).add(rel_path)
+
+    def _remove(self, rel_path: str) -> None:
+        entry = self._entries.pop(rel_path, None)
+        if entry is None:
+            return
+        for keyword in entry[2]:
+            paths = self._postings.get(keyword)
+            if paths is not None:
+                paths.discard(rel_path)
+                if not paths:
+                    del self._postings[keyword]
+
+
+__all__ = [
+    "KEYWORD_SAMPLE_CHARS",
+    "WorkspaceKeywordIndex",
+]
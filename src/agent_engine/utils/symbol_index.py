@@ -0,0 +1,302 @@
+"""Workspace symbol index for definition lookup.
+
+Maps function, class and method names to file/line spans. Python files are
+parsed with ``ast`` (exact spans, methods qualified as ``Class.method``);
+JavaScript/TypeScript, Go and Rust use line-anchored regexes, with a span
+running to the line before the next definition. Files are re-parsed only
+when their size or mtime changes, so refreshing an unchanged workspace
+costs one ``stat`` per file and a lookup is a dict access.
+"""
+
+import ast
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from agent_engine.utils.workspace_scanner import WorkspaceScanner, get_workspace_scanner
+
+logger = logging.getLogger(__name__)
+
+# Regex definitions per extension: (kind, pattern capturing the name)
+_REGEX_DEFINITIONS: Dict[str, List[Tuple[str, "re.Pattern[str]"]]] = {}
+for _ext in (".js", ".ts", ".jsx", ".tsx"):
+    _REGEX_DEFINITIONS[_ext] = [
+        ("function", re.compile(
+            r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(\w+)'
+        )),
+        ("class", re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(\w+)')),
+        ("function", re.compile(
+            r'^\s*(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*=>'
+        )),
+    ]
+_REGEX_DEFINITIONS[".go"] = [
+    ("function", re.compile(r'^func\s+(?:\([^)]*\)\s+)?(\w+)')),
+    ("type", re.compile(r'^type\s+(\w+)')),
+]
+_REGEX_DEFINITIONS[".rs"] = [
+    ("function", re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+(\w+)')),
+    ("struct", re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait)\s+(\w+)')),
+]
+# Fallback for Python files that do not parse
+_REGEX_DEFINITIONS[".py"] = [
+    ("function", re.compile(r'^\s*(?:async\s+)?def\s+(\w+)')),
+    ("class", re.compile(r'^\s*class\s+(\w+)')),
+]
+
+SYMBOL_EXTENSIONS = frozenset(_REGEX_DEFINITIONS)
+
+# Upper bound on regex-derived spans (no syntax tree to find the real end)
+MAX_REGEX_SPAN_LINES = 200
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """
+    A definition found in a workspace file.
+
+    Attributes:
+        name: Bare name (e.g. "run")
+        qualname: Dotted name including enclosing classes/functions (e.g. "Engine.run")
+        kind: "function", "method", "class", "type" or "struct"
+        path: Absolute file path
+        start_line: First line of the definition, including decorators (1-based)
+        end_line: Last line of the definition (1-based, inclusive)
+    """
+    name: str
+    qualname: str
+    kind: str
+    path: Path
+    start_line: int
+    end_line: int
+
+
+def extract_symbols(content: str, file_path: Path) -> List[Symbol]:
+    """
+    Extract symbol definitions from file content.
+
+    Args:
+        content: File content
+        file_path: Path of the file (its suffix selects the parser)
+
+    Returns:
+        Symbols in file order
+    """
+    ext = file_path.suffix.lower()
+    if ext == ".py":
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            symbols: List[Symbol] = []
+            _collect_python(tree.body, file_path, "", False, symbols)
+            return symbols
+    return _regex_symbols(content, file_path, _REGEX_DEFINITIONS.get(ext, []))
+
+
+def _collect_python(
+    body: List[ast.stmt], file_path: Path, prefix: str, in_class: bool, out: List[Symbol]
+) -> None:
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            is_class = isinstance(node, ast.ClassDef)
+            kind = "class" if is_class else ("method" if in_class else "function")
+            qualname = f"{prefix}{node.name}"
+            start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+            out.append(Symbol(
+                name=node.name,
+                qualname=qualname,
+                kind=kind,
+                path=file_path,
+                start_line=start,
+                end_line=getattr(node, "end_lineno", None) or node.lineno,
+            ))
+            _collect_python(node.body, file_path, f"{qualname}.", is_class, out)
+
+
+def _regex_symbols(
+    content: str, file_path: Path, patterns: List[Tuple[str, "re.Pattern[str]"]]
+) -> List[Symbol]:
+    lines = content.split('\n')
+    found: List[Tuple[int, str, str]] = []
+    for lineno, line in enumerate(lines, 1):
+        for kind, pattern in patterns:
+            match = pattern.match(line)
+            if match:
+                found.append((lineno, kind, match.group(1)))
+                break
+    symbols = []
+    for i, (lineno, kind, name) in enumerate(found):
+        next_start = found[i + 1][0] if i + 1 < len(found) else len(lines) + 1
+        end = min(next_start - 1, lineno + MAX_REGEX_SPAN_LINES - 1, len(lines))
+        symbols.append(Symbol(name, name, kind, file_path, lineno, max(lineno, end)))
+    return symbols
+
+
+class SymbolIndex:
+    """
+    Incrementally maintained ``name -> definitions`` index for a workspace.
+
+    Both bare names and qualified names are keys, so ``lookup("run")`` and
+    ``lookup("Engine.run")`` are single dict accesses.
+    """
+
+    def __init__(
+        self,
+        workspace_root: Path,
+        max_file_bytes: int = 1024 * 1024,
+        scanner: Optional[WorkspaceScanner] = None,
+    ):
+        """
+        Initialize symbol index.
+
+        Args:
+            workspace_root: Root directory of workspace
+            max_file_bytes: Larger files are not parsed
+            scanner: Workspace scanner; defaults to the shared scanner for workspace_root
+        """
+        self.workspace_root = Path(workspace_root)
+        self.max_file_bytes = max_file_bytes
+        self.scanner = scanner or get_workspace_scanner(str(workspace_root))
+        self._files: Dict[Path, Tuple[int, float, List[Symbol]]] = {}
+        self._by_name: Dict[str, List[Symbol]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(entry[2]) for entry in self._files.values())
+
+    def refresh(self, paths: Optional[Iterable[Path]] = None) -> int:
+        """
+        Bring the index up to date.
+
+        Args:
+            paths: Files to check; defaults to every supported file in the
+                workspace, in which case files that disappeared are dropped
+
+        Returns:
+            Number of files (re)parsed or removed
+        """
+        if paths is not None:
+            return sum(1 for path in paths if self.update_file(path))
+        changed = 0
+        present = set()
+        # Fresh stats: a file edited in place must be re-parsed
+        for scanned in self.scanner.scan(fresh_stats=True):
+            path = self.workspace_root / scanned.rel_path
+            if path.suffix.lower() not in SYMBOL_EXTENSIONS:
+                continue
+            present.add(path)
+            if self._update(path, scanned.size, scanned.mtime):
+                changed += 1
+        for path in [p for p in self._files if p not in present]:
+            self.remove_file(path)
+            changed += 1
+        return changed
+
+    def update_file(self, file_path: Path) -> bool:
+        """
+        Re-parse a file if its size or mtime changed.
+
+        Args:
+            file_path: Absolute path to file
+
+        Returns:
+            True if the index changed
+        """
+        file_path = Path(file_path)
+        if file_path.suffix.lower() not in SYMBOL_EXTENSIONS:
+            return False
+        try:
+            stat = file_path.stat()
+        except OSError:
+            if file_path in self._files:
+                self.remove_file(file_path)
+                return True
+            return False
+        return self._update(file_path, stat.st_size, stat.st_mtime)
+
+    def _update(self, file_path: Path, size: int, mtime: float) -> bool:
+        entry = self._files.get(file_path)
+        if entry is not None and entry[0] == size and entry[1] == mtime:
+            return False
+        symbols: List[Symbol] = []
+        if size <= self.max_file_bytes:
+            try:
+                content = file_path.read_text(encoding="utf-8", errors="ignore")
+                symbols = extract_symbols(content, file_path)
+            except OSError as e:
+                logger.debug(f"Skipping symbols for {file_path}: {e}")
+        with self._lock:
+            self._drop(file_path)
+            self._files[file_path] = (size, mtime, symbols)
+            for symbol in symbols:
+                self._by_name.setdefault(symbol.name, []).append(symbol)
+                if symbol.qualname != symbol.name:
+                    self._by_name.setdefault(symbol.qualname, []).append(symbol)
+        return True
+
+    def remove_file(self, file_path: Path) -> None:
+        """Drop all symbols of a file."""
+        with self._lock:
+            self._drop(Path(file_path))
+
+    def lookup(self, name: str) -> List[Symbol]:
+        """
+        Find definitions by bare or qualified name.
+
+        Args:
+            name: Symbol name such as "run" or "Engine.run"
+
+        Returns:
+            Matching symbols (empty if none)
+        """
+        return list(self._by_name.get(name, ()))
+
+    def symbols_in(self, file_path: Path) -> List[Symbol]:
+        """Return the indexed symbols of one file, in file order."""
+        entry = self._files.get(Path(file_path))
+        return list(entry[2]) if entry else []
+
+    def definition(self, symbol: Symbol, max_lines: Optional[int] = None) -> Optional[str]:
+        """
+        Read the source text of a symbol.
+
+        Args:
+            symbol: Symbol from this index
+            max_lines: Optional cap on the number of lines returned
+
+        Returns:
+            Definition text, or None if the file cannot be read
+        """
+        try:
+            lines = symbol.path.read_text(encoding="utf-8", errors="ignore").split('\n')
+        except OSError:
+            return None
+        end = symbol.end_line
+        if max_lines is not None:
+            end = min(end, symbol.start_line + max_lines - 1)
+        return '\n'.join(lines[symbol.start_line - 1:end])
+
+    def _drop(self, file_path: Path) -> None:
+        entry = self._files.pop(file_path, None)
+        if entry is None:
+            return
+        for symbol in entry[2]:
+            for key in {symbol.name, symbol.qualname}:
+                remaining = [s for s in self._by_name.get(key, ()) if s.path != file_path]
+                if remaining:
+                    self._by_name[key] = remaining
+                else:
+                    self._by_name.pop(key, None)
+
+
+__all__ = [
+    "MAX_REGEX_SPAN_LINES",
+    "SYMBOL_EXTENSIONS",
+    "Symbol",
+    "SymbolIndex",
+    "extract_symbols",
+]
@@ -0,0 +1,270 @@
+"""Shared, cached workspace scanner.
+
+Walks the workspace with ``os.scandir``, pruning hidden directories,
+``SKIP_DIRS`` and anything matched by ``.gitignore`` files. Each
+directory's filtered listing is cached and reused while the directory's
+mtime is unchanged, so a rescan of an unchanged tree costs one ``stat`` per
+directory. Editing a file in place does not touch its directory's mtime, so
+callers that must see such edits (content indexes) request fresh file stats,
+which costs one more ``stat`` per file.
+
+All file-oriented features (retrieval indexing, file context extraction,
+symbol lookup) obtain the scanner for a root from ``get_workspace_scanner``
+so they share one cache.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from agent_engine.utils.gitignore import GITIGNORE_NAME, GitignoreMatcher
+
+# Skip directories
+SKIP_DIRS = {
+    "__pycache__", "node_modules", ".git", ".venv", "venv",
+    "build", "dist", ".pytest_cache", ".mypy_cache",
+    "coverage", ".coverage", "htmlcov",
+}
+
+
+@dataclass(frozen=True)
+class ScannedFile:
+    """
+    A file found by the scanner.
+
+    Attributes:
+        path: Absolute file path
+        rel_path: Path relative to the scan root ("/" separated), for callers
+            that join it with their own spelling of the root
+        size: Size in bytes
+        mtime: Modification time (seconds since the epoch)
+    """
+    path: str
+    rel_path: str
+    size: int
+    mtime: float
+
+
+@dataclass
+class _DirSnapshot:
+    mtime_ns: int
+    files: List[Tuple[str, int, float]]
+    subdirs: List[str]
+    gitignore_mtime_ns: Optional[int] = None
+
+
+@dataclass
+class ScanStats:
+    """
+    Counters for the most recent scan.
+
+    Attributes:
+        dirs_listed: Directories read with ``os.scandir``
+        dirs_cached: Directories served from their cached snapshot
+        files: Files returned
+    """
+    dirs_listed: int = 0
+    dirs_cached: int = 0
+    files: int = 0
+
+
+@dataclass
+class WorkspaceScanner:
+    """
+    Incremental workspace file scanner with per-directory snapshots.
+
+    Attributes:
+        root: Workspace root directory
+        respect_gitignore: Prune paths matched by ``.gitignore`` files
+        skip_dirs: Directory names never descended into
+        skip_hidden_dirs: Also prune directories whose name starts with "."
+    """
+    root: str
+    respect_gitignore: bool = True
+    skip_dirs: frozenset = frozenset(SKIP_DIRS)
+    skip_hidden_dirs: bool = True
+    last_stats: ScanStats = field(default_factory=ScanStats, init=False)
+
+    def __post_init__(self):
+        self.root = os.path.abspath(self.root)
+        self._real_root = os.path.realpath(self.root)
+        self._snapshots: Dict[str, _DirSnapshot] = {}
+        self._matcher = GitignoreMatcher(self.root) if self.respect_gitignore else None
+        self._lock = threading.Lock()
+
+    def scan(self, fresh_stats: bool = False) -> List[ScannedFile]:
+        """
+        Return all non-ignored files under the root.
+
+        Args:
+            fresh_stats: Re-``stat`` files in unchanged directories so size and
+                mtime reflect in-place edits; by default cached values are
+                returned and only directories are stat-ed
+
+        Returns:
+            Files in a stable, depth-first, name-sorted order
+        """
+        with self._lock:
+            if self._gitignores_changed():
+                self._reset()
+            files = self._scan(fresh_stats)
+            if files is None:
+                # A .gitignore appeared or disappeared: listings filtered without it are stale
+                self._reset()
+                files = self._scan(fresh_stats)
+            return files or []
+
+    def invalidate(self) -> None:
+        """Drop all cached directory snapshots."""
+        with self._lock:
+            self._reset()
+
+    def _reset(self) -> None:
+        self._snapshots.clear()
+        if self.respect_gitignore:
+            self._matcher = GitignoreMatcher(self.root)
+
+    def _scan(self, fresh_stats: bool) -> Optional[List[ScannedFile]]:
+        stats = ScanStats()
+        results: List[ScannedFile] = []
+        seen = set()
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            try:
+                dir_mtime_ns = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                continue
+            snapshot = self._snapshots.get(rel_dir)
+            if snapshot is not None and snapshot.mtime_ns == dir_mtime_ns:
+                stats.dirs_cached += 1
+                if fresh_stats:
+                    snapshot.files = self._restat(abs_dir, snapshot.files)
+            else:
+                listed = self._list_dir(rel_dir, abs_dir, dir_mtime_ns)
+                if listed is None:
+                    continue
+                if (
+                    snapshot is not None
+                    and (snapshot.gitignore_mtime_ns is None) != (listed.gitignore_mtime_ns is None)
+                ):
+                    return None
+                snapshot = self._snapshots[rel_dir] = listed
+                stats.dirs_listed += 1
+            seen.add(rel_dir)
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            results.extend(
+                ScannedFile(os.path.join(abs_dir, name), prefix + name, size, mtime)
+                for name, size, mtime in snapshot.files
+            )
+            stack.extend(
+                f"{rel_dir}/{name}" if rel_dir else name for name in reversed(snapshot.subdirs)
+            )
+
+        for rel_dir in [d for d in self._snapshots if d not in seen]:
+            del self._snapshots[rel_dir]
+        stats.files = len(results)
+        self.last_stats = stats
+        return results
+
+    def _list_dir(self, rel_dir: str, abs_dir: str, dir_mtime_ns: int) -> Optional[_DirSnapshot]:
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return None
+        gitignore_mtime_ns = None
+        if self._matcher is not None and any(e.name == GITIGNORE_NAME for e in entries):
+            try:
+                gitignore_mtime_ns = os.stat(os.path.join(abs_dir, GITIGNORE_NAME)).st_mtime_ns
+            except OSError:
+                pass
+            self._matcher.load_dir(rel_dir)
+
+        files: List[Tuple[str, int, float]] = []
+        subdirs: List[str] = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in self.skip_dirs:
+                        continue
+                    if self.skip_hidden_dirs and entry.name.startswith("."):
+                        continue
+                    if self._matcher is not None and self._matcher.is_ignored(
+                        rel_path, is_dir=True
+                    ):
+                        continue
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    if self._matcher is not None and self._matcher.is_ignored(rel_path):
+                        continue
+                    if entry.is_symlink() and not self._inside_root(entry.path):
+                        continue
+                    stat = entry.stat()
+                    files.append((entry.name, stat.st_size, stat.st_mtime))
+            except OSError:
+                continue
+        return _DirSnapshot(dir_mtime_ns, files, subdirs, gitignore_mtime_ns)
+
+    def _inside_root(self, path: str) -> bool:
+        """Return True if ``path`` resolves (through symlinks) to a file under the root."""
+        real = os.path.realpath(path)
+        return os.path.commonpath([real, self._real_root]) == self._real_root
+
+    @staticmethod
+    def _restat(abs_dir: str, files: List[Tuple[str, int, float]]) -> List[Tuple[str, int, float]]:
+        refreshed = []
+        for name, _, _ in files:
+            try:
+                stat = os.stat(os.path.join(abs_dir, name))
+            except OSError:
+                continue
+            refreshed.append((name, stat.st_size, stat.st_mtime))
+        return refreshed
+
+    def _gitignores_changed(self) -> bool:
+        """Detect in-place edits of known .gitignore files (not visible in dir mtimes)."""
+        for rel_dir, snapshot in self._snapshots.items():
+            if snapshot.gitignore_mtime_ns is None:
+                continue
+            path = os.path.join(self.root, rel_dir, GITIGNORE_NAME)
+            try:
+                if os.stat(path).st_mtime_ns != snapshot.gitignore_mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return False
+
+
+_SCANNERS: Dict[str, WorkspaceScanner] = {}
+_SCANNERS_LOCK = threading.Lock()
+
+
+def get_workspace_scanner(root: str) -> WorkspaceScanner:
+    """
+    Return the shared gitignore-aware scanner for a workspace root.
+
+    Args:
+        root: Workspace root directory
+
+    Returns:
+        One WorkspaceScanner per (absolute) root, shared by all callers
+    """
+    key = os.path.abspath(str(root))
+    with _SCANNERS_LOCK:
+        scanner = _SCANNERS.get(key)
+        if scanner is None:
+            scanner = _SCANNERS[key] = WorkspaceScanner(key)
+        return scanner
+
+
+__all__ = [
+    "SKIP_DIRS",
+    "ScannedFile",
+    "ScanStats",
+    "WorkspaceScanner",
+    "get_workspace_scanner",
+]
@@ -78,7 +78,7 @@ def test_is_builtin_tool() -> None:
 def test_list_builtin_tools() -> None:
     """Test listing all built-in tools."""
     tools = list_builtin_tools()
-    assert len(tools) == 4
+    assert len(tools) == 5
     assert all(isinstance(v.tool_id, str) for v in tools.values())
     # Verify it returns a copy, not the original dict
     tools["custom"] = None
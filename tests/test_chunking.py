@@ -0,0 +1,152 @@
+"""Tests for the workspace chunking subsystem."""
+
+from pathlib import Path
+
+import pytest
+
+from agent_engine.retrieval.chunking import Chunker
+from agent_engine.retrieval.retriever import Retriever
+from agent_engine.retrieval.vector_store import SimpleVectorStore
+
+PYTHON_SOURCE = '''"""Module docstring."""
+
+import os
+
+
+def first(a):
+    return a + 1
+
+
+@decorator
+def second(b):
+    return b * 2
+
+
+class Widget:
+    def render(self):
+        return "widget"
+'''
+
+MARKDOWN_SOURCE = """# Title
+
+Intro text.
+
+## Install
+
+```bash
+# not a heading
+pip install thing
+```
+
+## Usage
+
+Run it.
+"""
+
+
+def test_python_mode_splits_on_definitions():
+    chunks = Chunker(mode="python").chunk(PYTHON_SOURCE, "mod.py")
+
+    named = [(c.kind, c.name) for c in chunks if c.name]
+    assert named == [("function", "first"), ("function", "second"), ("class", "Widget")]
+    second = next(c for c in chunks if c.name == "second")
+    assert second.text.startswith("@decorator")
+    assert (second.start_line, second.end_line) == (10, 12)
+
+
+def test_python_mode_line_numbers_ignore_non_newline_breaks():
+    source = PYTHON_SOURCE.replace('"""Module docstring."""', '"""Module\x0cdoc\u2028string."""')
+    chunks = Chunker(mode="python").chunk(source.replace("\n", "\r\n"), "mod.py")
+
+    second = next(c for c in chunks if c.name == "second")
+    assert (second.start_line, second.end_line) == (10, 12)
+    assert second.text.startswith("@decorator\n")
+
+
+def test_python_mode_splits_large_classes_per_method():
+    methods = "\n".join(f"    def m{i}(self):\n        return {i}\n" for i in range(20))
+    source = f"class Big:\n    attr = 1\n\n{methods}"
+
+    chunks = Chunker(mode="python", chunk_size=60).chunk(source, "big.py")
+
+    assert "Big.m0" in {c.name for c in chunks}
+    assert all(c.kind in ("class", "method") for c in chunks)
+
+
+def test_python_mode_falls_back_on_syntax_error():
+    chunks = Chunker(mode="python").chunk("def broken(:\n    pass\n", "bad.py")
+    assert chunks and chunks[0].kind == "lines"
+
+
+def test_markdown_mode_splits_on_headings_outside_fences():
+    chunks = Chunker(mode="auto").chunk(MARKDOWN_SOURCE, "README.md")
+
+    assert [c.name for c in chunks] == ["Title", "Install", "Usage"]
+    assert "# not a heading" in chunks[1].text
+
+
+def test_tokens_mode_respects_budget():
+    text = "\n".join(f"line number {i} with some words" for i in range(200))
+    chunks = Chunker(mode="tokens", max_tokens=50).chunk(text, "notes.txt")
+
+    assert len(chunks) > 1
+    assert chunks[0].start_line == 1 and chunks[-1].end_line == 200
+    assert all(len(c.text) // 4 <= 50 * 2 + 10 for c in chunks)
+
+
+def test_line_boundaries_resynchronise_after_insert():
+    lines = [f"value_{i} = compute({i})" for i in range(400)]
+    chunker = Chunker(mode="lines", chunk_size=300, chunk_overlap=0)
+    before = {c.text for c in chunker.chunk("\n".join(lines), "data.txt")}
+    after = {c.text for c in chunker.chunk("\n".join(["inserted = True"] + lines), "data.txt")}
+
+    changed = after - before
+    assert len(changed) <= 2
+    assert len(before & after) >= len(before) - 2
+
+
+@pytest.mark.parametrize("mode", ["lines", "tokens", "markdown", "python"])
+def test_chunks_cover_every_line(mode):
+    text = PYTHON_SOURCE if mode == "python" else MARKDOWN_SOURCE * 5
+    chunks = Chunker(mode=mode, chunk_size=80, chunk_overlap=0, max_tokens=20).chunk(text, "f")
+    covered = set()
+    for chunk in chunks:
+        covered.update(range(chunk.start_line, chunk.end_line + 1))
+    non_blank = {i + 1 for i, line in enumerate(text.splitlines()) if line.strip()}
+    assert non_blank <= covered
+
+
+def test_invalid_mode_rejected():
+    with pytest.raises(ValueError):
+        Chunker(mode="sentences")
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_reindex_only_embeds_changed_chunks(tmp_path: Path):
+    source = tmp_path / "mod.py"
+    source.write_text(PYTHON_SOURCE, encoding="utf-8")
+    embedder = CountingEmbedder()
+    retriever = Retriever(
+        workspace_root=str(tmp_path),
+        embedder=embedder,
+        store=SimpleVectorStore(str(tmp_path / ".agent_engine" / "index.json")),
+        include_extensions=[".py"],
+    )
+    retriever.index_workspace()
+    embedder.embedded.clear()
+
+    source.write_text(PYTHON_SOURCE.replace("return a + 1", "return a + 100"), encoding="utf-8")
+    retriever.update_paths([str(source)])
+
+    assert len(embedder.embedded) == 1
+    assert "a + 100" in embedder.embedded[0]
+    symbols = {v.metadata.get("symbol") for v in retriever.store.vectors}
+    assert {"first", "second", "Widget"} <= symbols
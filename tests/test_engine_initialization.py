@@ -515,6 +515,52 @@ class TestOptionalManifests:
             assert engine.plugins is not None
             assert isinstance(engine.plugins, list)
 
+    def _write_retrieval_config(self, tmp_path, retrieval):
+        _write_yaml(tmp_path / "workflow.yaml", {
+            "nodes": [
+                {"stage_id": "start", "name": "start", "kind": "deterministic", "role": "start",
+                 "context": "none", "default_start": True},
+                {"stage_id": "exit", "name": "exit", "kind": "deterministic", "role": "exit",
+                 "context": "none"}
+            ],
+            "edges": [{"from_node_id": "start", "to_node_id": "exit"}]
+        })
+        _write_yaml(tmp_path / "agents.yaml", {"agents": []})
+        _write_yaml(tmp_path / "tools.yaml", {"tools": []})
+        _write_yaml(tmp_path / "memory.yaml", {"memory": {
+            "task_store": {"type": "in_memory"},
+            "project_store": {"type": "in_memory"},
+            "global_store": {"type": "in_memory"},
+            "retrieval": retrieval,
+        }})
+
+    def test_retrieval_embedder_selected_from_manifest(self):
+        """Test memory.retrieval selects the offline hashing embedder."""
+        from agent_engine.retrieval import HashingEmbeddingProvider
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._write_retrieval_config(
+                Path(tmp_dir),
+                {"embedder": {"provider": "hashing", "dim": 128}, "quantization": "int8"},
+            )
+
+            engine = Engine.from_config_dir(tmp_dir)
+
+            retriever = engine.context_assembler.retriever
+            assert isinstance(engine.context_assembler.embedding_provider, HashingEmbeddingProvider)
+            assert engine.context_assembler.embedding_provider.dim == 128
+            assert retriever.store.quantization == "int8"
+
+    def test_invalid_retrieval_embedder_rejected(self):
+        """Test unknown embedding providers fail manifest validation."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._write_retrieval_config(Path(tmp_dir), {"embedder": {"provider": "word2vec"}})
+
+            with pytest.raises(SchemaValidationError) as exc_info:
+                Engine.from_config_dir(tmp_dir)
+
+            assert "provider" in str(exc_info.value)
+
 
 class TestAdapterRegistration:
     """Test tools and LLM providers are registered."""
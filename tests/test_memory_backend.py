@@ -5,6 +5,9 @@ from datetime import datetime
 
 from agent_engine.schemas import ContextItem
 from agent_engine.runtime.memory import InMemoryBackend, MemoryBackend
+from agent_engine.runtime.memory.compact import CompactItemStore
+from agent_engine.runtime.memory.ordered_index import OrderedIndex
+from agent_engine.runtime.memory.read_cache import MemoryReadCache
 
 
 class TestInMemoryBackend:
@@ -422,6 +425,212 @@ class TestInMemoryBackend:
         assert len(results) == 1  # Should match since token_cost is 10.0
 
 
+    def test_fifo_retention_evicts_oldest(self):
+        """Test max_items evicts items with the oldest timestamps first."""
+        backend = InMemoryBackend(max_items=2)
+        for i in (3, 1, 2):
+            backend.add(self._create_item(item_id=f"item-{i}", timestamp=f"2025-12-0{i}T10:00:00"))
+
+        assert sorted(i.context_item_id for i in backend.list_all()) == ["item-2", "item-3"]
+
+    def test_lru_retention_keeps_recently_read(self):
+        """Test lru retention evicts the least recently added or read item."""
+        backend = InMemoryBackend(retention="lru", max_items=2)
+        backend.add(self._create_item(item_id="item-1"))
+        backend.add(self._create_item(item_id="item-2"))
+        backend.get("item-1")
+        backend.add(self._create_item(item_id="item-3"))
+
+        assert sorted(i.context_item_id for i in backend.list_all()) == ["item-1", "item-3"]
+
+    def test_ttl_expires_old_items_lazily(self):
+        """Test items older than ttl_seconds disappear on the next access."""
+        backend = InMemoryBackend(ttl_seconds=3600)
+        backend.add(self._create_item(item_id="old", timestamp="2020-01-01T00:00:00"))
+        backend.add(self._create_item(item_id="new", timestamp=datetime.now().isoformat()))
+
+        assert backend.get("old") is None
+        assert [i.context_item_id for i in backend.list_all()] == ["new"]
+
+    def test_invalid_retention_policy(self):
+        """Test unknown retention policies are rejected."""
+        with pytest.raises(ValueError, match="retention policy"):
+            InMemoryBackend(retention="random")
+
+
+class TestOrderedIndex:
+    """Tests for the heap-backed OrderedIndex."""
+
+    def test_pop_smallest_in_key_order(self):
+        index = OrderedIndex([("a", 3), ("b", 1), ("c", 2)])
+        assert index.pop_smallest(2) == ["b", "c"]
+        assert len(index) == 1
+        assert "a" in index
+
+    def test_updated_and_discarded_ids_skip_stale_entries(self):
+        index = OrderedIndex()
+        for key, item_id in enumerate(["a", "b", "c"]):
+            index.set(item_id, key)
+        index.set("a", 10)
+        index.discard("b")
+
+        assert index.peek() == (2, "c")
+        assert index.pop_smallest(5) == ["c", "a"]
+        assert len(index) == 0
+
+    def test_pop_below(self):
+        index = OrderedIndex([("a", 1.0), ("b", 5.0), ("c", 2.0)])
+        assert index.pop_below(3.0) == ["a", "c"]
+        assert index.pop_below(3.0) == []
+        assert len(index) == 1
+
+
+class TestCompactItemStore:
+    """Tests for the columnar CompactItemStore."""
+
+    def _item(self, item_id: str, **overrides) -> ContextItem:
+        fields = dict(
+            context_item_id=item_id,
+            kind="reasoning",
+            source="task/t1",
+            timestamp="2025-12-03T10:00:00",
+            tags=["task", "s1"],
+            importance=0.5,
+            token_cost=None,
+            payload={"text": item_id},
+        )
+        fields.update(overrides)
+        return ContextItem(**fields)
+
+    def test_round_trip(self):
+        item = self._item("a", metadata={"k": 1})
+        store = CompactItemStore([item])
+
+        assert store.get("a") == item
+        assert store.get("missing") is None
+        assert store.get("a").payload is item.payload
+
+    def test_replace_keeps_insertion_order_and_slot_reuse(self):
+        store = CompactItemStore([self._item("a"), self._item("b"), self._item("c")])
+        store.put(self._item("a", importance=0.9))
+        assert store.pop("b")
+        assert not store.pop("b")
+        store.put(self._item("d"))
+
+        assert store.ids() == ["a", "c", "d"]
+        assert store.get("a").importance == 0.9
+        assert len(store._ids) == 3  # "d" reused the slot freed by "b"
+
+    def test_tags_and_strings_are_interned(self):
+        store = CompactItemStore([self._item(f"item-{i}") for i in range(100)])
+
+        assert len(store._strings) == 2  # one kind, one source
+        assert len(store._tag_sets) == 1
+        assert store._tags[0] is store._tags[99]
+
+    def test_views_read_columns(self):
+        store = CompactItemStore([self._item("a")])
+        view = next(store.views())
+
+        assert view.kind == "reasoning"
+        assert view.tags == ["task", "s1"]
+        assert view.token_cost is None
+        assert view.not_a_field is None
+        assert view.materialize().context_item_id == "a"
+
+
+class TestMemoryReadCache:
+    """Tests for the write-generation read cache."""
+
+    def _item(self, item_id: str, tags: list = None) -> ContextItem:
+        return ContextItem(
+            context_item_id=item_id,
+            kind="reasoning",
+            source="task/t1",
+            timestamp="2025-12-03T10:00:00",
+            tags=tags or ["task"],
+            importance=0.5,
+            payload={"text": f"note {item_id}"},
+        )
+
+    def test_hits_until_backend_is_written(self):
+        backend = InMemoryBackend()
+        backend.add(self._item("a"))
+        cache = MemoryReadCache()
+
+        assert [i.context_item_id for i in cache.list_all(backend)] == ["a"]
+        assert [i.context_item_id for i in cache.list_all(backend)] == ["a"]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        backend.add(self._item("b"))
+        assert len(cache.list_all(backend)) == 2
+        backend.delete("a")
+        assert [i.context_item_id for i in cache.list_all(backend)] == ["b"]
+        backend.clear()
+        assert cache.list_all(backend) == []
+        assert cache.hits == 1
+
+    def test_reads_are_keyed_by_arguments(self):
+        backend = InMemoryBackend()
+        backend.add_many([self._item("a", ["x"]), self._item("b", ["y"])])
+        cache = MemoryReadCache()
+
+        assert [i.context_item_id for i in cache.query(backend, {"tags": ["x"]})] == ["a"]
+        assert [i.context_item_id for i in cache.query(backend, {"tags": ["y"]})] == ["b"]
+        assert len(cache.search_text(backend, "note")) == 2
+        assert cache.query(backend, {"tags": ["x"]}, limit=None)[0].context_item_id == "a"
+        assert cache.hits == 0
+        assert cache.query(backend, {"tags": ["y"]})[0].context_item_id == "b"
+        assert cache.hits == 1
+
+    def test_bounded_and_bypassed_without_generation(self):
+        cache = MemoryReadCache(max_entries=2)
+        backends = [InMemoryBackend() for _ in range(3)]
+        for backend in backends:
+            cache.list_all(backend)
+        assert len(cache) == 2
+
+        class _Plain:
+            def list_all(self):
+                return []
+
+        cache.list_all(_Plain())
+        assert len(cache) == 2
+        cache.invalidate(backends[2])
+        assert len(cache) == 1
+
+    def test_bounded_by_items_and_dropped_with_backend(self):
+        cache = MemoryReadCache(max_items=3)
+        small, large = InMemoryBackend(), InMemoryBackend()
+        small.add_many([self._item("a"), self._item("b")])
+        large.add_many([self._item(f"l{i}") for i in range(4)])
+
+        cache.list_all(small)
+        cache.list_all(large)
+        assert (len(cache), cache.cached_items) == (1, 2)
+
+        cache.search_text(small, "note a", limit=1)
+        cache.search_text(small, "note b", limit=1)
+        assert cache.cached_items == 2  # the full listing was evicted first
+
+        del small
+        assert (len(cache), cache.cached_items) == (0, 0)
+
+
+    def test_query_hits_count_as_lru_reads(self):
+        backend = InMemoryBackend(retention="lru", max_items=2)
+        backend.add_many([self._item("a"), self._item("b")])
+        cache = MemoryReadCache()
+
+        cache.query(backend, {"context_item_id": "a"})
+        cache.query(backend, {"context_item_id": "b"})
+        cache.query(backend, {"context_item_id": "a"})
+        assert cache.hits == 1
+        backend.add(self._item("c"))
+
+        assert sorted(i.context_item_id for i in backend.list_all()) == ["a", "c"]
+
+
 class TestMemoryBackendProtocol:
     """Tests to verify protocol compliance."""
 
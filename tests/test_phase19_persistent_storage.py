@@ -9,13 +9,14 @@ import tempfile
 import json
 import os
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
 from agent_engine.runtime.persistent_memory import (
     JsonLinesBackend,
     SQLiteBackend,
     PersistentMemoryStore,
+    partition_path,
 )
 from agent_engine.schemas.memory import ContextItem
 from agent_engine.schemas import ArtifactMetadata, ArtifactRecord, ArtifactType
@@ -177,6 +178,67 @@ class TestJsonLinesBackend:
         assert backend2.count() == 1
         assert backend2.get("item-1") is not None
 
+    def test_jsonl_delete_appends_tombstone(
+        self, temp_dir, sample_context_item, sample_context_item_2
+    ):
+        """Test deletes append to the log and survive a reload."""
+        file_path = os.path.join(temp_dir, "items.jsonl")
+        backend = JsonLinesBackend(file_path)
+        backend.add(sample_context_item)
+        backend.add(sample_context_item_2)
+        backend.delete("item-1")
+
+        with open(file_path, 'r') as f:
+            assert len(f.readlines()) == 3
+        assert backend.dead_records == 2
+
+        reloaded = JsonLinesBackend(file_path)
+        assert reloaded.get("item-1") is None
+        assert reloaded.get("item-2") is not None
+        assert reloaded.dead_records == 2
+
+    def test_jsonl_compaction_drops_dead_records(self, temp_dir):
+        """Test the log is compacted once the dead-record ratio exceeds the threshold."""
+        file_path = os.path.join(temp_dir, "items.jsonl")
+        backend = JsonLinesBackend(
+            file_path, compaction_threshold=0.5, min_compaction_records=4,
+            background_compaction=False,
+        )
+        for version in range(5):
+            backend.add(ContextItem(
+                context_item_id="item-1", kind="test", source="test",
+                payload={"version": version}
+            ))
+
+        with open(file_path, 'r') as f:
+            lines = f.readlines()
+        assert len(lines) <= 2
+        assert backend.get("item-1").payload == {"version": 4}
+        assert JsonLinesBackend(file_path).get("item-1").payload == {"version": 4}
+
+    def test_jsonl_background_compaction(self, temp_dir):
+        """Test background compaction keeps every live item."""
+        file_path = os.path.join(temp_dir, "items.jsonl")
+        backend = JsonLinesBackend(file_path, fsync="always", min_compaction_records=8)
+        for i in range(20):
+            backend.add(ContextItem(
+                context_item_id=f"item-{i}", kind="test", source="test", payload={}
+            ))
+        for i in range(15):
+            backend.delete(f"item-{i}")
+        backend.close()
+
+        reloaded = JsonLinesBackend(file_path)
+        assert sorted(i.context_item_id for i in reloaded.list_all()) == [
+            f"item-{i}" for i in range(15, 20)
+        ]
+        assert reloaded.dead_records < 20
+
+    def test_jsonl_invalid_fsync_policy(self, temp_dir):
+        """Test unknown fsync policies are rejected."""
+        with pytest.raises(ValueError, match="fsync"):
+            JsonLinesBackend(os.path.join(temp_dir, "items.jsonl"), fsync="sometimes")
+
 
 # ===== SQLiteBackend Tests (10 tests) =====
 
@@ -306,6 +368,161 @@ class TestSQLiteBackend:
         backend.enforce_artifact_retention(3)
         assert backend.artifact_count() == 3
 
+    def test_sqlite_add_many(self, temp_dir):
+        """Test batch inserts land in one call and upsert by ID."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        items = [
+            ContextItem(context_item_id=f"item-{i % 50}", kind="test", source="test",
+                        payload={"i": i})
+            for i in range(60)
+        ]
+        backend.add_many(items)
+        assert backend.count() == 50
+        assert backend.get("item-5").payload == {"i": 55}
+
+    def test_sqlite_reuses_wal_connection_per_thread(self, temp_dir, sample_context_item):
+        """Test each thread keeps one WAL-mode connection."""
+        import threading
+
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        backend.add(sample_context_item)
+        conn = backend._conn()
+        backend.get("item-1")
+        assert backend._conn() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(backend._conn()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+
+        backend.close()
+        assert SQLiteBackend(db_path).count() == 1
+
+    def test_sqlite_tag_and_operator_filters(
+        self, temp_dir, sample_context_item, sample_context_item_2
+    ):
+        """Test tags and comparison operators are filtered in SQL."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        backend.add(sample_context_item)
+        backend.add(sample_context_item_2)
+
+        assert [i.context_item_id for i in backend.query({"tags": ["sample"]})] == ["item-1"]
+        assert len(backend.query({"tags": ["debug", "test"]})) == 2
+        assert backend.query({"tags": []}) == []
+        assert [
+            i.context_item_id for i in backend.query({"importance": {"$gte": 0.6}})
+        ] == ["item-1"]
+        assert [
+            i.context_item_id for i in backend.query({"kind": {"$ne": "code"}, "tags": ["debug"]})
+        ] == ["item-2"]
+        # Non-column filters are applied in Python
+        matched = backend.query({"payload": {"$eq": {"error": "test error"}}}, limit=1)
+        assert [i.context_item_id for i in matched] == ["item-2"]
+
+    def test_sqlite_tag_table_follows_replace_and_delete(self, temp_dir, sample_context_item):
+        """Test the tag table stays in sync when items are replaced or deleted."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        backend.add(sample_context_item)
+        backend.add(sample_context_item.model_copy(update={"tags": ["renamed"]}))
+
+        assert backend.query({"tags": ["sample"]}) == []
+        assert len(backend.query({"tags": ["renamed"]})) == 1
+
+        backend.delete("item-1")
+        rows = backend._conn().execute("SELECT COUNT(*) FROM memory_item_tags").fetchone()
+        assert rows[0] == 0
+
+    def test_sqlite_tag_query_uses_index(self, temp_dir):
+        """Test tag-filtered, timestamp-ordered queries use indexes."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        plan = " ".join(
+            str(row[-1]) for row in backend._conn().execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM memory_items WHERE context_item_id IN "
+                "(SELECT item_id FROM memory_item_tags WHERE tag IN (?)) "
+                "ORDER BY timestamp DESC", ("x",)
+            )
+        )
+        assert "memory_item_tags" in plan
+        assert "memory_item_tags USING PRIMARY KEY" in plan
+
+    def test_sqlite_order_by_whitelist(self, temp_dir, sample_context_item, sample_context_item_2):
+        """Test ORDER BY accepts known columns only."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        backend.add(sample_context_item)
+        backend.add(sample_context_item_2)
+
+        assert [i.context_item_id for i in backend.query({}, order_by="-importance")] == [
+            "item-2", "item-1"
+        ]
+        assert len(backend.query({}, limit=1)) == 1
+        with pytest.raises(ValueError, match="Cannot order by"):
+            backend.query({}, order_by="timestamp; DROP TABLE memory_items")
+
+    def test_sqlite_full_text_search(self, temp_dir, sample_context_item, sample_context_item_2):
+        """Test the FTS5 index follows inserts, replaces and deletes."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path, full_text_search=True)
+        backend.add(sample_context_item)
+        backend.add(sample_context_item_2)
+
+        assert [i.context_item_id for i in backend.search_text("error")] == ["item-2"]
+        assert len(backend.search_text("hello OR \"error")) == 2
+        assert backend.search_text("   ") == []
+
+        backend.add(sample_context_item_2.model_copy(update={"payload": {"note": "fixed"}}))
+        assert backend.search_text("error") == []
+        assert [i.context_item_id for i in backend.search_text("fixed")] == ["item-2"]
+
+        backend.delete("item-1")
+        assert backend.search_text("hello") == []
+
+    def test_sqlite_full_text_search_backfills_existing_rows(self, temp_dir, sample_context_item):
+        """Test enabling full-text search indexes rows written before."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        SQLiteBackend(db_path).add(sample_context_item)
+
+        backend = SQLiteBackend(db_path, full_text_search=True)
+        assert [i.context_item_id for i in backend.search_text("print")] == ["item-1"]
+
+    def test_search_text_without_index(self, temp_dir, sample_context_item, sample_context_item_2):
+        """Test search_text falls back to scanning payloads."""
+        backend = SQLiteBackend(os.path.join(temp_dir, "memory.db"))
+        backend.add(sample_context_item)
+        backend.add(sample_context_item_2)
+        assert [i.context_item_id for i in backend.search_text("hello")] == ["item-1"]
+
+        store = PersistentMemoryStore(
+            backend_type="jsonl", file_path=os.path.join(temp_dir, "items.jsonl")
+        )
+        store.add(sample_context_item)
+        store.add(sample_context_item_2)
+        assert [i.context_item_id for i in store.search_text("test error")] == ["item-2"]
+
+
+    def test_write_generation_tracks_other_connections(
+        self, temp_dir, sample_context_item, sample_context_item_2
+    ):
+        """Test write_generation changes on local writes and on commits by another connection."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        start = backend.write_generation()
+        assert backend.write_generation() == start
+
+        backend.add(sample_context_item)
+        after_add = backend.write_generation()
+        assert after_add != start
+
+        SQLiteBackend(db_path).add(sample_context_item_2)
+        assert backend.write_generation() != after_add
+
 
 # ===== PersistentMemoryStore Tests (5 tests) =====
 
@@ -384,6 +601,46 @@ class TestPersistentMemoryStore:
         with pytest.raises(ValueError):
             PersistentMemoryStore(backend_type="invalid")
 
+    @pytest.mark.parametrize("backend_type", ["in_memory", "jsonl", "sqlite"])
+    def test_memory_store_add_many_applies_retention_once(self, temp_dir, backend_type):
+        """Test bulk adds keep the newest max_items items on every backend."""
+        store = PersistentMemoryStore(
+            backend_type=backend_type,
+            file_path=os.path.join(temp_dir, "items.jsonl"),
+            db_path=os.path.join(temp_dir, "memory.db"),
+            max_items=3
+        )
+        store.add_many([
+            ContextItem(
+                context_item_id=f"item-{i}",
+                kind="test",
+                source="test",
+                timestamp=f"2025-01-{i + 1:02d}T00:00:00+00:00",
+                payload={}
+            )
+            for i in range(10)
+        ])
+
+        assert sorted(i.context_item_id for i in store.list_all()) == [
+            "item-7", "item-8", "item-9"
+        ]
+
+    def test_jsonl_add_many_single_append(self, temp_dir):
+        """Test a JSONL batch writes its records and eviction tombstones together."""
+        file_path = os.path.join(temp_dir, "items.jsonl")
+        backend = JsonLinesBackend(file_path, min_compaction_records=1000)
+        backend.add_many(
+            [ContextItem(context_item_id=f"item-{i}", kind="test", source="test",
+                         timestamp=f"2025-01-{i + 1:02d}", payload={}) for i in range(5)],
+            max_items=2
+        )
+
+        with open(file_path, 'r') as f:
+            assert len(f.readlines()) == 8
+        assert sorted(i.context_item_id for i in JsonLinesBackend(file_path).list_all()) == [
+            "item-3", "item-4"
+        ]
+
 
 # ===== MemoryStore Integration Tests (5 tests) =====
 
@@ -413,6 +670,38 @@ class TestMemoryStoreIntegration:
         store.put(item)
         assert store.persistent_store.count() == 1
 
+    def test_memory_store_put_keeps_single_copy(self):
+        """Test put stores ContextItems only in the backend; other objects stay legacy."""
+        store = MemoryStore("task", "in_memory")
+        store.put(ContextItem(context_item_id="item-1", kind="test", source="test", payload={}))
+        store.put({"legacy": True})
+
+        assert store._legacy_items == [{"legacy": True}]
+        assert [getattr(i, "context_item_id", None) for i in store.items] == ["item-1", None]
+
+    def test_memory_store_open_partition(self, temp_dir, sample_context_item):
+        """Test partitions are separate backends next to the store's file."""
+        store = MemoryStore(
+            "project", backend="sqlite", db_path=os.path.join(temp_dir, "project.db")
+        )
+        partition = store.open_partition("acme/web")
+        partition.add(sample_context_item)
+
+        assert partition.db_path == partition_path(os.path.join(temp_dir, "project.db"), "acme/web")
+        assert partition.db_path.parent == Path(temp_dir) / "project"
+        assert store.persistent_store.count() == 0
+        assert store.open_partition("acme/web").count() == 1
+        assert MemoryStore("task", "in_memory").open_partition("acme/web") is None
+
+    def test_memory_store_add_many(self, temp_dir):
+        """Test MemoryStore bulk puts reach the persistent backend."""
+        store = MemoryStore("project", backend="sqlite", db_path=os.path.join(temp_dir, "m.db"))
+        store.add_many([
+            ContextItem(context_item_id=f"item-{i}", kind="test", source="test", payload={})
+            for i in range(25)
+        ])
+        assert store.persistent_store.count() == 25
+
     def test_memory_store_with_sqlite_backend(self, temp_dir):
         """Test MemoryStore with SQLite backend."""
         db_path = os.path.join(temp_dir, "memory.db")
@@ -567,6 +856,91 @@ class TestRetentionAndEdgeCases:
         backend.enforce_retention(2)
         assert backend.count() == 2
 
+    def test_jsonl_lru_retention_survives_reload(self, temp_dir):
+        """Test lru evictions are logged as tombstones and not resurrected on reload."""
+        file_path = os.path.join(temp_dir, "items.jsonl")
+        backend = JsonLinesBackend(file_path, retention="lru")
+        for i in range(3):
+            backend.add_many(
+                [ContextItem(context_item_id=f"item-{i}", kind="test", source="test", payload={})],
+                max_items=2
+            )
+            backend.get("item-0")
+        backend.close()
+
+        reloaded = JsonLinesBackend(file_path)
+        assert sorted(i.context_item_id for i in reloaded.list_all()) == ["item-0", "item-2"]
+
+    def test_jsonl_ttl_expiry(self, temp_dir, sample_context_item):
+        """Test expired JSONL items are swept on read and stay deleted."""
+        file_path = os.path.join(temp_dir, "items.jsonl")
+        backend = JsonLinesBackend(file_path, ttl_seconds=3600)
+        backend.add(sample_context_item)
+
+        assert backend.count() == 0
+        backend.close()
+        assert JsonLinesBackend(file_path).count() == 0
+
+    def test_sqlite_ttl_expiry(self, temp_dir, sample_context_item, sample_context_item_2):
+        """Test SQLite expires items by their timestamp, like the other backends."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path, ttl_seconds=3600)
+        recent = sample_context_item_2.model_copy(
+            update={"timestamp": datetime.now(timezone.utc).isoformat()}
+        )
+        backend.add_many([sample_context_item, recent])
+
+        assert backend.sweep_expired() == 0
+        assert [i.context_item_id for i in backend.list_all()] == ["item-2"]
+        assert backend.count() == 1
+
+    def test_sqlite_count_follows_writes(self, temp_dir, sample_context_item):
+        """Test the maintained SQLite row count across replace, delete and retention."""
+        db_path = os.path.join(temp_dir, "memory.db")
+        backend = SQLiteBackend(db_path)
+        items = [
+            sample_context_item.model_copy(update={"context_item_id": f"item-{i}"})
+            for i in range(5)
+        ]
+        backend.add_many(items)
+        backend.add(items[0])
+        assert backend.count() == 5
+
+        backend.delete("item-1")
+        backend.add_many(items[:2], max_items=3)
+        assert backend.count() == 3
+        assert backend.count() == len(backend.list_all())
+
+        backend.clear()
+        assert SQLiteBackend(db_path).count() == 0
+
+    def test_in_memory_store_lru_retention(self, sample_context_item, sample_context_item_2):
+        """Test PersistentMemoryStore lru retention keeps recently read items."""
+        store = PersistentMemoryStore(backend_type="in_memory", max_items=2, retention="lru")
+        store.add(sample_context_item)
+        store.add(sample_context_item_2)
+        store.get("item-1")
+        store.add(sample_context_item_2.model_copy(update={"context_item_id": "item-3"}))
+
+        assert sorted(i.context_item_id for i in store.list_all()) == ["item-1", "item-3"]
+
+    def test_sqlite_store_rejects_lru(self, temp_dir):
+        """Test the SQLite store only supports fifo retention."""
+        with pytest.raises(ValueError, match="retention"):
+            PersistentMemoryStore(
+                backend_type="sqlite", db_path=os.path.join(temp_dir, "m.db"), retention="lru"
+            )
+
+    def test_memory_store_sqlite_lru_keeps_persistence(self, temp_dir):
+        """Test MemoryStore falls back to fifo, not to in-memory, for sqlite with lru."""
+        db_path = os.path.join(temp_dir, "m.db")
+        store = MemoryStore("project", backend="sqlite", db_path=db_path, retention="lru")
+
+        assert store.persistent_store.backend_type == "sqlite"
+        assert os.path.exists(db_path)
+        with pytest.raises(ValueError, match="retention"):
+            MemoryStore("project", retention="random")
+
     def test_sqlite_concurrent_access(self, temp_dir):
         """Test SQLite backend handles concurrent access."""
         import threading
@@ -864,3 +864,98 @@ class TestExtractSelectedEdge:
         }
         result = router._extract_selected_edge(output)
         assert result == "valid_condition"
+
+
+class TestTaskMemoryTeardown:
+    """Tests that concluded tasks release their memory."""
+
+    def test_exit_concludes_task_memory(self) -> None:
+        """Test reaching an exit node hands the task to the context assembler."""
+        stages = {
+            "start": Node(
+                stage_id="start",
+                name="Start",
+                kind=NodeKind.DETERMINISTIC,
+                role=NodeRole.START,
+                default_start=True,
+                context="global",
+            ),
+            "exit": Node(
+                stage_id="exit",
+                name="Exit",
+                kind=NodeKind.DETERMINISTIC,
+                role=NodeRole.EXIT,
+                context="global",
+            ),
+        }
+        workflow = WorkflowGraph(
+            workflow_id="wf",
+            nodes=list(stages.keys()),
+            edges=[Edge(from_node_id="start", to_node_id="exit")],
+        )
+
+        class _Assembler:
+            concluded = []
+
+            def conclude_task(self, task):
+                self.concluded.append(task.task_id)
+
+        assembler = _Assembler()
+        router = Router(workflow=workflow, stages=stages, context_assembler=assembler)
+        task = TaskManager().create_task(TaskSpec(task_spec_id="test", request="do"))
+
+        router._route_exit(task, stages["exit"])
+
+        assert task.status == UniversalStatus.COMPLETED
+        assert assembler.concluded == [task.task_id]
+
+    def test_failed_run_concludes_task_memory(self) -> None:
+        """Test a run that ends in an EngineError still releases task memory."""
+        stages = {
+            "start": Node(
+                stage_id="start",
+                name="Start",
+                kind=NodeKind.DETERMINISTIC,
+                role=NodeRole.START,
+                default_start=True,
+                context="global",
+            ),
+            "work": Node(
+                stage_id="work",
+                name="Work",
+                kind=NodeKind.DETERMINISTIC,
+                role=NodeRole.LINEAR,
+                context="global",
+            ),
+        }
+        workflow = WorkflowGraph(
+            workflow_id="wf",
+            nodes=list(stages.keys()),
+            edges=[Edge(from_node_id="start", to_node_id="work")],
+        )
+
+        class _Assembler:
+            concluded = []
+
+            def conclude_task(self, task):
+                self.concluded.append(task.task_id)
+
+        class _Executor:
+            def execute_node(self, task, node):
+                if node.stage_id == "work":
+                    raise EngineError("Node 'work' failed")
+                return {"node_status": UniversalStatus.COMPLETED}, None
+
+        assembler = _Assembler()
+        router = Router(
+            workflow=workflow,
+            stages=stages,
+            node_executor=_Executor(),
+            context_assembler=assembler,
+        )
+
+        with pytest.raises(EngineError):
+            router.execute_task("do")
+
+        assert len(assembler.concluded) == 1
+        assert router.task_manager.get_task(assembler.concluded[0]) is not None
@@ -29,6 +29,9 @@ from agent_engine.runtime.memory import (
     ProjectMemoryStore,
     GlobalMemoryStore,
     InMemoryBackend,
+    MemoryPressurePolicy,
+    ProjectStorePool,
+    TaskStorePool,
 )
 from agent_engine.runtime.context import ContextAssembler
 
@@ -300,6 +303,129 @@ class TestProjectMemoryStore:
         assert proj2_items[0].source == "project/proj-2"
 
 
+    def test_eviction_drops_lowest_importance(self):
+        """Test over-capacity eviction removes the least important items first."""
+        store = ProjectMemoryStore(
+            project_id="proj-1",
+            backend=InMemoryBackend(),
+            max_items=10
+        )
+        for i in range(10):
+            store.add_decision(f"Decision {i}", [])
+        store.add_convention("Convention 1", "python")
+
+        kinds = [item.kind for item in store.backend.list_all()]
+        assert len(kinds) == 10
+        assert "convention" not in kinds
+
+
+class TestProjectStorePool:
+    """Tests for the LRU-bounded ProjectStorePool."""
+
+    def test_lazy_load_and_lru_eviction(self, tmp_path):
+        """Test evicted projects are flushed and reloaded from their backend."""
+        from agent_engine.runtime.persistent_memory import JsonLinesBackend
+
+        pool = ProjectStorePool(
+            backend_factory=lambda pid: JsonLinesBackend(str(tmp_path / f"{pid}.jsonl")),
+            max_resident=2,
+        )
+        pool.acquire("proj-1").add_decision("Use WAL", [])
+        pool.acquire("proj-2")
+        pool.acquire("proj-1")
+        pool.acquire("proj-3")
+
+        assert list(pool) == ["proj-1", "proj-3"]
+        assert pool.evictions == 1
+
+        pool.acquire("proj-2")
+        assert "proj-1" not in pool
+        reloaded = pool.acquire("proj-1")
+        assert reloaded.backend.count() == 1
+        assert pool.loads == 5
+
+    def test_unbounded_without_factory(self):
+        """Test in-memory project stores are never evicted."""
+        pool = ProjectStorePool()
+        for i in range(10):
+            pool.acquire(f"proj-{i}")
+
+        assert len(pool) == 10
+        assert isinstance(pool["proj-0"].backend, InMemoryBackend)
+
+    def test_assembler_adopts_dict_and_factory(self, tmp_path):
+        """Test ContextAssembler wraps project_stores in a bounded pool."""
+        store = ProjectMemoryStore(project_id="proj-1", backend=InMemoryBackend())
+        assembler = ContextAssembler(
+            project_stores={"proj-1": store},
+            project_backend_factory=lambda pid: None,
+            max_resident_projects=4,
+        )
+
+        assert isinstance(assembler.project_stores, ProjectStorePool)
+        assert assembler.project_stores.max_resident == 4
+        assert assembler.project_stores.acquire("proj-1") is store
+
+
+class TestTaskStorePool:
+    """Tests for TaskStorePool lifecycle and spilling."""
+
+    def test_spills_idle_stores_under_pressure(self, tmp_path):
+        """Test idle stores are spilled to disk and transparently reloaded."""
+        pool = TaskStorePool(MemoryPressurePolicy(
+            max_resident_items=0, min_idle_seconds=0, spill_dir=str(tmp_path)
+        ))
+        pool.acquire("task-1").add_reasoning("first thoughts", "s1")
+        pool.acquire("task-2")
+
+        assert not pool.is_resident("task-1")
+        assert "task-1" in pool
+        assert pool.spills == 1
+        assert list(tmp_path.iterdir())
+
+        reloaded = pool.acquire("task-1")
+        assert reloaded.backend.list_all()[0].payload == {"text": "first thoughts"}
+
+        del pool["task-1"]
+        assert "task-1" not in pool
+        assert not list(tmp_path.iterdir())
+
+    def test_spill_files_of_similar_task_ids_do_not_collide(self, tmp_path):
+        """Test task ids that sanitize to the same name spill to separate files."""
+        pool = TaskStorePool(MemoryPressurePolicy(
+            max_resident_items=0, min_idle_seconds=0, spill_dir=str(tmp_path)
+        ))
+        pool.acquire("a/b").add_reasoning("slash", "s1")
+        pool.acquire("a_b").add_reasoning("underscore", "s1")
+        pool.acquire("other")
+
+        assert len(list(tmp_path.iterdir())) == 2
+        assert pool.acquire("a/b").backend.list_all()[0].payload == {"text": "slash"}
+
+    def test_recently_used_stores_stay_resident(self, tmp_path):
+        """Test stores used within min_idle_seconds are not spilled."""
+        pool = TaskStorePool(MemoryPressurePolicy(max_resident_items=0, spill_dir=str(tmp_path)))
+        pool.acquire("task-1").add_reasoning("thoughts", "s1")
+        pool.acquire("task-2")
+
+        assert pool.is_resident("task-1")
+        assert pool.spills == 0
+
+    def test_conclude_task_promotes_and_tears_down(self):
+        """Test conclude_task copies selected items to project memory and drops the store."""
+        assembler = ContextAssembler(task_promotion_filter=lambda item: item.kind == "tool_output")
+        task = TestContextAssemblerContextBuilding()._create_task()
+        store = assembler.task_stores.acquire(task.task_id)
+        store.add_reasoning("scratch", "s1")
+        store.add_tool_output("pytest", "3 passed")
+
+        assembler.conclude_task(task)
+
+        assert task.task_id not in assembler.task_stores
+        promoted = assembler.project_stores["proj-1"].backend.list_all()
+        assert [item.kind for item in promoted] == ["tool_output"]
+
+
 class TestGlobalMemoryStore:
     """Tests for GlobalMemoryStore."""
 
@@ -505,6 +631,31 @@ class TestContextAssemblerContextBuilding:
         assert len(package.items) == 1
         assert package.items[0].kind == "reasoning"
 
+    def test_build_context_reuses_reads_until_store_changes(self):
+        """Test unchanged stores are served from the read cache across nodes."""
+        assembler = ContextAssembler()
+        task = self._create_task()
+        project_store = assembler.project_stores.acquire("proj-1")
+        project_store.add_decision("Use SQLite", ["arch"])
+        profile = ContextProfile(
+            id="test",
+            max_tokens=1000,
+            retrieval_policy="recency",
+            sources=[
+                ContextProfileSource(store="project", tags=["arch"]),
+                ContextProfileSource(store="global", tags=[]),
+            ]
+        )
+
+        assembler.build_context_for_profile(task, profile)
+        package = assembler.build_context_for_profile(task, profile)
+        assert len(package.items) == 1
+        assert assembler.read_cache.hits == 2
+
+        project_store.add_decision("Use WAL mode", ["arch"])
+        package = assembler.build_context_for_profile(task, profile)
+        assert len(package.items) == 2
+
     def test_build_context_from_project_store(self):
         """Test building context from project memory."""
         assembler = ContextAssembler()
@@ -606,6 +757,55 @@ class TestContextAssemblerContextBuilding:
 
         assert len(package.items) == 1
 
+    def test_context_tag_filtering_sqlite_backend(self, tmp_path):
+        """Test tag filters are answered by a SQLite-backed store."""
+        from agent_engine.runtime.persistent_memory import SQLiteBackend
+
+        assembler = ContextAssembler()
+        task = self._create_task()
+        backend = SQLiteBackend(str(tmp_path / "project.db"))
+        project_store = ProjectMemoryStore(project_id="proj-1", backend=backend)
+        project_store.add_decision("Use WAL so readers do not block", ["db"])
+        project_store.add_decision("Use tabs", ["style"])
+        assembler.project_stores["proj-1"] = project_store
+
+        profile = ContextProfile(
+            id="db-only",
+            max_tokens=1000,
+            retrieval_policy="recency",
+            sources=[ContextProfileSource(store="project", tags=["db"])]
+        )
+
+        package = assembler.build_context_for_profile(task, profile)
+
+        assert len(package.items) == 1
+        assert "db" in package.items[0].tags
+
+    def test_context_text_search_source(self, tmp_path):
+        """Test a source can select items by full-text search on the request."""
+        from agent_engine.runtime.persistent_memory import SQLiteBackend
+
+        assembler = ContextAssembler()
+        task = self._create_task()
+        task.spec.request = "Why is the database locked?"
+        backend = SQLiteBackend(str(tmp_path / "project.db"), full_text_search=True)
+        project_store = ProjectMemoryStore(project_id="proj-1", backend=backend)
+        project_store.add_decision("Enable WAL so the database is not locked by readers", ["db"])
+        project_store.add_decision("Use tabs", ["style"])
+        assembler.project_stores["proj-1"] = project_store
+
+        profile = ContextProfile(
+            id="search",
+            max_tokens=1000,
+            retrieval_policy="recency",
+            sources=[ContextProfileSource(store="project", text_search=True)]
+        )
+
+        package = assembler.build_context_for_profile(task, profile)
+
+        assert len(package.items) == 1
+        assert "WAL" in package.items[0].payload["decision"]
+
     def test_token_budget_enforcement(self):
         """Test token budget is enforced."""
         assembler = ContextAssembler()
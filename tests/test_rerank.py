@@ -0,0 +1,123 @@
+"""Tests for MMR re-ranking and adjacent-chunk merging."""
+
+from pathlib import Path
+
+from agent_engine.retrieval.embedder import HashingEmbeddingProvider
+from agent_engine.retrieval.rerank import merge_adjacent_chunks, mmr_rerank
+from agent_engine.retrieval.retriever import RetrievalChunk, Retriever
+from agent_engine.retrieval.vector_store import SimpleVectorStore
+from agent_engine.runtime.context import ContextAssembler
+from agent_engine.schemas import ContextProfile, ContextProfileSource, Task, TaskMode, TaskSpec
+
+
+def _chunk(chunk_id, score, text="", path=None, lines=None):
+    metadata = {}
+    if path:
+        metadata = {"path": path, "start_line": lines[0], "end_line": lines[1]}
+    return RetrievalChunk(chunk_id=chunk_id, text=text, score=score, metadata=metadata)
+
+
+def test_mmr_skips_near_duplicates():
+    chunks = [_chunk("a", 0.95), _chunk("a-copy", 0.94), _chunk("b", 0.80)]
+    vectors = {"a": [1.0, 0.0], "a-copy": [0.99, 0.01], "b": [0.0, 1.0]}
+
+    selected = mmr_rerank(chunks, top_k=2, lambda_mult=0.5, vectors=vectors)
+
+    assert [c.chunk_id for c in selected] == ["a", "b"]
+
+
+def test_mmr_lambda_one_keeps_relevance_order():
+    chunks = [_chunk("a", 0.9), _chunk("b", 0.8), _chunk("c", 0.7)]
+    vectors = {"a": [1.0, 0.0], "b": [1.0, 0.0], "c": [0.0, 1.0]}
+
+    selected = mmr_rerank(chunks, 3, lambda_mult=1.0, vectors=vectors)
+
+    assert [c.chunk_id for c in selected] == ["a", "b", "c"]
+
+
+def test_mmr_falls_back_to_word_overlap():
+    chunks = [
+        _chunk("a", 0.9, "open the config file and parse it"),
+        _chunk("b", 0.89, "open the config file and parse it again"),
+        _chunk("c", 0.6, "network retry backoff settings"),
+    ]
+
+    assert [c.chunk_id for c in mmr_rerank(chunks, 2, lambda_mult=0.5)] == ["a", "c"]
+
+
+def test_merge_adjacent_chunks_dedupes_overlap():
+    text_a = "\n".join(f"line {i}" for i in range(1, 11))
+    text_b = "\n".join(f"line {i}" for i in range(8, 16))
+    chunks = [
+        _chunk("f:8-15", 0.9, text_b, "f.py", (8, 15)),
+        _chunk("g:1-3", 0.7, "other", "g.py", (1, 3)),
+        _chunk("f:1-10", 0.5, text_a, "f.py", (1, 10)),
+    ]
+
+    merged = merge_adjacent_chunks(chunks)
+
+    assert [c.chunk_id for c in merged] == ["f.py:1-15", "g:1-3"]
+    assert merged[0].text.splitlines() == [f"line {i}" for i in range(1, 16)]
+    assert merged[0].score == 0.9
+    assert merged[0].metadata["merged_chunk_ids"] == ["f:1-10", "f:8-15"]
+
+
+def test_merge_adjacent_chunks_joins_contiguous_chunks_without_gap_marker():
+    chunks = [
+        _chunk("f:1-2", 0.9, "l1\nl2", "f.py", (1, 2)),
+        _chunk("f:3-4", 0.8, "l3\nl4", "f.py", (3, 4)),
+        _chunk("f:6-6", 0.7, "l6", "f.py", (6, 6)),
+    ]
+
+    merged = merge_adjacent_chunks(chunks, max_gap=1)
+
+    assert [c.chunk_id for c in merged] == ["f.py:1-6"]
+    assert merged[0].text == "l1\nl2\nl3\nl4\n...\nl6"
+
+
+def test_merge_adjacent_chunks_keeps_distant_chunks_apart():
+    chunks = [
+        _chunk("f:1-5", 0.9, "a", "f.py", (1, 5)),
+        _chunk("f:20-25", 0.8, "b", "f.py", (20, 25)),
+    ]
+
+    assert merge_adjacent_chunks(chunks, max_gap=1) == chunks
+
+
+def test_context_profile_enables_mmr_and_merging(tmp_path: Path):
+    body = "\n".join(f"settings value {i} for the parser" for i in range(60))
+    (tmp_path / "settings.txt").write_text(body, encoding="utf-8")
+    (tmp_path / "other.txt").write_text("parser settings overview", encoding="utf-8")
+    retriever = Retriever(
+        workspace_root=str(tmp_path),
+        embedder=HashingEmbeddingProvider(dim=64),
+        store=SimpleVectorStore(str(tmp_path / "index.json")),
+        include_extensions=[".txt"],
+        chunk_size=200,
+        chunk_overlap=50,
+    )
+    profile = ContextProfile(
+        id="diverse",
+        max_tokens=5000,
+        retrieval_policy="semantic",
+        sources=[ContextProfileSource(store="task", tags=[])],
+        metadata={"rag_top_k": 3, "rag_mmr_lambda": 0.5, "rag_merge_adjacent": True},
+    )
+    task = Task(
+        task_id="t1",
+        spec=TaskSpec(task_spec_id="s", request="parser settings", mode=TaskMode.ANALYSIS_ONLY),
+        task_memory_ref="task",
+        project_memory_ref="project",
+        global_memory_ref="global",
+    )
+    assembler = ContextAssembler(workspace_root=str(tmp_path), retriever=retriever)
+
+    ctx = assembler.build_context_for_profile(task, profile)
+
+    retrieval = assembler.get_context_metadata(ctx)["retrieval"]
+    assert retrieval["mmr_lambda"] == 0.5
+    assert retrieval["candidates_fetched"] > 3
+    rag_items = [i for i in ctx.items if i.kind == "retrieval_chunk"]
+    assert 0 < len(rag_items) <= 3
+    texts = [i.payload for i in rag_items]
+    assert len(set(texts)) == len(texts)
@@ -1,13 +1,31 @@
+import json
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
-from agent_engine.retrieval.embedder import EmbeddingProvider
-from agent_engine.retrieval.vector_store import SimpleVectorStore
-from agent_engine.retrieval.retriever import Retriever
+import pytest
+
+from agent_engine.retrieval.cache import CachedEmbeddingProvider, EmbeddingCache
+from agent_engine.retrieval.embedder import (
+    EmbeddingProvider,
+    HashingEmbeddingProvider,
+    OllamaEmbeddingProvider,
+    create_embedding_provider,
+)
+from agent_engine.retrieval.filters import MetadataFilter
+from agent_engine.retrieval.indexer import BackgroundIndexer
+from agent_engine.retrieval.lexical import BM25Index, reciprocal_rank_fusion, tokenize
+from agent_engine.retrieval.sharded_store import ShardedVectorStore
+from agent_engine.retrieval.shared_index import SharedIndexReader, publish_snapshot
+from agent_engine.retrieval.vector_store import SidecarValues, SimpleVectorStore, StoredVector
+from agent_engine.retrieval.retriever import Retriever, embed_memory_items
 from agent_engine.runtime.context import ContextAssembler
 from agent_engine.schemas import (
     ContextProfile,
     ContextProfileSource,
+    RetrievalConfig,
     Task,
     TaskSpec,
     TaskMode,
@@ -20,6 +38,17 @@ class StubEmbedder(EmbeddingProvider):
         return [[len(t), 1.0, 0.0] for t in texts]
 
 
+class CountingEmbedder(StubEmbedder):
+    model = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
 def test_context_assembler_with_rag(tmp_path: Path):
     workspace = tmp_path
     file_path = workspace / "sample.txt"
@@ -61,3 +90,612 @@ def test_context_assembler_with_rag(tmp_path: Path):
     metadata = assembler.get_context_metadata(ctx)
     assert "retrieval" in metadata
     assert metadata["retrieval"]["rag_enabled"] is True
+
+
+class _StubOllamaHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, body))
+        if self.path == "/api/embed" and self.server.batch_supported:
+            data = {"embeddings": [[float(len(t)), 1.0] for t in body["input"]]}
+        elif self.path == "/api/embeddings":
+            data = {"embedding": [float(len(body["prompt"])), 1.0]}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_ollama():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllamaHandler)
+    server.requests = []
+    server.batch_supported = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _stub_provider(server, **kwargs):
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    return OllamaEmbeddingProvider(base_url=host, auto_pull=False, auto_start=False, **kwargs)
+
+
+def test_ollama_embedder_batches_requests(stub_ollama):
+    provider = _stub_provider(stub_ollama, batch_size=4, max_concurrency=3)
+    texts = ["x" * i for i in range(1, 11)]
+
+    vectors = provider.embed(texts)
+
+    assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+    paths = [path for path, _ in stub_ollama.requests]
+    assert paths == ["/api/embed"] * 3
+    assert sorted(len(body["input"]) for _, body in stub_ollama.requests) == [2, 4, 4]
+
+
+def test_ollama_embedder_falls_back_to_single_endpoint(stub_ollama):
+    stub_ollama.batch_supported = False
+    provider = _stub_provider(stub_ollama, batch_size=8)
+
+    vectors = provider.embed(["a", "bb", "ccc"])
+
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0]
+    assert [path for path, _ in stub_ollama.requests].count("/api/embeddings") == 3
+
+
+def test_embedding_cache_embeds_each_text_once(tmp_path: Path):
+    inner = CountingEmbedder()
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    provider = CachedEmbeddingProvider(inner, cache)
+
+    first = provider.embed(["alpha", "beta", "alpha"])
+    second = provider.embed(["beta", "gamma"])
+
+    assert first == [[5, 1.0, 0.0], [4, 1.0, 0.0], [5, 1.0, 0.0]]
+    assert second == [[4, 1.0, 0.0], [5, 1.0, 0.0]]
+    assert inner.calls == [["alpha", "beta"], ["gamma"]]
+
+
+def test_embedding_cache_keeps_vectors_aligned_when_provider_drops_texts(tmp_path: Path):
+    class DroppingEmbedder(CountingEmbedder):
+        def embed(self, texts):
+            return super().embed([t for t in texts if t != "broken"])
+
+    inner = DroppingEmbedder()
+    provider = CachedEmbeddingProvider(inner, EmbeddingCache(str(tmp_path / "cache.sqlite")))
+    provider.embed(["cached"])
+
+    vectors = provider.embed(["fresh", "cached", "broken", "later"])
+    calls = len(inner.calls)
+
+    assert vectors == [[5, 1.0, 0.0], [6, 1.0, 0.0]]
+    assert provider.embed(["later"]) == [[5, 1.0, 0.0]]
+    assert len(inner.calls) == calls
+
+
+def test_embedding_cache_persists_across_instances(tmp_path: Path):
+    path = str(tmp_path / "cache.sqlite")
+    CachedEmbeddingProvider(CountingEmbedder(), EmbeddingCache(path)).embed(["persisted"])
+    cache = EmbeddingCache(path)
+    cache.put_many("other-model", ["x"], [[0.0]])
+
+    inner = CountingEmbedder()
+    vectors = CachedEmbeddingProvider(inner, EmbeddingCache(path)).embed(["persisted"])
+
+    assert vectors == [[9.0, 1.0, 0.0]]
+    assert inner.calls == []
+
+
+def test_retriever_shares_cache_with_memory_scoring(tmp_path: Path):
+    (tmp_path / "notes.txt").write_text("cached retrieval notes", encoding="utf-8")
+    inner = CountingEmbedder()
+    retriever = Retriever(
+        workspace_root=str(tmp_path),
+        embedder=inner,
+        store=SimpleVectorStore(str(tmp_path / "index.json")),
+        include_extensions=[".txt"],
+        embedding_cache=EmbeddingCache(),
+    )
+    items = [{"context_item_id": "m1", "payload": "remember this"}]
+
+    retriever.search("notes")
+    embed_memory_items(retriever.embedder, items, "notes")
+    embed_memory_items(retriever.embedder, items, "notes")
+
+    embedded = [text for call in inner.calls for text in call]
+    assert embedded.count("notes") == 1
+    assert embedded.count("remember this") == 1
+
+
+def test_tokenize_expands_identifiers():
+    terms = tokenize("def parse_json_file(): return HTTPServer")
+    expected = {"parse_json_file", "parse", "json", "file", "httpserver", "http", "server"}
+    assert expected <= set(terms)
+
+
+def test_bm25_index_ranks_and_persists(tmp_path: Path):
+    path = str(tmp_path / "lexical.json")
+    index = BM25Index(path)
+    index.add("a", "load the config loader module")
+    index.add("b", "vector store cosine similarity")
+    index.add("c", "config values and more config values")
+    index.persist()
+
+    reloaded = BM25Index(path)
+    ranked = [doc_id for doc_id, _ in reloaded.search("config", top_k=5)]
+    assert ranked == ["c", "a"]
+
+    reloaded.remove("c")
+    assert [doc_id for doc_id, _ in reloaded.search("config")] == ["a"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]], k=60)
+    assert fused[0][0] == "b"
+
+
+def test_retriever_hybrid_search_prefers_identifier_match(tmp_path: Path):
+    (tmp_path / "loader.txt").write_text("def load_manifest_file(path): ...", encoding="utf-8")
+    (tmp_path / "other.txt").write_text(
+        "unrelated prose about something else entirely", encoding="utf-8"
+    )
+    retriever = Retriever(
+        workspace_root=str(tmp_path),
+        embedder=StubEmbedder(),
+        store=SimpleVectorStore(str(tmp_path / "index.json")),
+        include_extensions=[".txt"],
+    )
+
+    chunks = retriever.search("load_manifest_file", top_k=1, policy="hybrid")
+
+    assert chunks[0].metadata["path"].endswith("loader.txt")
+    assert chunks[0].metadata["retrieval_policy"] == "hybrid"
+    assert chunks[0].metadata["lexical_score"] > 0
+
+
+def _make_retriever(workspace: Path, **kwargs) -> Retriever:
+    return Retriever(
+        workspace_root=str(workspace),
+        embedder=StubEmbedder(),
+        store=SimpleVectorStore(str(workspace / ".agent_engine" / "index.json")),
+        include_extensions=[".txt"],
+        **kwargs,
+    )
+
+
+def test_reindexing_does_not_duplicate_persisted_chunks(tmp_path: Path):
+    (tmp_path / "a.txt").write_text("first file", encoding="utf-8")
+    _make_retriever(tmp_path).index_workspace()
+
+    retriever = _make_retriever(tmp_path)
+    retriever.index_workspace()
+
+    assert len(retriever.store.vectors) == 1
+
+
+def test_background_indexer_tracks_changes(tmp_path: Path):
+    target = tmp_path / "a.txt"
+    target.write_text("original text", encoding="utf-8")
+    os.utime(target, (1_000_000, 1_000_000))
+    retriever = _make_retriever(tmp_path)
+    indexer = BackgroundIndexer(retriever, poll_interval=60)
+
+    assert indexer.poll_once() == 1
+    # Lag counts from detection, not from the (old) file mtime
+    assert indexer.stats().lag_seconds < 60
+    assert indexer.poll_once() == 0
+
+    target.write_text("edited text with more words", encoding="utf-8")
+    os.utime(target, (target.stat().st_atime, target.stat().st_mtime + 5))
+    (tmp_path / "b.txt").write_text("new file", encoding="utf-8")
+    assert indexer.poll_once() == 2
+    texts = sorted(v.metadata["text"] for v in retriever.store.vectors)
+    assert texts == ["edited text with more words", "new file"]
+
+    target.unlink()
+    indexer.poll_once()
+    assert [v.metadata["text"] for v in retriever.store.vectors] == ["new file"]
+
+    stats = indexer.stats()
+    assert stats.indexed_files == 1
+    assert stats.pending_files == 0
+    assert stats.commits == 3
+    assert stats.freshness_seconds is not None
+
+
+def test_search_does_not_index_inline_when_indexer_running(tmp_path: Path):
+    (tmp_path / "a.txt").write_text("searchable text", encoding="utf-8")
+    retriever = _make_retriever(tmp_path)
+    indexer = BackgroundIndexer(retriever, poll_interval=0.01)
+    indexer.start()
+    try:
+        deadline = time.time() + 5
+        while indexer.stats().commits == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        chunks = retriever.search("searchable", top_k=1)
+    finally:
+        indexer.stop()
+
+    assert retriever.indexer is None
+    assert chunks and chunks[0].metadata["path"].endswith("a.txt")
+
+
+def _random_vectors(count: int, dim: int, seed: int):
+    import random
+
+    rng = random.Random(seed)
+    return [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(count)]
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_quantized_store_matches_exact_top_results(tmp_path: Path, quantization):
+    corpus = _random_vectors(400, 64, seed=1)
+    exact = SimpleVectorStore(str(tmp_path / "exact.json"))
+    quantized = SimpleVectorStore(str(tmp_path / "q.json"), quantization=quantization)
+    for store in (exact, quantized):
+        store.replace([], [StoredVector(str(i), v, {"i": i}) for i, v in enumerate(corpus)])
+
+    # Queries near stored vectors: the true nearest neighbour must survive the candidate pass
+    for target in (3, 77, 250):
+        query = [x + 0.05 for x in corpus[target]]
+        best = quantized.search(query, top_k=3)
+        assert best[0]["id"] == exact.search(query, top_k=3)[0]["id"] == str(target)
+        assert best[0]["score"] == pytest.approx(exact.search(query, top_k=1)[0]["score"], abs=1e-5)
+
+
+def test_quantized_store_persists_values_in_sidecar(tmp_path: Path):
+    path = tmp_path / "index" / "q.json"
+    store = SimpleVectorStore(str(path), quantization="int8")
+    store.add("a", [1.0, 0.0, 0.5], {"path": "a.py"})
+    store.add("b", [0.0, 1.0, 0.5], {"path": "b.py"})
+    store.persist()
+    first_sidecar = json.loads(path.read_text())["vectors_file"]
+    store.replace(["a"], [])
+    store.persist()
+
+    raw = json.loads(path.read_text())
+    assert "values" not in raw["entries"][0]
+    # The replaced sidecar survives one more persist for readers of the previous JSON
+    assert (path.parent / first_sidecar).exists()
+    reloaded = SimpleVectorStore(str(path), quantization="int8")
+    reloaded.load()
+    store.persist()
+    assert not (path.parent / first_sidecar).exists()
+    assert len(list(path.parent.glob("*.f32"))) == 2
+
+    assert [v.vector_id for v in reloaded.vectors] == ["b"]
+    assert isinstance(reloaded.get("b").values, SidecarValues)
+    assert list(reloaded.get("b").values) == [0.0, 1.0, 0.5]
+    assert reloaded.search([0.0, 1.0, 0.5], top_k=1)[0]["score"] == pytest.approx(1.0)
+    assert reloaded.get("b").metadata == {"path": "b.py"}
+
+
+def test_quantized_store_loads_legacy_json(tmp_path: Path):
+    path = tmp_path / "legacy.json"
+    path.write_text(json.dumps([{"id": "x", "values": [0.5, 0.5], "metadata": {}}]))
+    store = SimpleVectorStore(str(path), quantization="binary")
+    assert store.search([1.0, 1.0], top_k=1)[0]["id"] == "x"
+
+
+def test_invalid_quantization_rejected(tmp_path: Path):
+    with pytest.raises(ValueError):
+        SimpleVectorStore(str(tmp_path / "x.json"), quantization="pq")
+
+
+def test_hashing_embedder_is_deterministic_and_normalised():
+    embedder = HashingEmbeddingProvider(dim=64)
+    first, again = embedder.embed(["parse the json file"]), embedder.embed(["parse the json file"])
+
+    assert first == again
+    assert len(first[0]) == 64
+    assert sum(v * v for v in first[0]) == pytest.approx(1.0)
+    assert embedder.embed([""])[0] == [0.0] * 64
+
+
+def test_hashing_embedder_ranks_related_text_higher(tmp_path: Path):
+    (tmp_path / "parser.py").write_text("def parse_json_file(path):\n    return load(path)\n")
+    (tmp_path / "colors.py").write_text("PALETTE = ['red', 'green', 'blue']\n")
+    retriever = Retriever(
+        workspace_root=str(tmp_path),
+        embedder=HashingEmbeddingProvider(dim=256),
+        store=SimpleVectorStore(str(tmp_path / ".agent_engine" / "index.json")),
+        include_extensions=[".py"],
+    )
+
+    results = retriever.search("parse json", top_k=1)
+
+    assert results[0].metadata["path"].endswith("parser.py")
+
+
+def test_create_embedding_provider_from_config():
+    hashing = create_embedding_provider({"provider": "hashing", "dim": 32})
+    assert isinstance(hashing, HashingEmbeddingProvider) and hashing.dim == 32
+    ollama = create_embedding_provider({"model": "all-minilm", "batch_size": 8})
+    assert isinstance(ollama, OllamaEmbeddingProvider)
+    assert (ollama.model, ollama.batch_size) == ("all-minilm", 8)
+    with pytest.raises(ValueError):
+        create_embedding_provider({"provider": "word2vec"})
+
+
+def test_vector_store_filters_before_scoring(tmp_path: Path):
+    store = SimpleVectorStore(str(tmp_path / "index.json"))
+    store.add("a", [1.0, 0.0], {"path": "/ws/src/app.py", "source": "file", "tags": ["core"]})
+    store.add("b", [1.0, 0.0], {"path": "/ws/src/pkg/util.py", "source": "file"})
+    store.add("c", [1.0, 0.0], {"path": "/ws/docs/guide.md", "source": "file", "tags": ["core"]})
+    store.add("d", [1.0, 0.0], {"path": "/ws/srcs/other.py", "source": "file"})
+
+    def ids(**kwargs):
+        results = store.search([1.0, 0.0], top_k=10, filters=MetadataFilter(**kwargs))
+        return {r["id"] for r in results}
+
+    assert ids(path_globs=["/ws/src/*"]) == {"a", "b"}
+    assert ids(path_globs=["/ws/src"]) == {"a", "b"}
+    assert ids(path_globs=["/ws/src/*.py"], tags=["core"]) == {"a"}
+    assert ids(extensions=["md"]) == {"c"}
+    assert ids(sources=["project"]) == set()
+    store.add("e", [1.0, 0.0], {"path": "/ws/src/new.py"})
+    assert "e" in ids(path_globs=["/ws/src/*"])
+
+
+def test_retriever_search_resolves_relative_path_filters(tmp_path: Path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "alpha.txt").write_text("alpha service handler")
+    (tmp_path / "notes.txt").write_text("alpha meeting notes")
+    retriever = _make_retriever(tmp_path)
+
+    for policy in ("semantic", "lexical", "hybrid"):
+        results = retriever.search("alpha", top_k=5, policy=policy, filters={"paths": "src/*"})
+        assert [r.metadata["path"] for r in results] == [str(tmp_path / "src" / "alpha.txt")]
+    assert retriever.search("alpha", filters={"extensions": [".md"]}) == []
+
+
+def test_metadata_filter_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        MetadataFilter.from_value({"folder": "src"})
+
+
+def test_embed_memory_items_applies_source_and_tag_filters():
+    embedder = CountingEmbedder()
+    items = [
+        {"context_item_id": "1", "payload": "keep me", "source": "project", "tags": ["design"]},
+        {"context_item_id": "2", "payload": "drop me", "source": "task", "tags": ["design"]},
+    ]
+
+    results = embed_memory_items(
+        embedder, items, "query", top_k=5, filters={"sources": ["project"]}
+    )
+
+    assert [r.chunk_id for r in results] == ["1"]
+    assert "drop me" not in embedder.calls[-1]
+
+
+def _sharded_workspace(tmp_path: Path) -> Path:
+    workspace = tmp_path / "ws"
+    for sub in ("src", "docs", "tests"):
+        (workspace / sub).mkdir(parents=True)
+        for i in range(3):
+            (workspace / sub / f"f{i}.txt").write_text(f"{sub} file {i} alpha")
+    (workspace / "README.txt").write_text("root readme alpha")
+    return workspace
+
+
+def test_sharded_store_splits_by_directory_and_bounds_open_shards(tmp_path: Path):
+    workspace = _sharded_workspace(tmp_path)
+    store = ShardedVectorStore(
+        str(tmp_path / "shards"), workspace_root=str(workspace), max_open_shards=2
+    )
+    retriever = Retriever(
+        workspace_root=str(workspace),
+        embedder=HashingEmbeddingProvider(dim=64),
+        store=store,
+        include_extensions=[".txt"],
+    )
+    retriever.index_workspace()
+
+    assert store.shard_names() == ["default/_root", "default/docs", "default/src", "default/tests"]
+    assert len(store._open) <= 2
+    results = retriever.search("alpha", top_k=20)
+    assert len(results) == 10
+
+    reopened = ShardedVectorStore(str(tmp_path / "shards"), workspace_root=str(workspace))
+    filtered = reopened.search(
+        HashingEmbeddingProvider(dim=64).embed(["alpha"])[0],
+        top_k=10,
+        filters=MetadataFilter(path_globs=[str(workspace / "docs" / "*")]),
+    )
+    assert {r["metadata"]["path"] for r in filtered} == {
+        str(workspace / "docs" / f"f{i}.txt") for i in range(3)
+    }
+    # Path pruning means only the docs shard was ever loaded
+    assert list(reopened._open) == ["default/docs"]
+
+
+def test_sharded_store_separates_projects(tmp_path: Path):
+    workspace = _sharded_workspace(tmp_path)
+    store = ShardedVectorStore(str(tmp_path / "shards"), workspace_root=str(workspace))
+    for project in ("tenant-a", "tenant-b"):
+        Retriever(
+            workspace_root=str(workspace),
+            embedder=HashingEmbeddingProvider(dim=64),
+            store=store,
+            include_extensions=[".txt"],
+            project_id=project,
+        ).index_workspace()
+
+    query = HashingEmbeddingProvider(dim=64).embed(["alpha"])[0]
+    results = store.search(query, top_k=50, filters=MetadataFilter(projects=["tenant-b"]))
+
+    assert len(results) == 10
+    assert {r["metadata"]["project_id"] for r in results} == {"tenant-b"}
+    assert all(name.startswith("tenant-") for name in store.shard_names())
+
+
+def test_sharded_store_process_executor_matches_threads(tmp_path: Path):
+    workspace = _sharded_workspace(tmp_path)
+    store = ShardedVectorStore(str(tmp_path / "shards"), workspace_root=str(workspace))
+    Retriever(
+        workspace_root=str(workspace),
+        embedder=HashingEmbeddingProvider(dim=64),
+        store=store,
+        include_extensions=[".txt"],
+    ).index_workspace()
+    query = HashingEmbeddingProvider(dim=64).embed(["src file"])[0]
+
+    remote = ShardedVectorStore(
+        str(tmp_path / "shards"), workspace_root=str(workspace), executor="process", max_workers=2
+    )
+    try:
+        assert [r["id"] for r in remote.search(query, top_k=4)] == [
+            r["id"] for r in store.search(query, top_k=4)
+        ]
+        assert not remote._open
+    finally:
+        remote.close()
+        store.close()
+
+
+def _search_snapshot(path: str, query):
+    return [r["id"] for r in SharedIndexReader(path).search(query, top_k=3)]
+
+
+def test_shared_snapshot_matches_store_and_swaps_atomically(tmp_path: Path):
+    corpus = _random_vectors(200, 32, seed=3)
+    store = SimpleVectorStore(str(tmp_path / "index.json"))
+    store.replace([], [
+        StoredVector(
+            str(i), v, {"path": f"/ws/{'src' if i % 2 else 'docs'}/f{i}.py", "text": f"chunk {i}"}
+        )
+        for i, v in enumerate(corpus)
+    ])
+    snapshot = str(tmp_path / "snapshot.bin")
+    assert publish_snapshot(store, snapshot) == 200
+
+    reader = SharedIndexReader(snapshot)
+    query = [x + 0.05 for x in corpus[17]]
+    assert [r["id"] for r in reader.search(query, top_k=5)] == [
+        r["id"] for r in store.search(query, top_k=5)
+    ]
+    assert reader.get("17").metadata["text"] == "chunk 17"
+    src_only = reader.search(query, top_k=5, filters=MetadataFilter(path_globs=["/ws/src/*"]))
+    assert src_only[0]["id"] == "17"
+    assert all(r["metadata"]["path"].startswith("/ws/src/") for r in src_only)
+    with pytest.raises(RuntimeError):
+        reader.add("x", [0.0] * 32, {})
+
+    # Republish: a view taken before the swap stays valid, new searches see the new data
+    held = reader.get("17")
+    store.replace([], [StoredVector("new", corpus[17], {"path": "/ws/new.py"})])
+    publish_snapshot(store, snapshot)
+    assert reader.search(query, top_k=1)[0]["id"] == "new"
+    assert len(held.values) == 32
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+
+def test_shared_snapshot_is_searchable_from_worker_processes(tmp_path: Path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    corpus = _random_vectors(50, 16, seed=4)
+    store = SimpleVectorStore(str(tmp_path / "index.json"))
+    store.replace([], [StoredVector(str(i), v, {}) for i, v in enumerate(corpus)])
+    snapshot = str(tmp_path / "snapshot.bin")
+    publish_snapshot(store, snapshot)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(_search_snapshot, [snapshot] * 2, [corpus[5], corpus[9]]))
+
+    assert [r[0] for r in results] == ["5", "9"]
+
+
+def test_context_assembler_publishes_and_attaches_shared_index(tmp_path: Path):
+    (tmp_path / "a.txt").write_text("shared snapshot content", encoding="utf-8")
+    index_path = str(tmp_path / "index" / "rag_index.json")
+    publisher = ContextAssembler(
+        workspace_root=str(tmp_path),
+        rag_index_path=index_path,
+        embedding_provider=HashingEmbeddingProvider(dim=64),
+        shared_index_mode="publish",
+        index_poll_interval=0.05,
+    )
+    try:
+        deadline = time.time() + 5
+        while not os.path.exists(publisher.shared_index_path) and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        publisher.indexer.stop()
+
+    worker = ContextAssembler(
+        workspace_root=str(tmp_path),
+        rag_index_path=index_path,
+        embedding_provider=HashingEmbeddingProvider(dim=64),
+        shared_index_mode="attach",
+    )
+
+    assert isinstance(worker.retriever.store, SharedIndexReader)
+    assert worker.indexer is None
+    chunks = worker.retriever.search("shared snapshot", top_k=1)
+    assert chunks and chunks[0].metadata["path"].endswith("a.txt")
+
+
+def test_attached_lexical_index_follows_publisher(tmp_path: Path):
+    path = str(tmp_path / "rag_lexical.json")
+    publisher = BM25Index(path)
+    publisher.add("a", "alpha release notes")
+    publisher.persist()
+    reader = BM25Index(path)
+    assert [d for d, _ in reader.search("alpha")] == ["a"]
+
+    publisher.add("b", "beta release notes")
+    publisher.persist()
+    assert reader.search("beta") == []
+    assert reader.refresh()
+    assert [d for d, _ in reader.search("beta")] == ["b"]
+    assert not reader.refresh()
+
+
+def test_attach_rejects_background_indexing(tmp_path: Path):
+    with pytest.raises(ValueError, match="attach"):
+        ContextAssembler(
+            workspace_root=str(tmp_path),
+            embedding_provider=HashingEmbeddingProvider(dim=8),
+            shared_index_mode="attach",
+            background_indexing=True,
+        )
+    with pytest.raises(ValueError, match="attach"):
+        RetrievalConfig(shared_index="attach", background_indexing=True)
+
+
+def test_index_workspace_prunes_ignored_and_binary_files(tmp_path: Path):
+    from agent_engine.telemetry import TelemetryBus
+
+    (tmp_path / ".gitignore").write_text("generated/\n*.log.txt\n")
+    (tmp_path / "generated").mkdir()
+    (tmp_path / "generated" / "out.txt").write_text("ignored output")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.txt").write_text("vendored")
+    (tmp_path / "run.log.txt").write_text("log line")
+    (tmp_path / "blob.txt").write_bytes(b"abc\x00def")
+    for i in range(5):
+        (tmp_path / f"doc{i}.txt").write_text(f"document number {i}")
+    telemetry = TelemetryBus()
+    retriever = _make_retriever(tmp_path, read_workers=4, telemetry=telemetry, progress_every=2)
+
+    retriever.index_workspace()
+
+    indexed = sorted(os.path.basename(p) for p in retriever.indexed_paths())
+    assert indexed == [f"doc{i}.txt" for i in range(5)]
+    read = [e.payload for e in telemetry.events if e.event_id.startswith("retrieval_index_read")]
+    assert read[-1]["files"] == 6
+    assert read[-1]["skipped_binary"] == 1
+    assert read[-1]["chunks"] == 5
+    assert any(e.event_id.startswith("retrieval_index_progress") for e in telemetry.events)
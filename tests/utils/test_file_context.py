@@ -423,6 +423,40 @@ class TestFileContextExtractorExtractContent:
         assert isinstance(result, list)
 
 
+    def test_extract_finds_old_files_through_keyword_index(self, temp_workspace):
+        """Should find relevant files outside the 100 most recently modified."""
+        import os
+
+        target = temp_workspace / "legacy_billing.py"
+        target.write_text("# reconcile invoices against the ledger\n")
+        os.utime(target, (1_000_000, 1_000_000))
+        for i in range(120):
+            (temp_workspace / f"note_{i}.txt").write_text(f"unrelated note {i}")
+
+        extractor = FileContextExtractor(temp_workspace, mode="balanced")
+        result = extractor.extract_file_context(query="reconcile invoices ledger")
+
+        assert target in [path for path, _, _ in result]
+
+
+    def test_extract_sees_files_edited_in_place(self, temp_workspace):
+        """Should re-read keywords of a file rewritten without a directory change."""
+        import os
+
+        (temp_workspace / "pkg").mkdir()
+        target = temp_workspace / "pkg" / "handlers.py"
+        target.write_text("def alpha_function():\n    pass\n")
+        extractor = FileContextExtractor(temp_workspace, mode="balanced")
+        extractor.extract_file_context(query="alpha_function")
+
+        target.write_text("def zebra_handler():\n    return 'zebra handler'\n")
+        os.utime(target, (target.stat().st_atime, target.stat().st_mtime + 5))
+        extractor.extract_file_context(query="zebra_handler")
+
+        assert target in extractor.keyword_index.files_with_keywords({"zebra_handler"})
+        assert not extractor.keyword_index.files_with_keywords({"alpha_function"})
+
+
 class TestCheapMode:
     """Test cheap cost mode configuration."""
 
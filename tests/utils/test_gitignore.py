@@ -0,0 +1,64 @@
+"""Tests for gitignore matching."""
+
+from pathlib import Path
+
+from agent_engine.utils.gitignore import GitignoreMatcher, parse_gitignore
+
+
+def _matcher(patterns):
+    return GitignoreMatcher("/nonexistent", extra_patterns=patterns)
+
+
+class TestGitignorePatterns:
+    """Test pattern translation."""
+
+    def test_unanchored_pattern_matches_any_depth(self):
+        matcher = _matcher(["*.log"])
+        assert matcher.is_ignored("app.log") is True
+        assert matcher.is_ignored("a/b/app.log") is True
+        assert matcher.is_ignored("app.txt") is False
+
+    def test_anchored_pattern_matches_from_root_only(self):
+        matcher = _matcher(["/build", "docs/gen"])
+        assert matcher.is_ignored("build", is_dir=True) is True
+        assert matcher.is_ignored("src/build", is_dir=True) is False
+        assert matcher.is_ignored("docs/gen", is_dir=True) is True
+        assert matcher.is_ignored("x/docs/gen", is_dir=True) is False
+
+    def test_directory_only_pattern_skips_files(self):
+        matcher = _matcher(["cache/"])
+        assert matcher.is_ignored("cache", is_dir=True) is True
+        assert matcher.is_ignored("cache", is_dir=False) is False
+
+    def test_negation_reincludes(self):
+        matcher = _matcher(["*.json", "!keep.json"])
+        assert matcher.is_ignored("data.json") is True
+        assert matcher.is_ignored("keep.json") is False
+
+    def test_double_star(self):
+        matcher = _matcher(["**/fixtures/*.bin", "logs/**"])
+        assert matcher.is_ignored("fixtures/a.bin") is True
+        assert matcher.is_ignored("tests/deep/fixtures/a.bin") is True
+        assert matcher.is_ignored("logs/2024/app.txt") is True
+        assert matcher.is_ignored("logs") is False
+
+    def test_comments_and_blank_lines_ignored(self):
+        assert parse_gitignore(["# comment", "", "   "]) == []
+
+
+class TestNestedGitignore:
+    """Test per-directory gitignore files."""
+
+    def test_nested_file_applies_below_its_directory(self, tmp_path: Path):
+        (tmp_path / ".gitignore").write_text("*.tmp\n")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / ".gitignore").write_text("generated/\n!important.tmp\n")
+
+        matcher = GitignoreMatcher(str(tmp_path))
+        matcher.load_dir("")
+        matcher.load_dir("pkg")
+
+        assert matcher.is_ignored("a.tmp") is True
+        assert matcher.is_ignored("pkg/important.tmp") is False
+        assert matcher.is_ignored("pkg/generated", is_dir=True) is True
+        assert matcher.is_ignored("generated", is_dir=True) is False
@@ -0,0 +1,77 @@
+"""Tests for the persistent workspace keyword index."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from agent_engine.utils.file_context import FileContextExtractor
+from agent_engine.utils.keyword_index import WorkspaceKeywordIndex
+
+
+def _stat(path: Path):
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime
+
+
+class TestWorkspaceKeywordIndex:
+    """Test keyword caching keyed by (path, size, mtime)."""
+
+    def test_unchanged_file_is_not_reread(self, tmp_path: Path):
+        target = tmp_path / "parser.py"
+        target.write_text("def parse_config():\n    return tokenizer_state\n")
+        index = WorkspaceKeywordIndex(tmp_path)
+
+        first = index.keywords_for(target, *_stat(target))
+        with patch("builtins.open", side_effect=AssertionError("file was re-read")):
+            second = index.keywords_for(target, *_stat(target))
+
+        assert "parse_config" in first
+        assert first == second
+
+    def test_changed_file_is_reindexed(self, tmp_path: Path):
+        target = tmp_path / "notes.txt"
+        target.write_text("alpha bravo")
+        index = WorkspaceKeywordIndex(tmp_path)
+        index.keywords_for(target, *_stat(target))
+
+        target.write_text("charlie delta echo")
+        os.utime(target, (1_000_000, 1_000_000))
+
+        assert index.keywords_for(target, *_stat(target)) == {"charlie", "delta", "echo"}
+        assert list(index.files_with_keywords({"alpha"})) == []
+        assert index.files_with_keywords({"delta"}) == {target: {"delta"}}
+
+    def test_persists_and_prunes(self, tmp_path: Path):
+        keep, gone = tmp_path / "keep.txt", tmp_path / "gone.txt"
+        keep.write_text("retained words")
+        gone.write_text("deleted words")
+        index_path = tmp_path / ".agent_engine" / "keyword_index.json"
+        index = WorkspaceKeywordIndex(tmp_path, index_path)
+        for path in (keep, gone):
+            index.keywords_for(path, *_stat(path))
+        assert index.save() is True
+        assert index.save() is False
+
+        reloaded = WorkspaceKeywordIndex(tmp_path, index_path)
+        assert len(reloaded) == 2
+        assert reloaded.prune([keep]) == 1
+        assert set(reloaded.files_with_keywords({"words"})) == {keep}
+
+
+class TestExtractorUsesIndex:
+    """Test FileContextExtractor integration."""
+
+    def test_second_extraction_reads_only_selected_files(self, tmp_path: Path):
+        for i in range(5):
+            (tmp_path / f"module{i}.py").write_text(f"def handler_{i}():\n    pass\n")
+        extractor = FileContextExtractor(tmp_path, mode="balanced")
+        extractor.extract_file_context("handler_3")
+        assert (tmp_path / ".agent_engine" / "keyword_index.json").exists()
+
+        with patch(
+            "agent_engine.utils.keyword_index.extract_keywords",
+            side_effect=AssertionError("keywords re-extracted"),
+        ):
+            results = FileContextExtractor(tmp_path).extract_file_context("handler_3")
+
+        assert results and results[0][0].name == "module3.py"
@@ -0,0 +1,175 @@
+"""Tests for the workspace symbol index."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from agent_engine.runtime.context import ContextAssembler
+from agent_engine.schemas import ContextProfile, ContextProfileSource, Task, TaskMode, TaskSpec
+from agent_engine.tools.filesystem import find_symbol
+from agent_engine.utils.file_context import FileContextExtractor, FileRelevance
+from agent_engine.utils.symbol_index import SymbolIndex, extract_symbols
+
+PY_SOURCE = '''import functools
+
+
+@functools.lru_cache
+def load_config(path):
+    return path
+
+
+class Engine:
+    def run(self):
+        def helper():
+            return 1
+        return helper()
+
+    async def stop(self):
+        pass
+'''
+
+
+def _workspace(tmp_path: Path) -> Path:
+    (tmp_path / "engine.py").write_text(PY_SOURCE)
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / "app.ts").write_text(
+        "export function renderPage(props) {\n  return props;\n}\n\n"
+        "export class Router {\n  go() {}\n}\n"
+    )
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("function renderPage() {}\n")
+    return tmp_path
+
+
+class TestExtractSymbols:
+    """Test per-language symbol extraction."""
+
+    def test_python_spans_and_qualnames(self, tmp_path: Path):
+        symbols = {s.qualname: s for s in extract_symbols(PY_SOURCE, tmp_path / "engine.py")}
+
+        assert set(symbols) == {
+            "load_config", "Engine", "Engine.run", "Engine.run.helper", "Engine.stop"
+        }
+        assert (symbols["load_config"].start_line, symbols["load_config"].end_line) == (4, 6)
+        assert symbols["Engine.run"].kind == "method"
+        assert symbols["Engine.run.helper"].kind == "function"
+        assert symbols["Engine"].end_line == 16
+
+    def test_regex_languages_and_syntax_errors(self, tmp_path: Path):
+        ts = extract_symbols("function a() {}\nconst b = (x) => x\nclass C {}\n", tmp_path / "m.ts")
+        broken = extract_symbols("def ok():\n    pass\ndef broken(:\n", tmp_path / "b.py")
+
+        assert [(s.name, s.kind, s.start_line, s.end_line) for s in ts] == [
+            ("a", "function", 1, 1), ("b", "function", 2, 2), ("C", "class", 3, 4),
+        ]
+        assert [s.name for s in broken] == ["ok", "broken"]
+
+
+class TestSymbolIndex:
+    """Test incremental indexing and lookup."""
+
+    def test_lookup_by_name_and_qualname(self, tmp_path: Path):
+        index = SymbolIndex(_workspace(tmp_path))
+        index.refresh()
+
+        assert [s.path.name for s in index.lookup("renderPage")] == ["app.ts"]
+        assert index.lookup("Engine.stop")[0].start_line == 15
+        assert index.definition(index.lookup("run")[0], max_lines=2) == (
+            "    def run(self):\n        def helper():"
+        )
+        assert index.lookup("missing") == []
+
+    def test_refresh_reparses_only_changed_files(self, tmp_path: Path):
+        workspace = _workspace(tmp_path)
+        index = SymbolIndex(workspace)
+        assert index.refresh() == 2
+
+        with patch("agent_engine.utils.symbol_index.extract_symbols") as parse:
+            assert index.refresh() == 0
+        parse.assert_not_called()
+
+        (workspace / "engine.py").write_text("def renamed():\n    pass\n")
+        os.utime(workspace / "engine.py", (1_000_000, 1_000_000))
+        (workspace / "web" / "app.ts").unlink()
+        assert index.refresh() == 2
+        assert index.lookup("Engine") == []
+        assert index.lookup("renderPage") == []
+        assert [s.name for s in index.lookup("renamed")] == ["renamed"]
+
+
+class TestSymbolConsumers:
+    """Test the extractor, file tool and context assembler integrations."""
+
+    def test_snippets_use_indexed_spans(self, tmp_path: Path):
+        path = _workspace(tmp_path) / "engine.py"
+        extractor = FileContextExtractor(tmp_path)
+        relevance = FileRelevance(
+            path=path, score=1.0, size=1, modified_time=0.0, extraction_mode="snippet"
+        )
+
+        snippet = extractor._extract_content(relevance, {"config"})
+
+        assert snippet.startswith("# load_config\n@functools.lru_cache\ndef load_config(path):")
+        assert "class Engine" not in snippet
+
+    def test_find_symbol_tool(self, tmp_path: Path):
+        result = find_symbol({"name": "Router"}, workspace_root=_workspace(tmp_path))
+
+        assert [m["relative_path"] for m in result["matches"]] == [os.path.join("web", "app.ts")]
+        assert result["matches"][0]["content"].startswith("export class Router")
+
+    def test_find_symbol_ignores_symlinks_outside_workspace(self, tmp_path: Path):
+        workspace = tmp_path / "ws"
+        workspace.mkdir()
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "s.py").write_text("def secret_fn():\n    return 'secret'\n")
+        (workspace / "link.py").symlink_to(outside / "s.py")
+
+        result = find_symbol({"name": "secret_fn"}, workspace_root=workspace)
+
+        assert result["matches"] == []
+
+    def test_find_symbol_validates_indexed_paths(self, tmp_path: Path):
+        (tmp_path / "s.py").write_text("def secret_fn():\n    return 'secret'\n")
+        index = SymbolIndex(tmp_path)
+        index.refresh()
+        workspace = tmp_path / "ws"
+        workspace.mkdir()
+
+        with patch("agent_engine.tools.filesystem._symbol_index_for", return_value=index):
+            result = find_symbol({"name": "secret_fn"}, workspace_root=workspace)
+
+        assert result["matches"] == []
+
+    def test_context_profile_adds_symbol_definitions(self, tmp_path: Path):
+        index = SymbolIndex(_workspace(tmp_path))
+        refreshes = []
+        refresh = index.refresh
+        index.refresh = lambda *args: refreshes.append(args) or refresh(*args)
+        assembler = ContextAssembler(symbol_index=index)
+        profile = ContextProfile(
+            id="symbols",
+            max_tokens=1000,
+            retrieval_policy="recency",
+            sources=[ContextProfileSource(store="task", tags=[])],
+            metadata={"symbol_lookup": True},
+        )
+        task = Task(
+            task_id="t1",
+            spec=TaskSpec(
+                task_spec_id="s",
+                request="Why does Engine.run fail?",
+                mode=TaskMode.ANALYSIS_ONLY,
+            ),
+            task_memory_ref="task",
+            project_memory_ref="project",
+            global_memory_ref="global",
+        )
+
+        ctx = assembler.build_context_for_profile(task, profile)
+
+        symbols = [i for i in ctx.items if i.kind == "symbol_definition"]
+        assert [i.metadata["qualname"] for i in symbols] == ["Engine.run"]
+        assert symbols[0].payload.startswith("    def run(self):")
+        assert len(refreshes) == 1
@@ -0,0 +1,89 @@
+"""Tests for the cached workspace scanner."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from agent_engine.utils.workspace_scanner import WorkspaceScanner, get_workspace_scanner
+
+
+def _tree(tmp_path: Path) -> Path:
+    (tmp_path / ".gitignore").write_text("*.log\nout/\n")
+    for sub in ("src", "src/pkg", "docs", "out", "node_modules", ".hidden"):
+        (tmp_path / sub).mkdir(parents=True)
+    (tmp_path / "src" / "a.py").write_text("a")
+    (tmp_path / "src" / "pkg" / "b.py").write_text("bb")
+    (tmp_path / "docs" / "guide.md").write_text("guide")
+    (tmp_path / "docs" / "debug.log").write_text("ignored")
+    (tmp_path / "out" / "gen.py").write_text("ignored")
+    (tmp_path / "node_modules" / "dep.js").write_text("ignored")
+    (tmp_path / ".hidden" / "secret.txt").write_text("ignored")
+    return tmp_path
+
+
+def _rel_paths(scanner):
+    return [f.rel_path for f in scanner.scan()]
+
+
+class TestWorkspaceScanner:
+    """Test pruning and snapshot caching."""
+
+    def test_prunes_ignored_paths(self, tmp_path: Path):
+        scanner = WorkspaceScanner(str(_tree(tmp_path)))
+
+        assert _rel_paths(scanner) == [".gitignore", "docs/guide.md", "src/a.py", "src/pkg/b.py"]
+        assert scanner.last_stats.dirs_listed == 4
+
+    def test_unchanged_tree_is_served_from_snapshots(self, tmp_path: Path):
+        scanner = WorkspaceScanner(str(_tree(tmp_path)))
+        first = scanner.scan()
+
+        with patch("agent_engine.utils.workspace_scanner.os.scandir") as scandir:
+            assert scanner.scan() == first
+        scandir.assert_not_called()
+        assert scanner.last_stats.dirs_listed == 0
+        assert scanner.last_stats.dirs_cached == 4
+
+    def test_only_changed_directories_are_relisted(self, tmp_path: Path):
+        scanner = WorkspaceScanner(str(_tree(tmp_path)))
+        scanner.scan()
+
+        (tmp_path / "src" / "pkg" / "c.py").write_text("c")
+        (tmp_path / "docs" / "guide.md").write_text("edited in place")
+        os.utime(tmp_path / "docs" / "guide.md", (1_000_000, 1_000_000))
+        files = {f.rel_path: f for f in scanner.scan()}
+
+        assert scanner.last_stats.dirs_listed == 1
+        assert "src/pkg/c.py" in files
+        assert files["docs/guide.md"].mtime != 1_000_000
+
+        files = {f.rel_path: f for f in scanner.scan(fresh_stats=True)}
+        assert files["docs/guide.md"].mtime == 1_000_000
+        assert files["docs/guide.md"].size == len("edited in place")
+
+    def test_gitignore_edits_refilter_cached_directories(self, tmp_path: Path):
+        scanner = WorkspaceScanner(str(_tree(tmp_path)))
+        scanner.scan()
+
+        (tmp_path / ".gitignore").write_text("*.md\n")
+        os.utime(tmp_path / ".gitignore", (2_000_000, 2_000_000))
+        paths = _rel_paths(scanner)
+
+        assert "docs/guide.md" not in paths
+        assert "docs/debug.log" in paths
+        assert "out/gen.py" in paths
+
+    def test_skips_file_symlinks_that_leave_the_root(self, tmp_path: Path):
+        (tmp_path / "ws").mkdir()
+        root = _tree(tmp_path / "ws")
+        (tmp_path / "outside.py").write_text("outside")
+        (root / "src" / "escape.py").symlink_to(tmp_path / "outside.py")
+        (root / "src" / "alias.py").symlink_to(root / "src" / "a.py")
+
+        paths = _rel_paths(WorkspaceScanner(str(root)))
+
+        assert "src/escape.py" not in paths
+        assert "src/alias.py" in paths
+
+    def test_shared_scanner_per_root(self, tmp_path: Path):
+        assert get_workspace_scanner(str(tmp_path)) is get_workspace_scanner(str(tmp_path / "."))